@@ -0,0 +1,116 @@
+"""Cenários cronometrados do app sobre um catálogo sintético (SQLite descartável).
+
+    python -m benchmarks.bench_app --spells 300 --runes 15 --repeat 20 --output bench.json
+    python -m benchmarks.compare baseline.json bench.json
+
+Cenários: import_content (vazio, incremental e --force), extract_spells,
+selection_view, grimorio_view (1, 10 e todas as magias × todas as runas, com o
+cache de fragmentos frio e quente, e comprimida) e api_spells. O relatório JSON traz o commit
+e as versões, para comparar execuções entre commits.
+"""
+import argparse, io, os, sys, tempfile, time
+
+from benchmarks.common import metadata, peak_rss_mb, setup_django, summarize_ms, write_report
+
+def measure(name, fn, repeat, before=None, **params):
+    """Roda `fn` `repeat` vezes (após um aquecimento) e resume tempo, queries e tamanho da resposta."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    if before:
+        before()
+    fn()
+    times, queries, size = [], 0, None
+    for _ in range(repeat):
+        if before:
+            before()
+        with CaptureQueriesContext(connection) as ctx:
+            t0 = time.perf_counter()
+            out = fn()
+            times.append(time.perf_counter() - t0)
+        queries = len(ctx)
+        if hasattr(out, "content"):
+            size = len(out.content)
+    row = {"scenario": name, "params": params, **summarize_ms(times), "queries": queries}
+    if size is not None:
+        row["bytes"] = size
+    print(f"  {name} {params}: p50={row['p50_ms']}ms queries={queries}", file=sys.stderr)
+    return row
+
+def import_scenarios(content_root, jobs):
+    """import_content não se repete no mesmo estado: cada variante roda uma vez."""
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    rows = []
+    for name, opts in (("import_content.cold", {}),
+                       ("import_content.unchanged", {}),
+                       ("import_content.force", {"force": True}),
+                       ("import_content.force_jobs", {"force": True, "jobs": jobs})):
+        with CaptureQueriesContext(connection) as ctx:
+            t0 = time.perf_counter()
+            call_command("import_content", content_root=content_root, stdout=io.StringIO(), **opts)
+            dt = time.perf_counter() - t0
+        rows.append({"scenario": name, "params": {k: v for k, v in opts.items() if k != "force"},
+                     **summarize_ms([dt]), "queries": len(ctx)})
+        print(f"  {name}: {round(dt * 1000, 1)}ms queries={len(ctx)}", file=sys.stderr)
+    return rows
+
+def run(n_spells, n_runes, repeat, jobs, seed=0):
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.test import Client
+    from benchmarks.bench_extract import synthetic_manual
+    from benchmarks.synthetic import generate
+    from grimorio.management.commands.sync_from_gmbinder import default_parser, extract_spells
+
+    content_root = tempfile.mkdtemp(prefix="grimorio-content-")
+    spells, runes = generate(content_root, n_spells, n_runes, seed)
+    rows = import_scenarios(content_root, jobs)
+
+    manual = synthetic_manual(n_spells, n_runes)
+    rows.append(measure("extract_spells", lambda: extract_spells(manual), max(1, repeat // 5),
+                        spells=n_spells, runes=n_runes, parser=default_parser()))
+
+    client = Client()
+    fragments = caches[getattr(settings, "GRIMORIO_FRAGMENT_CACHE", "default")]
+    all_runes = ",".join(runes)
+    rows.append(measure("selection_view", lambda: client.get("/"), repeat))
+    rows.append(measure("selection_view.cold", lambda: client.get("/"), repeat, before=fragments.clear))
+    for n in (1, 10, len(spells)):
+        url = f"/grimorio/?spells={','.join(spells[:n])}&runes={all_runes}&lazy=0"
+        rows.append(measure("grimorio_view", lambda: client.get(url), repeat, spells=n, runes=len(runes)))
+        rows.append(measure("grimorio_view.cold", lambda: client.get(url), repeat, before=fragments.clear,
+                            spells=n, runes=len(runes)))
+        rows.append(measure("grimorio_view.compressed", lambda: client.get(url, HTTP_ACCEPT_ENCODING="br, gzip"),
+                            repeat, spells=n, runes=len(runes)))
+    ids = ",".join(spells)
+    rows.append(measure("api_spells", lambda: client.get(f"/api/spells?ids={ids}"), repeat, spells=len(spells)))
+    rows.append(measure("api_spells.compact", lambda: client.get(f"/api/spells?ids={ids}&compact=1&runes=fogo"),
+                        repeat, spells=len(spells)))
+    rows.append(measure("api_spells.filter", lambda: client.get("/api/spells?alcance=curto&duracao=cena&fields=slug"),
+                        repeat))
+    return rows
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--spells", type=int, default=300)
+    ap.add_argument("--runes", type=int, default=15)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", help="Também grava o relatório JSON neste arquivo")
+    args = ap.parse_args(argv)
+
+    setup_django()
+    rows = run(args.spells, args.runes, args.repeat, args.jobs, args.seed)
+    report = {
+        "meta": metadata(suite="bench_app", spells=args.spells, runes=args.runes,
+                         repeat=args.repeat, seed=args.seed, peak_rss_mb=peak_rss_mb()),
+        "results": rows,
+    }
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Benchmark do extrator do GM Binder sobre manuais sintéticos.
+
+    python -m benchmarks.bench_extract --sizes 100 1000 3000 --runes 15
+
+Imprime uma linha JSON por (parser, tamanho); `us_per_spell` deve ficar
+estável conforme o manual cresce (tempo linear no tamanho do manual).
+"""
+import argparse, json, sys, time
+from grimorio.management.commands.sync_from_gmbinder import extract_spells
+
+RUNES = ["Água", "Ar", "Eletricidade", "Espaço", "Essência", "Fogo", "Gelo", "Gravidade",
+         "Luz", "Mente", "Metal", "Som", "Tempo", "Terra", "Trevas"]
+
+def synthetic_manual(n_spells: int, n_runes: int = 15, per_page: int = 4, title: str = "Magia Sintética") -> str:
+    """HTML no formato do GM Binder: páginas <div class="page">, h3 por magia e h4 por runa."""
+    runes = [RUNES[i % len(RUNES)] + ("" if i < len(RUNES) else f" {i}") for i in range(n_runes)]
+    out = ['<div class="page"><h1>INTRODUÇÃO</h1><p>Texto de abertura.</p>',
+           '<h1>MAGIAS ARCANAS</h1><h3>Lista de Magias</h3><ul><li>...</li></ul>']
+    for i in range(n_spells):
+        if i and i % per_page == 0:
+            out.append('</div><div class="page">')
+        out.append(
+            f'<h3>{title} {i}</h3>'
+            '<p><em>Você canaliza energia arcana em um alvo à sua escolha.</em></p><hr>'
+            '<ul><li><strong>Execução.</strong> Ação</li><li><strong>Alcance.</strong> Curto</li>'
+            '<li><strong>Alvo.</strong> Uma criatura</li><li><strong>Duração.</strong> Cena</li></ul>'
+            '<p><strong>Execução:</strong> Ação • <strong>Alcance:</strong> Curto • '
+            '<strong>Duração:</strong> Cena</p>'
+            + "".join(f'<li><strong>Círculo {c}:</strong> Bônus de +{c}</li>' for c in range(1, 6))
+        )
+        for r in runes:
+            out.append(f'<h4>Runa de {r}</h4><p>O alvo recebe 2 de dano de {r} para cada vez '
+                       'que você aplicar essa Runa.</p><table><thead><tr><th></th></tr></thead>'
+                       '<tbody><tr><td></td></tr></tbody></table>')
+    out.append('</div><div class="page"><h1>MAGIAS DIVINAS</h1><h3>Bênção</h3><p>...</p></div>')
+    return "".join(out)
+
+def available_parsers():
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        parsers.insert(0, "lxml")
+    except ImportError:
+        pass
+    return parsers
+
+def run(sizes, n_runes, repeat):
+    for parser in available_parsers():
+        for n in sizes:
+            html = synthetic_manual(n, n_runes)
+            best = None
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                spells = extract_spells(html, parser=parser)
+                dt = time.perf_counter() - t0
+                best = dt if best is None else min(best, dt)
+            assert len(spells) == n, (parser, n, len(spells))
+            yield {"parser": parser, "spells": n, "runes": n_runes, "html_bytes": len(html),
+                   "seconds": round(best, 4), "us_per_spell": round(best / n * 1e6, 1)}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 3000])
+    ap.add_argument("--runes", type=int, default=15)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    for row in run(args.sizes, args.runes, args.repeat):
+        print(json.dumps(row), flush=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
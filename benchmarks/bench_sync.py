@@ -0,0 +1,127 @@
+"""sync_from_gmbinder com vários manuais contra um servidor HTTP local (stub).
+
+    python -m benchmarks.bench_sync --manuals 5 --spells 60 --latency 0.5
+    python -m benchmarks.bench_sync --flaky   # 1ª requisição de cada manual responde 503 (testa os retries)
+
+O stub serve manuais sintéticos em /manual/<n> com latência crescente (o mais lento
+leva `--latency` s) e ETag. Mede o sync completo (download, extração, YAML e import)
+com um download por vez e com `--workers` simultâneos, e uma segunda rodada sem
+mudanças (todos 304). Com downloads simultâneos, a fase de download (`fetch_ms`, até o
+último manual chegar) fica perto do manual mais lento e não da soma. O resto do total é
+CPU (extração, YAML, import_content) e cresce com o número de magias, não de manuais;
+com uma CPU só ele não paraleliza.
+"""
+import argparse, hashlib, io, os, re, shutil, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.common import metadata, setup_django, summarize_ms, write_report
+
+def make_manuals(n_manuals, n_spells, n_runes):
+    from benchmarks.bench_extract import synthetic_manual
+    return [synthetic_manual(n_spells, n_runes, title=f"Magia do Manual {m}").encode("utf-8")
+            for m in range(n_manuals)]
+
+def serve(manuals, latency, flaky):
+    """Stub em thread: /manual/<n> com latência (n+1)/len * `latency`, ETag e 503 inicial se `flaky`."""
+    etags = [hashlib.sha1(body).hexdigest()[:16] for body in manuals]
+    failed, lock = set(), threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            try:
+                n = int(self.path.rsplit("/", 1)[-1])
+                body, etag = manuals[n], f'"{etags[n]}"'
+            except (ValueError, IndexError):
+                return self._reply(404, b"")
+            time.sleep(latency * (n + 1) / len(manuals))
+            with lock:
+                first = n not in failed
+                failed.add(n)
+            if flaky and first:
+                return self._reply(503, b"")
+            if self.headers.get("If-None-Match") == etag:
+                return self._reply(304, b"", etag)
+            self._reply(200, body, etag)
+
+        def _reply(self, status, body, etag=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def reset_catalog():
+    # cada cenário importa do zero: a rodada concorrente não aproveita o banco da serial
+    from grimorio.models import Rune, Spell
+    Spell.objects.all().delete()
+    Rune.objects.all().delete()
+
+_ARRIVED = re.compile(r"↓ .*?, ([\d.]+)s\)")
+
+def sync(urls, out_root, cache_dir, workers, jobs):
+    """(total, fase de download) em segundos; o download vem do "↓ ... 0.81s" de cada manual."""
+    from django.core.management import call_command
+    out = io.StringIO()
+    t0 = time.perf_counter()
+    call_command("sync_from_gmbinder", *[a for u in urls for a in ("--url", u)], out_root=out_root,
+                 cache_dir=cache_dir, workers=workers, jobs=jobs, stdout=out)
+    total = time.perf_counter() - t0
+    return total, max(map(float, _ARRIVED.findall(out.getvalue())), default=0.0)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--manuals", type=int, default=5)
+    ap.add_argument("--spells", type=int, default=60, help="Magias por manual")
+    ap.add_argument("--runes", type=int, default=8)
+    ap.add_argument("--latency", type=float, default=0.5, help="Latência (s) do manual mais lento")
+    ap.add_argument("--workers", type=int, default=0, help="Downloads simultâneos (0 = um por manual)")
+    ap.add_argument("--jobs", type=int, default=0, help="Processos de extração (0 = um por CPU)")
+    ap.add_argument("--flaky", action="store_true", help="Primeira resposta de cada manual é 503")
+    ap.add_argument("--output", help="Também grava o relatório JSON neste arquivo")
+    args = ap.parse_args(argv)
+
+    setup_django()
+    manuals = make_manuals(args.manuals, args.spells, args.runes)
+    server, base = serve(manuals, args.latency, args.flaky)
+    urls = [f"{base}/manual/{n}" for n in range(args.manuals)]
+    workers = args.workers or args.manuals
+    rows = []
+    try:
+        for name, w in (("sync.serial", 1), ("sync.concurrent", workers)):
+            root = tempfile.mkdtemp(prefix="grimorio-sync-")
+            cache = os.path.join(root, ".cache")
+            out = os.path.join(root, "content")
+            reset_catalog()
+            cold = sync(urls, out, cache, w, args.jobs)
+            warm = sync(urls, out, cache, w, args.jobs)
+            for scenario, (dt, fetch) in ((name, cold), (name + ".unchanged", warm)):
+                rows.append({"scenario": scenario, "params": {"manuals": args.manuals, "workers": w},
+                             **summarize_ms([dt]), "fetch_ms": round(fetch * 1000, 1),
+                             "slowest_manual_ms": round(args.latency * 1000, 1)})
+                print(f"  {scenario} workers={w}: {round(dt * 1000, 1)}ms (download {round(fetch * 1000, 1)}ms)",
+                      file=sys.stderr)
+            shutil.rmtree(root, ignore_errors=True)
+    finally:
+        server.shutdown()
+
+    report = {
+        "meta": metadata(suite="bench_sync", manuals=args.manuals, spells=args.spells, runes=args.runes,
+                         latency=args.latency, flaky=args.flaky),
+        "results": rows,
+    }
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Infra compartilhada dos benchmarks: Django num SQLite descartável, percentis e metadados."""
+import json, os, platform, resource, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def setup_django(db_path=None):
+    """Configura o Django num SQLite próprio (não toca no banco de desenvolvimento) e migra."""
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="grimorio-bench-"), "bench.sqlite3")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(db_path)}"
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "nexus_site.settings")
+    os.environ.setdefault("GRIMORIO_EXPORT_WORKERS", "0")
+    os.environ.setdefault("GRIMORIO_SERVER_TIMING", "True")  # queries por requisição (load.py)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.core.management import call_command
+    settings.ALLOWED_HOSTS.append("testserver")
+    call_command("migrate", verbosity=0)
+    return db_path
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def summarize_ms(seconds):
+    ms = [s * 1000 for s in seconds]
+    return {
+        "n": len(ms),
+        "min_ms": round(min(ms), 3),
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3),
+    }
+
+def peak_rss_mb():
+    # ru_maxrss: KB no Linux, bytes no macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, timeout=30).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def metadata(**extra):
+    import django
+    meta = {
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    meta.update(extra)
+    return meta
+
+def write_report(report, path=None):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
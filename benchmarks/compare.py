@@ -0,0 +1,50 @@
+"""Compara dois relatórios JSON dos benchmarks e aponta regressões.
+
+    python -m benchmarks.compare baseline.json atual.json --threshold 0.2
+
+Regressão: p50 (ou p95 na carga) mais de `threshold` acima da base, ou mais
+queries por requisição. Sai com código 1 se houver alguma.
+"""
+import argparse, json, sys
+
+def _key(row):
+    return row.get("scenario") or row.get("path"), json.dumps(row.get("params", {}), sort_keys=True)
+
+def compare(base, current, threshold, metric):
+    old = {_key(r): r for r in base["results"]}
+    out = []
+    for row in current["results"]:
+        prev = old.get(_key(row))
+        if prev is None or prev.get(metric) is None or row.get(metric) is None:
+            continue
+        ratio = row[metric] / prev[metric] if prev[metric] else 1.0
+        queries_up = row.get("queries", 0) > prev.get("queries", 0)
+        out.append({
+            "scenario": _key(row)[0], "params": row.get("params", {}),
+            metric: [prev[metric], row[metric]], "ratio": round(ratio, 3),
+            "queries": [prev.get("queries"), row.get("queries")],
+            "regression": ratio > 1 + threshold or queries_up,
+        })
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("baseline")
+    ap.add_argument("current")
+    ap.add_argument("--threshold", type=float, default=0.2, help="Piora relativa tolerada (0.2 = 20%%)")
+    ap.add_argument("--metric", default="p50_ms")
+    args = ap.parse_args(argv)
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(base, current, args.threshold, args.metric)
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    regressions = [r for r in rows if r["regression"]]
+    print(f"{len(regressions)} regressões em {len(rows)} cenários "
+          f"({base['meta'].get('commit')} -> {current['meta'].get('commit')})", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
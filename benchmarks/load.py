@@ -0,0 +1,156 @@
+"""Gerador de carga concorrente contra o app WSGI, com relatório JSON.
+
+    python -m benchmarks.load --spells 300 --concurrency 16 --requests 2000
+    python -m benchmarks.load --target http://127.0.0.1:8000 --path / --path "/api/spells?ids=..."
+
+Sem --target, importa um catálogo sintético num SQLite descartável e sobe o
+app num servidor WSGI com threads no próprio processo (o pico de memória
+inclui servidor e clientes). Queries por requisição vêm do cabeçalho
+Server-Timing do PerformanceMiddleware (com --target, o servidor precisa de
+GRIMORIO_SERVER_TIMING=True).
+"""
+import argparse, http.client, io, re, socketserver, sys, tempfile, threading, time
+from collections import defaultdict
+from urllib.parse import urlsplit
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks.common import metadata, peak_rss_mb, setup_django, summarize_ms, write_report
+
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def serve_in_thread():
+    from django.core.wsgi import get_wsgi_application
+    server = make_server("127.0.0.1", 0, get_wsgi_application(),
+                         server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def seed_catalog(n_spells, n_runes, seed):
+    from django.core.management import call_command
+    from benchmarks.synthetic import generate
+    root = tempfile.mkdtemp(prefix="grimorio-content-")
+    spells, runes = generate(root, n_spells, n_runes, seed)
+    call_command("import_content", content_root=root, stdout=io.StringIO())
+    return spells, runes
+
+def default_paths(spells, runes):
+    ten = ",".join(spells[:10])
+    all_runes = ",".join(runes)
+    return [
+        "/",
+        f"/grimorio/?spells={spells[0]}&runes={all_runes}",
+        f"/grimorio/?spells={ten}&runes={all_runes}&lazy=0",
+        f"/api/spells?ids={ten}&compact=1&runes={runes[0]}",
+        "/api/spells?alcance=curto&fields=slug,name",
+    ]
+
+def drive(base, paths, concurrency, total, duration):
+    """Cada thread faz GETs em rodízio pelos `paths` até esgotar `total` ou `duration`."""
+    target = urlsplit(base)
+    lock = threading.Lock()
+    samples = defaultdict(list)  # path -> [(segundos, status, queries)]
+    issued = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker(offset):
+        i = offset
+        while True:
+            with lock:
+                if (total and issued[0] >= total) or (deadline and time.perf_counter() >= deadline):
+                    return
+                issued[0] += 1
+            path = paths[i % len(paths)]
+            i += 1
+            t0 = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                status, timing = resp.status, resp.getheader("Server-Timing", "")
+                conn.close()
+            except OSError:
+                status, timing = 0, ""
+            dt = time.perf_counter() - t0
+            m = QUERIES_RE.search(timing)
+            with lock:
+                samples[path].append((dt, status, int(m.group(1)) if m else None))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - t0
+
+def report_rows(samples, elapsed):
+    rows, everything = [], []
+    for path, items in samples.items():
+        everything.extend(items)
+        rows.append(_row(path, items, elapsed))
+    rows.append(_row("*", everything, elapsed))
+    return rows
+
+def _row(path, items, elapsed):
+    queries = [q for _, _, q in items if q is not None]
+    return {
+        "path": path,
+        **summarize_ms([dt for dt, _, _ in items]),
+        "throughput_rps": round(len(items) / elapsed, 1),
+        "errors": sum(1 for _, status, _ in items if not 200 <= status < 400),
+        "queries": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--target", help="URL base de um servidor já rodando (gunicorn etc.)")
+    ap.add_argument("--path", action="append", dest="paths", help="Caminho a exercitar (repetível)")
+    ap.add_argument("--spells", type=int, default=300)
+    ap.add_argument("--runes", type=int, default=15)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=1000, help="Total de requisições (0 = usa --duration)")
+    ap.add_argument("--duration", type=float, default=0, help="Segundos de carga")
+    ap.add_argument("--warmup", type=int, default=20, help="Requisições descartadas por caminho")
+    ap.add_argument("--output", help="Também grava o relatório JSON neste arquivo")
+    args = ap.parse_args(argv)
+    if not args.requests and not args.duration:
+        ap.error("use --requests ou --duration")
+
+    server = None
+    if args.target:
+        base, paths = args.target.rstrip("/"), args.paths or ["/"]
+    else:
+        setup_django()
+        spells, runes = seed_catalog(args.spells, args.runes, args.seed)
+        server, base = serve_in_thread()
+        paths = args.paths or default_paths(spells, runes)
+
+    try:
+        if args.warmup:
+            drive(base, paths, 1, args.warmup * len(paths), 0)
+        samples, elapsed = drive(base, paths, args.concurrency, args.requests, args.duration)
+    finally:
+        if server:
+            server.shutdown()
+
+    report = {
+        "meta": metadata(suite="load", target=args.target or "in-process", concurrency=args.concurrency,
+                         spells=None if args.target else args.spells, runes=None if args.target else args.runes,
+                         seconds=round(elapsed, 3), peak_rss_mb=None if args.target else peak_rss_mb()),
+        "results": report_rows(samples, elapsed),
+    }
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Clientes lentos contra o deploy síncrono (gunicorn sync + WSGI) e o ASGI (workers do uvicorn).
+
+    python -m benchmarks.slow_clients --workers 2 --slow 32 --duration 10
+    python -m benchmarks.slow_clients --mode asgi --trickle 3 --read-delay 0.1
+
+Sobe o gunicorn num subprocesso (com o gunicorn.conf.py do projeto) sobre um catálogo
+sintético. Enquanto `--slow` conexões mandam a requisição aos poucos (`--trickle`
+segundos) e leem a página de 10 magias em blocos espaçados, `--probes` clientes normais medem
+a latência de requisições rápidas. No deploy síncrono cada cliente lento ocupa um worker
+inteiro; as sondas fazem fila atrás deles.
+"""
+import argparse, os, socket, subprocess, sys, threading, time, urllib.request
+
+from benchmarks.common import ROOT, metadata, setup_django, summarize_ms, write_report
+from benchmarks.load import drive, seed_catalog
+
+MODES = {
+    "sync": ("nexus_site.wsgi", "sync"),
+    "asgi": ("nexus_site.asgi:application", "uvicorn_worker.UvicornWorker"),
+}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(mode, workers):
+    app, worker_class = MODES[mode]
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(ROOT, "gunicorn.conf.py"),
+         "-k", worker_class, "-w", str(workers), "-b", f"127.0.0.1:{port}", "--timeout", "120", app],
+        cwd=ROOT, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(base + "/api/spells?fields=slug", timeout=2).read()
+            return proc, base, port
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError(f"gunicorn ({mode}) saiu com código {proc.returncode}")
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"gunicorn ({mode}) não respondeu em 30s")
+
+def slow_client(port, path, trickle, read_delay, stop, results, offset=0.0):
+    """Repete: requisição enviada em 20 pedaços ao longo de `trickle` s, resposta lida 4 KB por vez."""
+    raw = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n".encode()
+    step = max(1, len(raw) // 20)
+    stop.wait(offset)  # chegadas espalhadas, como clientes de verdade
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            with socket.socket() as sock:
+                # buffer de recepção pequeno: o servidor sente a lentidão da leitura (como num link ruim)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8192)
+                sock.settimeout(120)
+                sock.connect(("127.0.0.1", port))
+                for i in range(0, len(raw), step):
+                    sock.sendall(raw[i:i + step])
+                    time.sleep(trickle / 20)
+                first = sock.recv(4096)
+                while sock.recv(4096):
+                    time.sleep(read_delay)
+            results.append((time.perf_counter() - t0, first.startswith(b"HTTP/1.1 200")))
+        except OSError:
+            results.append((time.perf_counter() - t0, False))
+
+def run_mode(mode, args, slow_path, probe_paths):
+    proc, base, port = start_server(mode, args.workers)
+    stop, slow = threading.Event(), []
+    threads = [threading.Thread(target=slow_client, daemon=True,
+                                args=(port, slow_path, args.trickle, args.read_delay, stop, slow,
+                                      args.trickle * n / args.slow))
+               for n in range(args.slow)]
+    try:
+        for t in threads:
+            t.start()
+        time.sleep(args.trickle)  # clientes lentos já ocupando conexões
+        samples, elapsed = drive(base, probe_paths, args.probes, 0, args.duration)
+    finally:
+        stop.set()
+        for t in threads:
+            t.join(timeout=args.trickle + 30)
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    probes = [item for items in samples.values() for item in items]
+    row = {
+        "scenario": f"slow_clients.{mode}",
+        "params": {"workers": args.workers, "slow": args.slow, "probes": args.probes},
+        **summarize_ms([dt for dt, _, _ in probes] or [0]),
+        "throughput_rps": round(len(probes) / elapsed, 1),
+        "errors": sum(1 for _, status, _ in probes if not 200 <= status < 400),
+        "slow_completed": sum(1 for _, ok in slow if ok),
+        "slow_failed": sum(1 for _, ok in slow if not ok),
+    }
+    print(f"  {mode}: probes p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+          f"rps={row['throughput_rps']} lentos={row['slow_completed']}", file=sys.stderr)
+    return row
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--mode", choices=["both", *MODES], default="both")
+    ap.add_argument("--workers", type=int, default=2, help="Workers do gunicorn em cada modo")
+    ap.add_argument("--slow", type=int, default=32, help="Conexões lentas simultâneas")
+    ap.add_argument("--probes", type=int, default=4, help="Clientes rápidos medindo latência")
+    ap.add_argument("--duration", type=float, default=10, help="Segundos de medição por modo")
+    ap.add_argument("--trickle", type=float, default=2.0, help="Segundos para enviar cada requisição lenta")
+    ap.add_argument("--read-delay", type=float, default=0.05, help="Pausa entre blocos de 4 KB lidos")
+    ap.add_argument("--spells", type=int, default=300)
+    ap.add_argument("--runes", type=int, default=15)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", help="Também grava o relatório JSON neste arquivo")
+    args = ap.parse_args(argv)
+
+    setup_django()
+    spells, runes = seed_catalog(args.spells, args.runes, args.seed)
+    slow_path = f"/grimorio/?spells={','.join(spells[:10])}&runes={','.join(runes)}&lazy=0"
+    probe_paths = [f"/api/spells?ids={','.join(spells[:10])}&compact=1&runes={runes[0]}",
+                   f"/grimorio/panel/{spells[0]}/?runes={runes[0]}"]
+
+    modes = list(MODES) if args.mode == "both" else [args.mode]
+    rows = [run_mode(mode, args, slow_path, probe_paths) for mode in modes]
+    report = {
+        "meta": metadata(suite="slow_clients", workers=args.workers, slow=args.slow, probes=args.probes,
+                         duration=args.duration, trickle=args.trickle, read_delay=args.read_delay,
+                         spells=args.spells, runes=args.runes),
+        "results": rows,
+    }
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    sys.exit(main())
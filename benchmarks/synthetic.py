@@ -0,0 +1,110 @@
+"""Gera um content/ sintético (N magias × M runas) no formato dos YAML reais.
+
+    python -m benchmarks.synthetic --spells 500 --runes 15 --out /tmp/grimorio-content
+
+Os arquivos imitam content/spells/dissipar-magia.yml: atributos com marcação do
+GM Binder ("** Ação"), manual com as tabelas vazias que o import limpa e um
+efeito por runa. Com a mesma semente o resultado é idêntico byte a byte.
+"""
+import argparse, os, random, sys
+import yaml
+
+RUNES = [("agua", "Água"), ("ar", "Ar"), ("eletricidade", "Eletricidade"), ("espaco", "Espaço"),
+         ("essencia", "Essência"), ("fogo", "Fogo"), ("gelo", "Gelo"), ("gravidade", "Gravidade"),
+         ("luz", "Luz"), ("mente", "Mente"), ("metal", "Metal"), ("som", "Som"),
+         ("tempo", "Tempo"), ("terra", "Terra"), ("trevas", "Trevas")]
+EXECUCAO = ["Ação", "Ação", "Ação", "Movimento", "Reação"]
+ALCANCE = ["Curto", "Médio", "Médio", "Toque", "Pessoal", "Longo"]
+DURACAO = ["Instantâneo", "Cena", "Concentração", "10 minutos (Concentração)"]
+ALVOS = ["Uma criatura", "Uma criatura voluntária", "Raio (6)", "Área conforme o Círculo da Magia",
+         "Uma criatura ou objeto no alcance"]
+DANOS = ["Fogo", "Frio", "Elétrico", "Essência", "Impacto", "Trevas", "Luz"]
+EMPTY_TABLE = ('<table>\n<thead>\n<tr>\n<th style="text-align: left;"></th>\n</tr>\n</thead>\n'
+               '<tbody>\n<tr>\n<td></td>\n</tr>\n</tbody>\n</table>')
+WORDS = ("energia arcana alvo criatura runa círculo conjurador efeito área magia dano "
+         "deslocamento escuridão chamas gelo tempestade portal essência").split()
+
+def rune_list(n_runes):
+    out = []
+    for i in range(n_runes):
+        slug, name = RUNES[i % len(RUNES)]
+        if i >= len(RUNES):
+            slug, name = f"{slug}-{i}", f"{name} {i}"
+        out.append((slug, name))
+    return out
+
+def _sentence(rnd, n=14):
+    words = [rnd.choice(WORDS) for _ in range(n)]
+    return words[0].capitalize() + " " + " ".join(words[1:]) + "."
+
+def spell_doc(i, runes, rnd):
+    slug = f"magia-sintetica-{i:05d}"
+    execucao, alcance = rnd.choice(EXECUCAO), rnd.choice(ALCANCE)
+    duracao, alvo = rnd.choice(DURACAO), rnd.choice(ALVOS)
+    attributes = {"execução": f"** {execucao}", "alcance": f"** {alcance}", "alvo": f"** {alvo}"}
+    if rnd.random() < 0.2:
+        attributes["área"] = "* ___"
+    manual = "\n\n".join([
+        f"<p><em>{_sentence(rnd, 30)}</em></p>", "<hr>",
+        "<ul>\n\n" + "\n\n".join([
+            f"<li><strong>Execução.</strong> {execucao}</li>",
+            f"<li><strong>Alcance.</strong> {alcance}</li>",
+            f"<li><strong>Alvo.</strong> {alvo}</li>",
+            f"<li><strong>Duração.</strong> {duracao}</li>",
+        ]) + "\n\n</ul>",
+        '<table>\n<thead>\n<tr>\n<th style="text-align: left;"></th>\n</tr>\n</thead>\n<tbody>\n'
+        f'<tr>\n<td style="text-align: left;">{_sentence(rnd, 20)}</td>\n</tr>\n</tbody>\n</table>',
+        EMPTY_TABLE,
+        "<ul>\n\n" + "\n\n".join(
+            f"<li><strong>Círculo {c}:</strong> Bônus de +{c} | {_sentence(rnd, 8)}</li>" for c in range(1, 6)
+        ) + "\n\n</ul>",
+        "<hr>", EMPTY_TABLE,
+    ])
+    effects = {}
+    for r_slug, _ in runes:
+        if rnd.random() < 0.9:
+            effects[r_slug] = (f"<p>Cada alvo recebe {rnd.randint(1, 4)} de dano de {rnd.choice(DANOS)} "
+                               f"para cada vez que você aplicar essa Runa. {_sentence(rnd)}</p>\n\n{EMPTY_TABLE}")
+    return slug, {
+        "slug": slug,
+        "name": f"MAGIA SINTÉTICA {i}",
+        "school": "",
+        "version": "1.0",
+        "attributes": attributes,
+        "manual_html": manual,
+        "rune_effects": effects,
+    }
+
+def generate(out, n_spells, n_runes=15, seed=0):
+    """Escreve out/spells/*.yml e out/runes/*.yml; devolve (slugs das magias, slugs das runas)."""
+    rnd = random.Random(seed)
+    runes = rune_list(n_runes)
+    os.makedirs(os.path.join(out, "spells"), exist_ok=True)
+    os.makedirs(os.path.join(out, "runes"), exist_ok=True)
+    for r_slug, r_name in runes:
+        doc = {"slug": r_slug, "name": r_name,
+               "description_html": f"<p>Descrição geral da Runa de {r_name}.</p>", "domain": "Elemental"}
+        _dump(os.path.join(out, "runes", f"{r_slug}.yml"), doc)
+    slugs = []
+    for i in range(n_spells):
+        slug, doc = spell_doc(i, runes, rnd)
+        _dump(os.path.join(out, "spells", f"{slug}.yml"), doc)
+        slugs.append(slug)
+    return slugs, [r for r, _ in runes]
+
+def _dump(path, doc):
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(doc, f, allow_unicode=True, sort_keys=False)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--spells", type=int, default=500)
+    ap.add_argument("--runes", type=int, default=15)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", required=True, help="Pasta de saída (com spells/ e runes/)")
+    args = ap.parse_args(argv)
+    spells, runes = generate(args.out, args.spells, args.runes, args.seed)
+    print(f"{len(spells)} magias e {len(runes)} runas em {args.out}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,16 @@
 from django.contrib import admin
-from .models import Spell, Rune
+from .models import Spell, Rune, SpellRuneEffect
+
+class SpellRuneEffectInline(admin.TabularInline):
+    model = SpellRuneEffect
+    extra = 0
+    autocomplete_fields = ('rune',)
 
 @admin.register(Spell)
 class SpellAdmin(admin.ModelAdmin):
     list_display = ('name','slug','updated_at','version')
     search_fields = ('name','slug')
+    inlines = (SpellRuneEffectInline,)
 
 @admin.register(Rune)
 class RuneAdmin(admin.ModelAdmin):
@@ -0,0 +1,80 @@
+import os, json, hashlib
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from grimorio.models import Spell, Rune, SpellRuneEffect, ContentVersion
+
+HASH_LEN = 12  # mesmo tamanho do hash do ManifestStaticFilesStorage (WHITENOISE_IMMUTABLE_FILE_TEST)
+
+def hashed_name(folder, stem, ext, data: bytes) -> str:
+    return f"{folder}/{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LEN]}.{ext}"
+
+def dump_json(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class Command(BaseCommand):
+    help = "Pré-renderiza painéis e JSON das magias em arquivos estáticos com hash (grimório sem banco)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--out", default=str(getattr(settings, "GRIMORIO_BUNDLE_DIR", "bundle")),
+                            help="Pasta de saída (servida em static/grimorio/bundle/)")
+        parser.add_argument("--keep-old", action="store_true", help="Não apaga fragmentos de builds anteriores")
+
+    def handle(self, *args, **opts):
+        out = opts["out"]
+        os.makedirs(os.path.join(out, "spells"), exist_ok=True)
+
+        runes = list(Rune.objects.order_by("name"))
+        effects = {}
+        for spell_id, rune_slug, html in SpellRuneEffect.objects.values_list("spell_id", "rune__slug", "html"):
+            effects.setdefault(spell_id, {})[rune_slug] = html
+
+        written, spells = set(), []
+        for sp in Spell.objects.order_by("name"):
+            effs = effects.get(sp.id, {})
+            panel = {"spell": sp, "attributes": sp.attributes_json or {}, "effects": effs}
+            data = dump_json({
+                "slug": sp.slug,
+                "name": sp.name,
+                "attributes": sp.attributes_json or {},
+                "panel": render_to_string("grimorio/_panel.html", {"p": panel, "runes": []}),
+                "cards": {
+                    r.slug: render_to_string("grimorio/_rune_card.html", {"r": r, "effect": effs[r.slug]})
+                    for r in runes if effs.get(r.slug)
+                },
+            })
+            name = hashed_name("spells", sp.slug, "json", data)
+            self.write(out, name, data)
+            written.add(name)
+            spells.append({"slug": sp.slug, "name": sp.name, "file": name})
+
+        manifest = {
+            "version": ContentVersion.current(),
+            "spells": spells,
+            "runes": [
+                {"slug": r.slug, "name": r.name,
+                 "card": render_to_string("grimorio/_rune_card.html", {"r": r, "effect": None})}
+                for r in runes
+            ],
+            "runes_block": render_to_string("grimorio/_runes.html", {"p": {}, "runes": []}),
+        }
+        self.write(out, "manifest.json", dump_json(manifest))
+        self.write(out, "index.html", render_to_string("grimorio/bundle_index.html").encode("utf-8"))
+
+        removed = 0
+        if not opts["keep_old"]:
+            for fname in os.listdir(os.path.join(out, "spells")):
+                if f"spells/{fname}" not in written:
+                    os.remove(os.path.join(out, "spells", fname)); removed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Bundle v{manifest['version']}: {len(spells)} magias, {len(runes)} runas em {out} "
+            f"({removed} fragmentos antigos removidos). Rode collectstatic em seguida."
+        ))
+
+    def write(self, out, name, data: bytes):
+        path = os.path.join(out, name)
+        if name.startswith("spells/") and os.path.exists(path):
+            return  # nome com hash: o conteúdo já é esse
+        with open(path, "wb") as f:
+            f.write(data)
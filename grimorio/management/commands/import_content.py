@@ -1,81 +1,213 @@
-import os, glob, yaml, bleach
+import os, glob, hashlib
+from concurrent.futures import ProcessPoolExecutor
 from django.core.management.base import BaseCommand, CommandError
-from grimorio.models import Spell, Rune
+from django.db import transaction
+from grimorio.models import Spell, Rune, SpellRuneEffect, ContentVersion
+from grimorio.services import catalog
+from grimorio.services.content import (parse_rune_file, parse_spell_file,
+                                       assign_ordinals, load_ordinals, save_ordinals, seed_ordinals)
 
-ALLOWED_TAGS = [
-    "p","ul","ol","li","em","strong","b","i","u",
-    "h2","h3","h4","h5","span","div","br",
-    "table","thead","tbody","tr","td","th","code","pre","blockquote"
-]
-ALLOWED_ATTRS = {"*": ["class","style"]}
+# Mude quando o tratamento do conteúdo mudar: força a reimportação de todos os arquivos.
+IMPORT_PIPELINE = "7"
+BATCH_SIZE = 500
 
-def sanitize_html(html: str) -> str:
-    return bleach.clean(html or "", tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS, strip=True)
+RUNE_FIELDS = ["name", "domain", "description_html", "content_hash", "updated_at"]
+SPELL_FIELDS = ["name", "school", "version", "manual_html", "attributes_json",
+                "execucao", "alcance", "duracao", "circles_json",
+                "manual_text", "search_text", "content_hash", "updated_at"]
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256(IMPORT_PIPELINE.encode())
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
 
 class Command(BaseCommand):
-    help = "Importa spells e runes da pasta content/"
+    help = "Importa spells e runes da pasta content/ (apenas arquivos alterados)"
 
     def add_arguments(self, parser):
         parser.add_argument("--content-root", default="content", help="Pasta raiz do conteúdo YAML")
         parser.add_argument("--strict", action="store_true", help="Falha se houver runa desconhecida em rune_effects")
+        parser.add_argument("--force", action="store_true", help="Reimporta todos os arquivos, mesmo sem alteração")
+        parser.add_argument("--jobs", type=int, default=1,
+                            help="Processos para parse/saneamento dos YAML (0 = um por CPU)")
+        parser.add_argument("--only", type=lambda v: [x for x in v.split(",") if x], default=None,
+                            help="Importa só estas magias (slugs separados por vírgula; runas sempre)")
+        parser.add_argument("--prune", action="store_true", help="Remove do banco magias/runas que não existem mais em content/")
 
     def handle(self, *args, **opts):
         root = opts["content_root"]
         spells_dir = os.path.join(root, "spells")
         runes_dir = os.path.join(root, "runes")
-        strict = opts["strict"]
+        self.strict = opts["strict"]
+        self.force = opts["force"]
+        only = opts["only"]
+        jobs = opts["jobs"] or os.cpu_count() or 1
 
         if not os.path.isdir(spells_dir) or not os.path.isdir(runes_dir):
             raise CommandError(f"Pastas esperadas: {spells_dir} e {runes_dir}")
 
-        self.stdout.write(self.style.NOTICE("Importando RUNAS..."))
-        known_runes = set()
-        for path in sorted(glob.glob(os.path.join(runes_dir, "*.yml"))):
-            with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
-            slug = data.get("slug")
-            if not slug:
-                self.stdout.write(self.style.WARNING(f"Runa sem slug em {path} — ignorada"))
+        self.jobs = jobs
+        self.bytes_saved = 0
+        self.pool = pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        try:
+            self.stdout.write(self.style.NOTICE("Importando RUNAS..."))
+            runes, rune_slugs, rune_stats = self.collect(Rune, runes_dir, "Runa", parse_rune_file, self.build_rune)
+            self.known_runes = rune_slugs
+            # runa nova: efeitos antes descartados nas magias inalteradas passam a valer
+            self.force = self.force or rune_stats["added"] > 0
+            self.effects = {}
+
+            self.stdout.write(self.style.NOTICE("Importando MAGIAS..."))
+            spells, spell_slugs, spell_stats = self.collect(Spell, spells_dir, "Magia", parse_spell_file, self.build_spell, only)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+        # números dos links de seleção: os do banco valem, slugs novos entram no fim, nada é renumerado
+        try:
+            ordinals = load_ordinals(root)
+        except ValueError as e:
+            raise CommandError(str(e))
+        seeded = (seed_ordinals(ordinals["runes"], self.stored_ordinals(Rune))
+                  | seed_ordinals(ordinals["spells"], self.stored_ordinals(Spell)))
+        new_runes = assign_ordinals(ordinals["runes"], sorted(rune_slugs))
+        new_spells = assign_ordinals(ordinals["spells"], sorted(spell_slugs))
+        if seeded or new_runes or new_spells:
+            save_ordinals(root, ordinals)
+
+        removed_runes = rune_stats["removed"]
+        removed_spells = spell_stats["removed"]
+        with transaction.atomic():
+            self.upsert(Rune, runes, RUNE_FIELDS)
+            self.upsert(Spell, spells, SPELL_FIELDS)
+            self.replace_effects()
+            if opts["prune"]:
+                Spell.objects.filter(slug__in=removed_spells).delete()
+                Rune.objects.filter(slug__in=removed_runes).delete()
+            renumbered = self.sync_ordinals(Rune, ordinals["runes"]) | self.sync_ordinals(Spell, ordinals["spells"])
+            changed = bool(runes or spells or renumbered or (opts["prune"] and (removed_spells or removed_runes)))
+            version = ContentVersion.bump() if changed else ContentVersion.current()
+        if changed:
+            catalog.invalidate()
+
+        for label, stats in (("Runas", rune_stats), ("Magias", spell_stats)):
+            self.stdout.write(
+                f"{label}: {stats['added']} novas, {stats['changed']} alteradas, "
+                f"{len(stats['removed'])} removidas{'' if opts['prune'] else ' (use --prune para apagar)'}, "
+                f"{stats['unchanged']} inalteradas"
+            )
+        if self.bytes_saved:
+            self.stdout.write(f"Normalização de HTML economizou {self.bytes_saved} bytes.")
+        self.stdout.write(self.style.SUCCESS(f"Importação concluída (conteúdo v{version})."))
+
+    def collect(self, model, folder, label, parse, build, only=None):
+        # hash -> slug do que já está no banco: arquivos inalterados nem são lidos/parseados
+        stored = dict(model.objects.exclude(content_hash="").values_list("content_hash", "slug"))
+        existing = set(model.objects.values_list("slug", flat=True))
+        objs, seen, pending = {}, set(), []
+        stats = {"added": 0, "changed": 0, "unchanged": 0}
+        paths = sorted(glob.glob(os.path.join(folder, "*.yml")))
+        if only is not None:
+            # arquivos do sync são <slug>.yml; importação parcial não aponta remoções
+            wanted = set(only)
+            paths = [p for p in paths if os.path.splitext(os.path.basename(p))[0] in wanted]
+        for path in paths:
+            digest = file_hash(path)
+            if not self.force and digest in stored:
+                seen.add(stored[digest])
+                stats["unchanged"] += 1
                 continue
-            obj, _ = Rune.objects.get_or_create(slug=slug)
-            obj.name = data.get("name", obj.name or slug)
-            obj.domain = data.get("domain", obj.domain)
-            obj.description_html = sanitize_html(data.get("description_html", ""))
-            obj.save()
-            known_runes.add(slug)
-            self.stdout.write(f"  ✓ {obj.name}")
-
-        self.stdout.write(self.style.NOTICE("Importando MAGIAS..."))
-        for path in sorted(glob.glob(os.path.join(spells_dir, "*.yml"))):
-            with open(path, "r", encoding="utf-8") as f:
-                data = yaml.safe_load(f) or {}
+            pending.append((path, digest))
+
+        # parse + bleach (CPU) nos processos auxiliares; escrita no banco fica no processo principal
+        parsed = self.parse_all(parse, [path for path, _ in pending])
+        for (path, digest), data in zip(pending, parsed):
             slug = data.get("slug")
             if not slug:
-                self.stdout.write(self.style.WARNING(f"Magia sem slug em {path} — ignorada"))
+                self.stdout.write(self.style.WARNING(f"{label} sem slug em {path} — ignorada"))
                 continue
-            spell, _ = Spell.objects.get_or_create(slug=slug)
-            spell.name = data.get("name", spell.name or slug)
-            spell.school = data.get("school", spell.school)
-            spell.version = data.get("version", spell.version or "1.0")
-            spell.manual_html = sanitize_html(data.get("manual_html", ""))
-            spell.attributes_json = data.get("attributes", {}) or {}
-
-            raw_effects = data.get("rune_effects", {}) or {}
-            rune_effects_json = {}
-            for r_slug, r_html in raw_effects.items():
-                if r_slug not in known_runes:
-                    msg = f"  ! Runa '{r_slug}' referenciada em {slug} não existe em content/runes"
-                    if strict:
-                        raise CommandError(msg)
-                    else:
-                        self.stdout.write(self.style.WARNING(msg))
-                rune_effects_json[r_slug] = sanitize_html(r_html)
-            spell.rune_effects_json = rune_effects_json
-            spell.save()
-
-            missing = sorted(list(known_runes - set(rune_effects_json.keys())))
-            if missing:
-                self.stdout.write(self.style.WARNING(f"  ! {spell.name} sem efeitos para: {', '.join(missing)}"))
-            self.stdout.write(f"  ✓ {spell.name} ({len(spell.rune_effects_json)} runas)")
-
-        self.stdout.write(self.style.SUCCESS("Importação concluída."))
+            if slug in objs:
+                self.stdout.write(self.style.WARNING(f"  ! slug '{slug}' repetido em {path} — prevalece o último"))
+            objs[slug] = build(slug, data, digest)
+            seen.add(slug)
+            stats["changed" if slug in existing else "added"] += 1
+        stats["removed"] = sorted(existing - seen) if only is None else []
+        return list(objs.values()), seen, stats
+
+    def parse_all(self, parse, paths):
+        if self.pool is None or len(paths) < 2:
+            return map(parse, paths)
+        return self.pool.map(parse, paths, chunksize=max(1, len(paths) // (self.jobs * 4)))
+
+    def upsert(self, model, objs, fields):
+        if objs:
+            model.objects.bulk_create(objs, batch_size=BATCH_SIZE, update_conflicts=True,
+                                      unique_fields=["slug"], update_fields=fields)
+
+    def stored_ordinals(self, model):
+        return dict(model.objects.filter(ordinal__isnull=False).values_list("slug", "ordinal"))
+
+    def sync_ordinals(self, model, table):
+        # também cobre linhas que o hash deixou de fora (ex.: banco anterior aos números)
+        stale = [obj for obj in model.objects.only("id", "slug", "ordinal") if obj.ordinal != table.get(obj.slug)]
+        for obj in stale:
+            obj.ordinal = table.get(obj.slug)
+        model.objects.bulk_update(stale, ["ordinal"], batch_size=BATCH_SIZE)
+        return bool(stale)
+
+    def replace_effects(self):
+        if not self.effects:
+            return
+        spell_ids = dict(Spell.objects.filter(slug__in=list(self.effects)).values_list("slug", "id"))
+        rune_ids = dict(Rune.objects.values_list("slug", "id"))
+        SpellRuneEffect.objects.filter(spell_id__in=spell_ids.values()).delete()
+        SpellRuneEffect.objects.bulk_create([
+            SpellRuneEffect(spell_id=spell_ids[s_slug], rune_id=rune_ids[r_slug], html=html, text=text, terms=terms)
+            for s_slug, effects in self.effects.items()
+            for r_slug, (html, text, terms) in effects.items()
+            if r_slug in rune_ids
+        ], batch_size=BATCH_SIZE)
+
+    def build_rune(self, slug, data, digest):
+        rune = Rune(
+            slug=slug,
+            name=data["name"] or slug,
+            domain=data["domain"],
+            description_html=data["description_html"],
+            content_hash=digest,
+        )
+        self.stdout.write(f"  ✓ {rune.name}")
+        return rune
+
+    def build_spell(self, slug, data, digest):
+        rune_effects = data["rune_effects"]
+        for r_slug in rune_effects:
+            if r_slug not in self.known_runes:
+                msg = f"  ! Runa '{r_slug}' referenciada em {slug} não existe em content/runes"
+                if self.strict:
+                    raise CommandError(msg)
+                else:
+                    self.stdout.write(self.style.WARNING(msg + " — efeito ignorado"))
+
+        spell = Spell(
+            slug=slug,
+            name=data["name"] or slug,
+            school=data["school"],
+            version=data["version"],
+            manual_html=data["manual_html"],
+            attributes_json=data["attributes"],
+            **data["facets"],
+            circles_json=data["circles"],
+            manual_text=data["manual_text"],
+            search_text=data["search_text"],
+            content_hash=digest,
+        )
+        self.effects[slug] = {r: (html, data["effect_texts"][r], data["effect_terms"][r])
+                              for r, html in rune_effects.items()}
+        missing = sorted(self.known_runes - set(rune_effects.keys()))
+        if missing:
+            self.stdout.write(self.style.WARNING(f"  ! {spell.name} sem efeitos para: {', '.join(missing)}"))
+        self.bytes_saved += data["bytes_saved"]
+        self.stdout.write(f"  ✓ {spell.name} ({len(rune_effects)} runas, -{data['bytes_saved']} bytes de HTML)")
+        return spell
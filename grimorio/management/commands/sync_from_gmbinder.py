@@ -1,8 +1,12 @@
-import os, re, yaml, requests
-from bs4 import BeautifulSoup, Tag
+import argparse, os, re, time, hashlib, yaml
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from bs4 import BeautifulSoup, Comment, Tag
 from django.core.management.base import BaseCommand, CommandError
 from django.core.management import call_command
 from unidecode import unidecode
+from grimorio.services import sources
+from grimorio.services.content import YamlDumper
+from grimorio.services.sources import DEFAULT_SECTIONS, SourceError
 
 def slugify(text: str) -> str:
     text = unidecode((text or "").strip().lower())
@@ -12,98 +16,228 @@ def slugify(text: str) -> str:
 
 def html_of(nodes): return "".join(str(n) for n in nodes if n is not None)
 
-def extract_spells(html: str):
-    soup = BeautifulSoup(html, "html.parser")
-    heads = soup.find_all(re.compile(r"^h[1-6]$"))
-    tops = [h.get_text(" ", strip=True).upper() for h in heads]
+HEADING_RE = re.compile(r"^h[1-6]$")
+RUNE_HEADING_RE = re.compile(r"^h[4-6]$")
+RUNE_NAME_RE = re.compile(r"RUNA\s+DE\s+(.+)", flags=re.I)
+WS_RE = re.compile(r"\s+")
+ATTR_KEYS = ["Execução","Alcance","Alvo","Área","Duração"]
+ATTR_RES = [
+    (k.lower(), re.compile(rf"{k}\s*[:\.]\s*([^•\|\n]+?)(?=\s{{1,3}}[•\|]\s|$)", flags=re.I))
+    for k in ATTR_KEYS
+]
 
+def default_parser() -> str:
     try:
-        i0 = next(i for i,t in enumerate(tops) if "MAGIAS ARCANAS" in t)
-    except StopIteration:
-        raise CommandError("Não encontrei a seção 'MAGIAS ARCANAS'.")
-    try:
-        i1 = next(i for i,t in enumerate(tops[i0+1:], start=i0+1) if "MAGIAS DIVINAS" in t)
-    except StopIteration:
-        i1 = len(heads)
-
-    spells = []
-    for i in range(i0+1, i1):
-        h = heads[i]
-        if h.name != "h3": continue
-        title = h.get_text(" ", strip=True)
-        if "LISTA DE MAGIAS" in title.upper(): continue
-
-        nodes, cur = [], h.next_sibling
-        while cur and not (isinstance(cur, Tag) and cur.name == "h3"):
-            if isinstance(cur, Tag) and cur.name in ("h1","h2") and "MAGIAS DIVINAS" in cur.get_text(" ", strip=True).upper():
-                break
-            nodes.append(cur); cur = cur.next_sibling
-
-        manual_nodes, rune_sections = [], []
-        in_runes, rname, rnodes = False, None, []
-        for n in nodes:
-            if isinstance(n, Tag) and re.match(r"^h[4-6]$", n.name or ""):
-                txt = n.get_text(" ", strip=True)
-                if "RUNA" in txt.upper():
-                    if rname is not None: rune_sections.append((rname, rnodes))
-                    m = re.search(r"RUNA\s+DE\s+(.+)", txt, flags=re.I)
-                    rname = (m.group(1) if m else txt).strip(); rnodes = []; in_runes = True; continue
-            (rnodes if in_runes else manual_nodes).append(n)
-        if rname is not None: rune_sections.append((rname, rnodes))
-
-        # atributos (best-effort)
-        import re
-        text_flat = re.sub(r"\s+", " ", BeautifulSoup(html_of(manual_nodes), "html.parser").get_text(" ", strip=True))
-        attrs, keys = {}, ["Execução","Alcance","Alvo","Área","Duração"]
-        for k in keys:
-            m = re.search(rf"{k}\s*[:\.]\s*([^•\|\n]+?)(?=\s{{1,3}}[•\|]\s|$)", text_flat, flags=re.I)
-            if m: attrs[k.lower()] = m.group(1).strip()
-
-        spells.append({
-            "name": title,
-            "slug": slugify(title),
-            "manual_html": html_of(manual_nodes).strip(),
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+def _containers(heads):
+    # ancestrais de algum título: o percurso desce neles (ex.: <div class="page"> do GM Binder)
+    seen = set()
+    for h in heads:
+        p = h.parent
+        while p is not None and id(p) not in seen:
+            seen.add(id(p)); p = p.parent
+    return seen
+
+def _blocks(node, containers):
+    for child in node.children:
+        if isinstance(child, Tag) and id(child) in containers:
+            yield from _blocks(child, containers)
+        else:
+            yield child
+
+def _text(node) -> str:
+    if isinstance(node, Tag):
+        return node.get_text(" ", strip=True)
+    if isinstance(node, Comment):
+        return ""
+    return str(node).strip()
+
+class _SpellBuilder:
+    __slots__ = ("title", "manual", "text", "runes", "rnodes")
+
+    def __init__(self, title):
+        self.title = title
+        self.manual, self.text, self.runes, self.rnodes = [], [], [], None
+
+    def start_rune(self, heading_text):
+        m = RUNE_NAME_RE.search(heading_text)
+        self.rnodes = []
+        self.runes.append(((m.group(1) if m else heading_text).strip(), self.rnodes))
+
+    def add(self, node):
+        if self.rnodes is not None:
+            self.rnodes.append(node)
+            return
+        self.manual.append(node)
+        t = _text(node)
+        if t: self.text.append(t)
+
+    def build(self):
+        text_flat = WS_RE.sub(" ", " ".join(self.text))
+        attrs = {}
+        for key, rx in ATTR_RES:
+            m = rx.search(text_flat)
+            if m: attrs[key] = m.group(1).strip()
+        return {
+            "name": self.title,
+            "slug": slugify(self.title),
+            "manual_html": html_of(self.manual).strip(),
             "attributes": attrs,
-            "rune_effects": { slugify(nm): html_of(ns).strip() for nm, ns in rune_sections },
-        })
+            "rune_effects": { slugify(nm): html_of(ns).strip() for nm, ns in self.runes },
+        }
+
+def extract_spells(html: str, parser: str = None, sections=DEFAULT_SECTIONS):
+    """Extrai as magias das `sections` ((início, fim), padrão 'MAGIAS ARCANAS'..'MAGIAS DIVINAS')
+    num único percurso do documento. Fim None = até o fim do documento."""
+    soup = BeautifulSoup(html, parser or default_parser())
+    heads = soup.find_all(HEADING_RE)
+    titles = [h.get_text(" ", strip=True).upper() for h in heads]
+    for start, _ in sections:
+        if not any(start in t for t in titles):
+            raise CommandError(f"Não encontrei a seção '{start}'.")
+
+    spells, cur, pending, end = [], None, list(sections), False  # end: False = fora de seção
+    for node in _blocks(soup, _containers(heads)):
+        if isinstance(node, Tag) and HEADING_RE.match(node.name):
+            txt = node.get_text(" ", strip=True)
+            up = txt.upper()
+            if end is not False and end is not None and end in up:
+                if cur is not None: spells.append(cur.build())
+                cur, end = None, False
+                if not pending: break
+            if end is False:
+                # o título que fecha uma seção pode abrir a próxima (ex.: 'MAGIAS DIVINAS')
+                for i, (start, stop) in enumerate(pending):
+                    if start in up:
+                        end = stop
+                        del pending[i]
+                        break
+                continue
+            if node.name == "h3":
+                if cur is not None: spells.append(cur.build())
+                cur = None if "LISTA DE MAGIAS" in up else _SpellBuilder(txt)
+                continue
+            if cur is not None and RUNE_HEADING_RE.match(node.name) and "RUNA" in up:
+                cur.start_rune(txt)
+                continue
+        if cur is not None:
+            cur.add(node)
+    if cur is not None: spells.append(cur.build())
     return spells
 
+def spell_yaml(sp) -> str:
+    return yaml.dump({
+        "slug": sp["slug"],
+        "name": sp["name"],
+        "school": "",
+        "version": "1.0",
+        "attributes": sp["attributes"],
+        "manual_html": sp["manual_html"],
+        "rune_effects": sp["rune_effects"],
+    }, Dumper=YamlDumper, sort_keys=False, allow_unicode=True)
+
+def write_if_changed(path: str, text: str) -> bool:
+    data = text.encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+class _SourceAction(argparse.Action):
+    """--url/--from-file: [é_url, local, seções] na ordem da linha de comando."""
+
+    def __call__(self, parser, namespace, value, option_string=None):
+        setattr(namespace, self.dest, [*(getattr(namespace, self.dest, None) or []), [self.const, value, None]])
+
+class _SourceSectionsAction(argparse.Action):
+    """--source-sections: seções da fonte imediatamente anterior."""
+
+    def __call__(self, parser, namespace, value, option_string=None):
+        entries = getattr(namespace, "sources", None)
+        if not entries:
+            parser.error(f"{option_string} vem depois da --url/--from-file a que se refere")
+        if entries[-1][2] is not None:
+            parser.error(f"{option_string} repetido para {entries[-1][1]}")
+        entries[-1][2] = value
+
 class Command(BaseCommand):
-    help = "Baixa o manual do GM Binder, extrai magias/efeitos e importa no app."
+    help = ("Baixa (ou lê) manuais do GM Binder em paralelo, extrai magias/efeitos das seções pedidas, "
+            "junta tudo e importa só o que mudou.")
 
     def add_arguments(self, p):
-        p.add_argument("--url", required=True, help="URL pública do GM Binder")
+        p.add_argument("--url", dest="sources", action=_SourceAction, const=True, default=[],
+                       help="URL pública do GM Binder (repetível)")
+        p.add_argument("--from-file", dest="sources", action=_SourceAction, const=False, default=[],
+                       help="HTML do manual salvo localmente (repetível; '-' lê da entrada padrão)")
+        p.add_argument("--source-sections", action=_SourceSectionsAction, metavar="SECOES",
+                       help="Seções só da --url/--from-file anterior: 'INICIO..FIM;INICIO2..'")
+        p.add_argument("--section", action="append", default=None,
+                       help="Seções padrão das fontes sem --source-sections: 'INICIO..FIM' ou 'INICIO..' "
+                            "(repetível; padrão 'MAGIAS ARCANAS..MAGIAS DIVINAS')")
         p.add_argument("--out-root", default="content", help="Pasta content/ para YAML")
+        p.add_argument("--cache-dir", default=os.path.join(".cache", "gmbinder"),
+                       help="Onde guardar a última cópia baixada (para GET condicional)")
+        p.add_argument("--force", action="store_true", help="Ignora o cache e reprocessa tudo")
         p.add_argument("--strict", action="store_true", help="Falhar se houver magia com runa desconhecida")
+        p.add_argument("--parser", choices=["lxml", "html.parser"], default=None,
+                       help="Parser HTML (padrão: lxml se instalado)")
+        p.add_argument("--workers", type=int, default=4, help="Downloads simultâneos")
+        p.add_argument("--jobs", type=int, default=0,
+                       help="Processos para extrair os manuais (0 = um por CPU, no máximo um por fonte)")
+        p.add_argument("--timeout", type=float, default=60, help="Timeout (s) de conexão/leitura por tentativa")
+        p.add_argument("--retries", type=int, default=3, help="Novas tentativas em erro de rede, 429 e 5xx")
+        p.add_argument("--on-conflict", choices=sources.CONFLICT_POLICIES, default="error",
+                       help="Mesmo slug com conteúdo diferente em duas fontes: falhar, manter a primeira ou a última")
 
     def handle(self, *a, **o):
-        url = o["url"]; out_root = o["out_root"]; strict = o["strict"]
+        out_root = o["out_root"]; strict = o["strict"]; force = o["force"]
         spells_dir = os.path.join(out_root, "spells")
         runes_dir  = os.path.join(out_root, "runes")
-        os.makedirs(spells_dir, exist_ok=True); os.makedirs(runes_dir, exist_ok=True)
 
-        self.stdout.write(self.style.NOTICE(f"Baixando: {url}"))
-        r = requests.get(url, timeout=60); r.raise_for_status()
-        spells = extract_spells(r.text)
+        try:
+            sections = (tuple(sec for spec in o["section"] for sec in sources.parse_sections(spec))
+                        if o["section"] else DEFAULT_SECTIONS)
+            srcs = [sources.parse_source(location, is_url, spec, sections) for is_url, location, spec in o["sources"]]
+        except SourceError as e:
+            raise CommandError(str(e))
+        if not srcs:
+            raise CommandError("Informe ao menos uma fonte: --url ou --from-file.")
+
+        collected = self.collect(srcs, o)
+        if collected is None:
+            self.stdout.write(self.style.SUCCESS("Manuais sem alterações desde a última importação."))
+            return
+        batches, htmls = collected
+        spells, conflicts = sources.merge_spells(batches, o["on_conflict"])
+        for slug, kept, dropped in conflicts:
+            msg = f"  ! slug '{slug}' em {kept} e {dropped} com conteúdos diferentes"
+            if o["on_conflict"] == "error":
+                self.stderr.write(msg)
+            else:
+                self.stdout.write(self.style.WARNING(f"{msg} — vale {kept}"))
+        if conflicts and o["on_conflict"] == "error":
+            raise CommandError(f"{len(conflicts)} conflito(s) de slug entre as fontes; "
+                               "use --on-conflict first|last ou ajuste as seções.")
         if not spells:
             raise CommandError("Nenhuma magia encontrada; verifique a estrutura do manual.")
+        os.makedirs(spells_dir, exist_ok=True); os.makedirs(runes_dir, exist_ok=True)
 
-        seen_runes = set()
+        changed, seen_runes = [], set()
         for sp in spells:
-            y = {
-                "slug": sp["slug"],
-                "name": sp["name"],
-                "school": "",
-                "version": "1.0",
-                "attributes": sp["attributes"],
-                "manual_html": sp["manual_html"],
-                "rune_effects": sp["rune_effects"],
-            }
-            with open(os.path.join(spells_dir, f"{sp['slug']}.yml"), "w", encoding="utf-8") as f:
-                yaml.safe_dump(y, f, sort_keys=False, allow_unicode=True)
+            path = os.path.join(spells_dir, f"{sp['slug']}.yml")
+            if write_if_changed(path, spell_yaml(sp)) or force:
+                changed.append(sp["slug"])
+                self.stdout.write(f"  • {sp['name']} ({len(sp['rune_effects'])} runas)")
             seen_runes.update(sp["rune_effects"].keys())
-            self.stdout.write(f"  • {sp['name']} ({len(sp['rune_effects'])} runas)")
 
+        new_runes = []
         for rs in sorted(seen_runes):
             path = os.path.join(runes_dir, f"{rs}.yml")
             if not os.path.exists(path):
@@ -112,6 +246,67 @@ class Command(BaseCommand):
                         "slug": rs, "name": rs.replace("-", " ").title(),
                         "description_html": "", "domain": ""
                     }, f, sort_keys=False, allow_unicode=True)
+                new_runes.append(rs)
+
+        self.stdout.write(f"{len(changed)} de {len(spells)} magias alteradas; {len(new_runes)} runas novas.")
+        if changed or new_runes:
+            self.stdout.write(self.style.SUCCESS(f"YAML atualizado em {out_root}/spells e {out_root}/runes"))
+        # todas as magias das fontes: o import_content pula pelo hash as que o banco já tem, e
+        # YAML gravado por uma execução que falhou antes de importar entra agora
+        call_command("import_content", content_root=out_root, strict=strict, force=force,
+                     only=[sp["slug"] for sp in spells], jobs=o["jobs"], stdout=self.stdout, stderr=self.stderr)
+        for src, html in zip(srcs, htmls):
+            sources.mark_imported(src, html, o["cache_dir"])
+
+    def collect(self, srcs, o):
+        """([(fonte, magias)], [html]) na ordem das fontes, ou None se nenhuma mudou desde a última importação.
+
+        Downloads em threads (Session com pool); cada manual que chega já vai para a extração
+        (processos), então o total fica perto do manual mais lento, não da soma.
+        """
+        jobs = min(o["jobs"] or os.cpu_count() or 1, len(srcs))
+        session = sources.make_session(o["retries"], pool_size=max(1, o["workers"]))
+        parsed, deferred, htmls = {}, [], [None] * len(srcs)
+        started = time.perf_counter()
+        pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, o["workers"])) as fetchers:
+                loads = {fetchers.submit(sources.load, src, session, o["cache_dir"], o["force"], o["timeout"]): i
+                         for i, src in enumerate(srcs)}
+                for fut in as_completed(loads):
+                    i = loads[fut]
+                    try:
+                        html, changed = fut.result()
+                    except SourceError as e:
+                        for other in loads:
+                            other.cancel()
+                        raise CommandError(str(e))
+                    htmls[i] = html
+                    self.stdout.write(self.style.NOTICE(
+                        f"  ↓ {srcs[i].location} ({len(html) // 1024} KB, {time.perf_counter() - started:.2f}s)"
+                        + ("" if changed else " — sem alterações")))
+                    if changed:
+                        parsed[i] = self.extract(pool, html, o["parser"], srcs[i].sections)
+                    else:
+                        deferred.append((i, html))
+            if not parsed:
+                return None
+            # algum manual mudou: os inalterados também entram, para a junção ver todos os slugs
+            for i, html in deferred:
+                parsed[i] = self.extract(pool, html, o["parser"], srcs[i].sections)
+            batches = []
+            for i, src in enumerate(srcs):
+                spells = parsed[i].result() if pool else parsed[i]
+                if not spells:
+                    self.stdout.write(self.style.WARNING(f"  ! {src.location}: nenhuma magia nas seções pedidas"))
+                batches.append((src.location, spells))
+            return batches, htmls
+        finally:
+            session.close()
+            if pool:
+                pool.shutdown(cancel_futures=True)
 
-        self.stdout.write(self.style.SUCCESS(f"YAML gerado em {out_root}/spells e {out_root}/runes"))
-        call_command("import_content", content_root=out_root, strict=strict)
+    def extract(self, pool, html, parser, sections):
+        if pool is None:
+            return extract_spells(html, parser, sections)
+        return pool.submit(extract_spells, html, parser, sections)
@@ -0,0 +1,201 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+from grimorio.services import compression, metrics
+
+class PerformanceMiddleware:
+    """Mede consultas/tempo de banco, render de template, bytes e latência de cada view.
+
+    Alimenta `metrics.histogram` (consultável por staff em /api/_perf) e expõe os números no
+    cabeçalho `Server-Timing` (em DEBUG ou GRIMORIO_SERVER_TIMING; senão só para staff). Roda síncrono (WSGI) ou assíncrono (ASGI).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        metrics.histogram.size = getattr(settings, 'GRIMORIO_PERF_SAMPLES', 1000)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            # no ASGI o ORM roda em threads com conexões próprias: o wrapper vai em cada
+            # conexão nova e acha o Recorder da requisição pelo contextvar
+            connection_created.connect(metrics.install_db_wrapper, dispatch_uid='grimorio_perf')
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not getattr(settings, 'GRIMORIO_PERF_ENABLED', True):
+            return self.get_response(request)
+        rec, token = metrics.start()
+        try:
+            with connection.execute_wrapper(rec.db_wrapper):
+                response = self.get_response(request)
+        finally:
+            metrics.stop(token)
+        return self._finish(request, response, rec)
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'GRIMORIO_PERF_ENABLED', True):
+            return await self.get_response(request)
+        rec, token = metrics.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop(token)
+        return self._finish(request, response, rec)
+
+    def _finish(self, request, response, rec):
+        total = rec.elapsed_ms()
+        tpl = rec.spans.get('tpl', 0.0)
+        size = None if response.streaming else len(response.content)
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        metrics.histogram.add(view, (total, rec.db_ms, rec.db_count, tpl, size))
+
+        if _server_timing(request, response):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={rec.db_ms:.1f};desc="{rec.db_count} queries"',
+                f'tpl;dur={tpl:.1f}',
+                *(f'{name};dur={ms:.1f}' for name, ms in sorted(rec.spans.items()) if name != 'tpl'),
+                f'total;dur={total:.1f}',
+            ])
+        return response
+
+class CompressionMiddleware:
+    """gzip/Brotli (Accept-Encoding) nas respostas dinâmicas com pelo menos GRIMORIO_COMPRESS_MIN_BYTES.
+
+    Respostas públicas com ETag são determinísticas: o corpo comprimido vem do cache por
+    (codificação, hash do corpo). As privadas são comprimidas a cada vez. Nível moderado nas duas.
+    Estáticos ficam com o WhiteNoise (que já serve .gz/.br prontos) e streaming passa direto.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.process(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._eligible(response):
+            # cache e compressão são síncronos (e a compressão gasta CPU): fora do event loop
+            return await sync_to_async(self.process)(request, response)
+        return self.process(request, response)
+
+    def _eligible(self, response):
+        return (response.status_code == 200 and not response.streaming
+                and not response.has_header('Content-Encoding')
+                and response.get('Content-Type', '').startswith(compression.COMPRESSIBLE_TYPES)
+                and len(response.content) >= getattr(settings, 'GRIMORIO_COMPRESS_MIN_BYTES', 1024))
+
+    def process(self, request, response):
+        if response.status_code == 304:
+            # o 304 repete o Vary da resposta completa
+            patch_vary_headers(response, ('Accept-Encoding',))
+            return response
+        if not self._eligible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+        etag = response.get('ETag')
+        if etag and _is_public(response):
+            body = compression.cached_compress(response.content, encoding)
+        else:
+            with metrics.span(encoding):
+                body = compression.compress(response.content, encoding, cacheable=False)
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        if etag and etag.startswith('"'):
+            # outra representação do mesmo recurso: ETag fraco (RFC 9110 8.8.1), como o GZipMiddleware
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+def _server_timing(request, response):
+    # números internos: fora do DEBUG só para staff e em respostas que nenhum cache compartilhado guarda
+    if getattr(settings, 'GRIMORIO_SERVER_TIMING', settings.DEBUG):
+        return True
+    user = getattr(request, 'user', None)
+    return not _is_public(response) and user is not None and user.is_staff
+
+def _is_public(response):
+    directives = {d.strip().split('=', 1)[0].lower() for d in response.get('Cache-Control', '').split(',')}
+    return 'public' in directives and 'no-store' not in directives
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise que também roda assíncrono.
+
+    O WhiteNoiseMiddleware é só síncrono: no ASGI ele obrigaria toda a pilha a passar por
+    uma thread em cada requisição. Aqui o arquivo é achado no dicionário em memória e só
+    a abertura/stat dele vai para uma thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        return await sync_to_async(self.serve)(static_file, request)
+
+class AsyncStreamingMiddleware:
+    """No ASGI, streaming com iterador síncrono (arquivo, NDJSON) vira assíncrono, lido bloco a bloco.
+
+    Sem isso o handler ASGI do Django consome o iterador inteiro numa lista antes de enviar.
+    Independe do GRIMORIO_PERF_ENABLED; no WSGI não faz nada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = _aiter(response.streaming_content)
+        return response
+
+async def _aiter(iterable):
+    # na thread da requisição (thread_sensitive): o cursor do export continua na mesma conexão
+    it = iter(iterable)
+    while (chunk := await sync_to_async(next)(it, None)) is not None:
+        yield chunk
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grimorio', '0002_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rune',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
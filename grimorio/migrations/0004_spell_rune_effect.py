@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_rune_effects(apps, schema_editor):
+    Spell = apps.get_model('grimorio', 'Spell')
+    Rune = apps.get_model('grimorio', 'Rune')
+    SpellRuneEffect = apps.get_model('grimorio', 'SpellRuneEffect')
+    rune_ids = dict(Rune.objects.values_list('slug', 'id'))
+    effects = [
+        SpellRuneEffect(spell_id=spell_id, rune_id=rune_ids[r_slug], html=html or '')
+        for spell_id, data in Spell.objects.values_list('id', 'rune_effects_json').iterator(chunk_size=200)
+        for r_slug, html in (data or {}).items()
+        if r_slug in rune_ids
+    ]
+    SpellRuneEffect.objects.bulk_create(effects, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grimorio', '0003_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpellRuneEffect',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('html', models.TextField(blank=True, default='')),
+                ('rune', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spell_effects', to='grimorio.rune')),
+                ('spell', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rune_effects', to='grimorio.spell')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['rune', 'spell'], name='spell_rune_effect_rune_idx')],
+                'constraints': [models.UniqueConstraint(fields=('spell', 'rune'), name='uniq_spell_rune_effect')],
+            },
+        ),
+        migrations.RunPython(copy_rune_effects, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='spell',
+            name='rune_effects_json',
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:08
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+
+# Só no Postgres: índice GIN gerado pelo próprio SearchVector, então a expressão é a mesma
+# que services/search.py consulta.
+INDEX_NAME = 'grimorio_spell_search_gin'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        Spell = apps.get_model('grimorio', 'Spell')
+        schema_editor.add_index(Spell, GinIndex(SearchVector('search_text', config='simple'), name=INDEX_NAME))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grimorio', '0004_spell_rune_effect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spell',
+            name='manual_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='search_text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='spellruneeffect',
+            name='text',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
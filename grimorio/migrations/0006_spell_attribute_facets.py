@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:15
+
+from django.db import migrations, models
+
+# Sem backfill aqui: os valores vêm do import_content (IMPORT_PIPELINE força a
+# reimportação), assim a migração não depende do código atual de services/.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grimorio', '0005_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spell',
+            name='alcance',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='duracao',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='execucao',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=16),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:19
+
+from django.db import migrations, models
+
+# Sem backfill aqui: os valores vêm do import_content (IMPORT_PIPELINE força a
+# reimportação), assim a migração não depende do código atual de services/.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grimorio', '0006_spell_attribute_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spell',
+            name='circles_json',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='spellruneeffect',
+            name='terms',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 10:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grimorio', '0007_effect_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rune',
+            name='ordinal',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='spell',
+            name='ordinal',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -11,6 +11,9 @@ class Rune(TimeStampedModel):
     name = models.CharField(max_length=120)
     description_html = models.TextField(blank=True, default="")
     domain = models.CharField(max_length=64, blank=True, default="")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    # número estável do bitset das URLs de seleção (content/ordinals.yml, import_content)
+    ordinal = models.PositiveIntegerField(null=True, blank=True, unique=True)
     def __str__(self):
         return self.name
 
@@ -20,8 +23,66 @@ class Spell(TimeStampedModel):
     school = models.CharField(max_length=64, blank=True, default="")
     manual_html = models.TextField()
     attributes_json = models.JSONField(default=dict, blank=True)
-    rune_effects_json = models.JSONField(default=dict, blank=True)
     version = models.CharField(max_length=16, blank=True, default="1.0")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    # busca: texto puro do manual e texto normalizado (sem acento, minúsculo) de nome + manual + efeitos
+    manual_text = models.TextField(blank=True, default="")
+    search_text = models.TextField(blank=True, default="")
+    # atributos normalizados na importação (services/content.py: ATTRIBUTE_ENUMS); "" = fora do padrão
+    execucao = models.CharField(max_length=16, blank=True, default="", db_index=True)
+    alcance = models.CharField(max_length=16, blank=True, default="", db_index=True)
+    duracao = models.CharField(max_length=16, blank=True, default="", db_index=True)
+    # lista "Círculo N: ..." do manual (services/effects.py: parse_circles)
+    circles_json = models.JSONField(default=dict, blank=True)
+    # número estável do bitset das URLs de seleção (content/ordinals.yml, import_content)
+    ordinal = models.PositiveIntegerField(null=True, blank=True, unique=True)
 
     def __str__(self):
         return self.name
+
+class SpellRuneEffect(models.Model):
+    spell = models.ForeignKey(Spell, on_delete=models.CASCADE, related_name='rune_effects')
+    rune = models.ForeignKey(Rune, on_delete=models.CASCADE, related_name='spell_effects')
+    html = models.TextField(blank=True, default="")
+    text = models.TextField(blank=True, default="")
+    # termos de dano, condição, modificador etc. extraídos do texto (services/effects.py: parse_effect_terms)
+    terms = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['spell', 'rune'], name='uniq_spell_rune_effect'),
+        ]
+        indexes = [models.Index(fields=['rune', 'spell'], name='spell_rune_effect_rune_idx')]
+
+    def __str__(self):
+        return f"{self.spell} × {self.rune}"
+
+# Carimbo global do conteúdo; `import_content` incrementa a cada importação.
+class ContentVersion(models.Model):
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def current(cls):
+        return cls.stamp()[0]
+
+    @classmethod
+    def stamp(cls):
+        obj = cls.objects.filter(pk=1).first()
+        return (obj.version, obj.updated_at) if obj else (0, None)
+
+    @classmethod
+    async def astamp(cls):
+        obj = await cls.objects.filter(pk=1).afirst()
+        return (obj.version, obj.updated_at) if obj else (0, None)
+
+    @classmethod
+    def bump(cls):
+        obj, _ = cls.objects.get_or_create(pk=1)
+        obj.version = models.F('version') + 1
+        obj.save()
+        obj.refresh_from_db()
+        return obj.version
+
+    def __str__(self):
+        return f"v{self.version}"
@@ -1,2 +1,24 @@
-def build_spell_panels(spells):
-    return [{'spell': sp, 'attributes': sp.attributes_json or {}} for sp in spells]
+from grimorio.services.fragments import cached_panels, render_panel
+from grimorio.services.selectors import get_rune_effects
+
+def build_spell_panels(spells, runes, version, eager=None):
+    """Painéis com 'html' renderizado (do cache quando possível).
+
+    Com `eager`, só os primeiros `eager` painéis são renderizados; os demais ficam com
+    'html' None para o navegador buscar sob demanda (modo preguiçoso).
+    """
+    runes = list(runes)
+    rune_slugs = [r.slug for r in runes]
+    panels = [{'spell': sp, 'attributes': sp.attributes_json or {}, 'html': None} for sp in spells]
+    todo = panels if eager is None else panels[:eager]
+    cached = cached_panels([p['spell'].slug for p in todo], rune_slugs, version)
+    # efeitos só são buscados para os painéis que ainda não estão no cache
+    missing = [p for p in todo if p['spell'].slug not in cached]
+    effects = get_rune_effects([p['spell'].slug for p in missing], rune_slugs) if missing and runes else {}
+    for p in todo:
+        html = cached.get(p['spell'].slug)
+        if html is None:
+            p['effects'] = effects.get(p['spell'].slug, {})
+            html = render_panel(p, runes, version)
+        p['html'] = html
+    return panels
@@ -0,0 +1,100 @@
+import threading, time
+from types import MappingProxyType
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from grimorio.models import Spell, Rune, SpellRuneEffect, ContentVersion
+
+# Snapshot imutável do catálogo, construído uma vez por processo (worker)
+# e descartado quando o carimbo de ContentVersion muda.
+class Catalog:
+    __slots__ = ('version', 'updated_at', 'spells', 'runes', 'effects')
+
+    def __init__(self, version, updated_at, spells, runes, effects):
+        self.version = version
+        self.updated_at = updated_at
+        self.spells = MappingProxyType({s.slug: s for s in spells})
+        self.runes = MappingProxyType({r.slug: r for r in runes})
+        self.effects = MappingProxyType({k: MappingProxyType(v) for k, v in effects.items()})
+
+    def spells_by_slugs(self, slugs):
+        found = {self.spells[s] for s in slugs if s in self.spells}
+        return sorted(found, key=lambda s: s.name)
+
+    def runes_by_slugs(self, slugs):
+        found = {self.runes[s] for s in slugs if s in self.runes}
+        return sorted(found, key=lambda r: r.name)
+
+    def effects_for(self, spell_slugs, rune_slugs=None):
+        empty = MappingProxyType({})
+        if rune_slugs is None:
+            return {s: dict(self.effects.get(s, empty)) for s in spell_slugs}
+        wanted = set(rune_slugs)
+        return {s: {r: html for r, html in self.effects.get(s, empty).items() if r in wanted}
+                for s in spell_slugs}
+
+_lock = threading.Lock()
+_snapshot = None
+_checked_at = 0.0
+
+def snapshot_enabled():
+    return getattr(settings, 'GRIMORIO_CATALOG_SNAPSHOT', True)
+
+def _build(version, updated_at):
+    # manual_text/search_text só servem à busca, que lê do banco
+    spells = list(Spell.objects.defer('manual_text', 'search_text').order_by('name'))
+    runes = list(Rune.objects.order_by('name'))
+    # efeitos na ordem das runas, como na página
+    effects = {}
+    rows = (SpellRuneEffect.objects.order_by('rune__name')
+            .values_list('spell__slug', 'rune__slug', 'html'))
+    for spell_slug, rune_slug, html in rows:
+        effects.setdefault(spell_slug, {})[rune_slug] = html
+    return Catalog(version, updated_at, spells, runes, effects)
+
+def get_catalog():
+    global _snapshot, _checked_at
+    ttl = getattr(settings, 'GRIMORIO_CATALOG_TTL', 2.0)
+    now = time.monotonic()
+    snap = _snapshot
+    if snap is not None and now - _checked_at < ttl:
+        return snap
+    version, updated_at = ContentVersion.stamp()
+    if snap is not None and snap.version == version:
+        _checked_at = now
+        return snap
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _build(version, updated_at)
+        _checked_at = now
+        return _snapshot
+
+async def aget_catalog():
+    """get_catalog() para views assíncronas: só sai do event loop quando precisa ir ao banco."""
+    snap = _snapshot
+    if snap is not None and time.monotonic() - _checked_at < getattr(settings, 'GRIMORIO_CATALOG_TTL', 2.0):
+        return snap
+    return await sync_to_async(get_catalog)()
+
+def invalidate():
+    global _snapshot, _checked_at
+    with _lock:
+        _snapshot = None
+        _checked_at = 0.0
+
+def content_stamp():
+    if snapshot_enabled():
+        snap = get_catalog()
+        return snap.version, snap.updated_at
+    return ContentVersion.stamp()
+
+def content_version():
+    return content_stamp()[0]
+
+async def acontent_stamp():
+    if snapshot_enabled():
+        snap = await aget_catalog()
+        return snap.version, snap.updated_at
+    return await ContentVersion.astamp()
+
+async def acontent_version():
+    return (await acontent_stamp())[0]
@@ -0,0 +1,71 @@
+# Compressão das respostas dinâmicas (HTML do grimório, JSON da API) com gzip ou Brotli.
+# Respostas públicas com ETag são determinísticas: o corpo comprimido fica no cache de
+# fragmentos por (codificação, hash do corpo original) e é comprimido uma vez só. O ETag
+# não serve de chave: alguns são derivados da requisição, não do corpo.
+import gzip, hashlib, re
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.text import compress_string
+from grimorio.services.metrics import span
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote, só gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+                      'application/xml', 'image/svg+xml')
+_CODING = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([\d.]+))?\s*$')
+
+def _cache():
+    return caches[getattr(settings, 'GRIMORIO_FRAGMENT_CACHE', 'default')]
+
+def available():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def negotiate(accept_encoding):
+    """Melhor codificação aceita pelo cliente ('br' > 'gzip'), ou None.
+
+    'gzip, br' -> 'br'; 'br;q=0, gzip' -> 'gzip'; '*' vale para as não citadas.
+    """
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        m = _CODING.match(part)
+        if not m:
+            continue
+        try:
+            weights[m.group(1).lower()] = float(m.group(2)) if m.group(2) else 1.0
+        except ValueError:
+            continue
+    star = weights.get('*', 0.0)
+    scored = [(weights.get(enc, star), enc) for enc in available()]
+    q, enc = max(scored, key=lambda s: s[0])  # empate: ordem de available()
+    return enc if q > 0 else None
+
+def compress(data, encoding, cacheable):
+    """Comprime no caminho da requisição, em nível moderado (Brotli 5, gzip 6).
+
+    O corpo de /grimorio/ muda a cada seleção e quase nunca se repete: o nível máximo
+    (Brotli 11) custaria dezenas de ms por resposta para poupar poucos bytes.
+    Cacheável: sem bytes aleatórios (vai para o cache). As demais (privadas, com token CSRF)
+    usam, no gzip, os bytes aleatórios do Django contra BREACH.
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=getattr(settings, 'GRIMORIO_BROTLI_QUALITY', 5))
+    if cacheable:
+        return gzip.compress(data, compresslevel=getattr(settings, 'GRIMORIO_GZIP_LEVEL', 6), mtime=0)
+    return compress_string(data, max_random_bytes=getattr(settings, 'GRIMORIO_COMPRESS_RANDOM_BYTES', 100))
+
+def compressed_key(data, encoding):
+    return f"grimorio:z:{encoding}:{hashlib.blake2b(data, digest_size=20).hexdigest()}"
+
+def cached_compress(data, encoding):
+    """Corpo comprimido do cache por (codificação, hash de `data`); comprime e guarda na primeira vez."""
+    key = compressed_key(data, encoding)
+    body = _cache().get(key)
+    if body is None:
+        with span(encoding):
+            body = compress(data, encoding, cacheable=True)
+        if len(body) <= getattr(settings, 'GRIMORIO_FRAGMENT_MAX_BYTES', 512 * 1024):
+            _cache().set(key, body, getattr(settings, 'GRIMORIO_FRAGMENT_TTL', None))
+    return body
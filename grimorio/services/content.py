@@ -0,0 +1,227 @@
+# Leitura e saneamento dos YAML de content/. Sem dependência do ORM para
+# poder rodar em processos auxiliares (import_content --jobs N).
+import os, re, yaml, bleach
+from bs4 import BeautifulSoup, NavigableString, Comment
+from grimorio.services.effects import parse_circles, parse_effect_terms
+from grimorio.services.text import fold
+
+try:
+    YamlLoader = yaml.CSafeLoader  # libyaml, bem mais rápido que o loader em Python puro
+    YamlDumper = yaml.CSafeDumper
+except AttributeError:
+    YamlLoader = yaml.SafeLoader
+    YamlDumper = yaml.SafeDumper
+
+ALLOWED_TAGS = [
+    "p","ul","ol","li","em","strong","b","i","u",
+    "h2","h3","h4","h5","span","div","br",
+    "table","thead","tbody","tr","td","th","code","pre","blockquote"
+]
+ALLOWED_ATTRS = {"*": ["class","style"]}
+
+def sanitize_html(html: str) -> str:
+    return bleach.clean(html or "", tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRS, strip=True)
+
+# Espaço em branco entre dois blocos (ou entre um bloco e a borda do contêiner) não aparece na página.
+BLOCK_TAGS = {"p","ul","ol","li","h2","h3","h4","h5","div","table","thead","tbody","tr","td","th","pre","blockquote"}
+VOID_TAGS = {"br"}
+_WS = re.compile(r"\s+")
+
+def _is_empty(tag) -> bool:
+    return not tag.get_text(strip=True) and not tag.find(VOID_TAGS)
+
+def _is_block(node) -> bool:
+    return getattr(node, "name", None) in BLOCK_TAGS
+
+def _sibling(node, attr):
+    # pula outros espaços em branco (ex.: o que sobrou em volta de uma tabela vazia removida)
+    node = getattr(node, attr)
+    while isinstance(node, NavigableString) and not node.strip():
+        node = getattr(node, attr)
+    return node
+
+def _between_blocks(text) -> bool:
+    # borda do contêiner só conta se ele for bloco: em <strong> o espaço pode separar palavras
+    edge = text.parent.name == "[document]" or _is_block(text.parent)
+    prev, nxt = _sibling(text, "previous_sibling"), _sibling(text, "next_sibling")
+    return (_is_block(prev) or (prev is None and edge)) and (_is_block(nxt) or (nxt is None and edge))
+
+def normalize_html(html: str) -> str:
+    """Remove o entulho do GM Binder (tabelas/parágrafos vazios, espaços entre blocos, style vazio)."""
+    if not html:
+        return ""
+    soup = BeautifulSoup(html, "html.parser")
+    for c in soup.find_all(string=lambda t: isinstance(t, Comment)):
+        c.extract()
+    # de dentro para fora: uma tabela só com linhas vazias some por inteiro
+    for tag in reversed(soup.find_all(True)):
+        if tag.name in ("table", "thead", "tbody", "tr", "p", "li", "ul", "ol", "div", "span",
+                        "em", "strong", "b", "i", "u", "h2", "h3", "h4", "h5", "blockquote") and _is_empty(tag):
+            tag.decompose()
+            continue
+        for attr in [a for a, v in tag.attrs.items() if not v or (isinstance(v, str) and not v.strip())]:
+            del tag[attr]
+    for text in soup.find_all(string=True):
+        if text.find_parent(("pre", "code")):
+            continue
+        if text.strip():
+            text.replace_with(NavigableString(_WS.sub(" ", str(text))))
+        elif _between_blocks(text):
+            text.extract()
+        else:
+            text.replace_with(NavigableString(" "))
+    return str(soup).strip()
+
+def plain_text(html: str) -> str:
+    if not html:
+        return ""
+    return _WS.sub(" ", BeautifulSoup(html, "html.parser").get_text(" ", strip=True)).strip()
+
+def clean_html(html: str) -> str:
+    return normalize_html(sanitize_html(html))
+
+def load_yaml(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=YamlLoader) or {}
+
+def parse_rune_file(path: str) -> dict:
+    data = load_yaml(path)
+    return {
+        "slug": data.get("slug"),
+        "name": data.get("name"),
+        "domain": data.get("domain") or "",
+        "description_html": clean_html(data.get("description_html", "")),
+    }
+
+# Atributos das magias: o conteúdo mistura "execução"/"execucao", valores com marcação
+# do GM Binder ("** Ação", "* ___") e às vezes só traz o atributo na lista do manual.
+ATTRIBUTE_KEYS = ("execucao", "alcance", "alvo", "area", "duracao")
+ATTRIBUTE_ALIASES = {"tempo_de_execucao": "execucao", "alvos": "alvo", "efeito": "area"}
+# valores canônicos dos atributos filtráveis (colunas indexadas em Spell e filtros de /api/spells)
+ATTRIBUTE_ENUMS = {
+    "execucao": ("acao", "movimento", "reacao", "livre", "completa", "ritual"),
+    "alcance": ("pessoal", "toque", "curto", "medio", "longo", "ilimitado"),
+    "duracao": ("instantaneo", "cena", "concentracao", "sustentada", "permanente"),
+}
+_MARKUP_EDGES = re.compile(r"^[\s*_]+|[\s*_]+$")
+_PLACEHOLDERS = {"", "-", "—", "–"}
+
+def attribute_key(key: str) -> str:
+    key = re.sub(r"\W+", "_", fold(key)).strip("_")
+    return ATTRIBUTE_ALIASES.get(key, key)
+
+def attribute_value(value) -> str:
+    text = _WS.sub(" ", _MARKUP_EDGES.sub("", str(value or "")))
+    return "" if text in _PLACEHOLDERS else text
+
+def attribute_enum(key: str, value: str) -> str:
+    """Primeira palavra do valor que é um valor canônico ("10 minutos (Concentração)" -> concentracao)."""
+    allowed = ATTRIBUTE_ENUMS.get(key, ())
+    for word in re.findall(r"\w+", fold(value)):
+        if word in allowed:
+            return word
+    return ""
+
+def _manual_attributes(manual_html: str) -> dict:
+    # <li><strong>Duração.</strong> Cena</li>
+    out = {}
+    for li in BeautifulSoup(manual_html or "", "html.parser").find_all("li"):
+        label = li.find("strong")
+        if label is None:
+            continue
+        key = attribute_key(label.get_text().rstrip(".: "))
+        if key in ATTRIBUTE_KEYS and key not in out:
+            label.extract()
+            out[key] = attribute_value(li.get_text(" ", strip=True))
+    return out
+
+def normalize_attributes(attributes: dict, manual_html: str = "") -> tuple:
+    """(atributos com chaves canônicas e valores limpos, {execucao/alcance/duracao: valor canônico})."""
+    attrs = {}
+    for key, value in (attributes or {}).items():
+        key, value = attribute_key(key), attribute_value(value)
+        if value and key not in attrs:
+            attrs[key] = value
+    for key, value in _manual_attributes(manual_html).items():
+        if value and key not in attrs:
+            attrs[key] = value
+    ordered = {k: attrs.pop(k) for k in ATTRIBUTE_KEYS if k in attrs}
+    ordered.update(attrs)
+    facets = {k: attribute_enum(k, ordered.get(k, "")) for k in ATTRIBUTE_ENUMS}
+    return ordered, facets
+
+def parse_spell_file(path: str) -> dict:
+    data = load_yaml(path)
+    raw_effects = data.get("rune_effects", {}) or {}
+    raw_size = len((data.get("manual_html") or "").encode()) + sum(len((h or "").encode()) for h in raw_effects.values())
+    manual_html = clean_html(data.get("manual_html", ""))
+    rune_effects = {r_slug: clean_html(r_html) for r_slug, r_html in raw_effects.items()}
+    size = len(manual_html.encode()) + sum(len(h.encode()) for h in rune_effects.values())
+    manual_text = plain_text(manual_html)
+    effect_texts = {r_slug: plain_text(h) for r_slug, h in rune_effects.items()}
+    name = data.get("name") or data.get("slug") or ""
+    attributes, facets = normalize_attributes(data.get("attributes"), manual_html)
+    return {
+        "slug": data.get("slug"),
+        "name": data.get("name"),
+        "school": data.get("school") or "",
+        "version": data.get("version") or "1.0",
+        "manual_html": manual_html,
+        "attributes": attributes,
+        "facets": facets,
+        "rune_effects": rune_effects,
+        "manual_text": manual_text,
+        "effect_texts": effect_texts,
+        "effect_terms": {r_slug: parse_effect_terms(t) for r_slug, t in effect_texts.items()},
+        "circles": parse_circles(manual_html),
+        "search_text": fold(" ".join([name, manual_text, *effect_texts.values()])),
+        "bytes_saved": raw_size - size,
+    }
+
+# Números de ordem de magias e runas (bitset das URLs de seleção, services/selection.py).
+# Ficam em content/ordinals.yml, junto do conteúdo: são os mesmos em qualquer banco, e um
+# número dado a um slug nunca é reaproveitado, nem se a magia for removida. Se o arquivo
+# não voltou para o repositório (import no deploy), o banco manda: ver seed_ordinals.
+ORDINALS_FILE = "ordinals.yml"
+
+def load_ordinals(root: str) -> dict:
+    """{'spells': {slug: n}, 'runes': {slug: n}}; ValueError se um número se repetir."""
+    path = os.path.join(root, ORDINALS_FILE)
+    data = load_yaml(path) if os.path.exists(path) else {}
+    out = {}
+    for kind in ("spells", "runes"):
+        table = {str(k): int(v) for k, v in (data.get(kind) or {}).items()}
+        if len(set(table.values())) != len(table):
+            raise ValueError(f"{path}: números repetidos em '{kind}'")
+        out[kind] = table
+    return out
+
+def seed_ordinals(table: dict, stored: dict) -> bool:
+    """Junta à tabela do arquivo os números já gravados no banco (`stored`), que prevalecem.
+
+    Um slug com número no banco nunca é renumerado, mesmo que o ordinals.yml deste checkout
+    não tenha sido atualizado; entrada do arquivo com número de outro slug do banco sai da
+    tabela (o slug recebe número novo em assign_ordinals). True se a tabela mudou.
+    """
+    owner = {n: slug for slug, n in stored.items()}
+    before = dict(table)
+    for slug, n in before.items():
+        if slug in stored or owner.get(n, slug) != slug:
+            del table[slug]
+    table.update(stored)
+    return table != before
+
+def assign_ordinals(table: dict, slugs) -> bool:
+    """Dá aos slugs novos o próximo número livre (na ordem recebida). True se a tabela mudou."""
+    new = [s for s in slugs if s not in table]
+    start = max(table.values(), default=-1) + 1
+    for n, slug in enumerate(new, start):
+        table[slug] = n
+    return bool(new)
+
+def save_ordinals(root: str, ordinals: dict) -> None:
+    data = {kind: dict(sorted(table.items(), key=lambda kv: kv[1])) for kind, table in ordinals.items()}
+    with open(os.path.join(root, ORDINALS_FILE), "w", encoding="utf-8") as f:
+        f.write("# Gerado pelo import_content: números das magias/runas nos links de seleção.\n"
+                "# Não reaproveite nem troque números, senão links antigos mudam de seleção.\n")
+        yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
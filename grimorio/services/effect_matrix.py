@@ -0,0 +1,146 @@
+# Tabela pré-calculada dos efeitos: magia × runa × círculo × nº de aplicações.
+# Construída uma vez por versão do conteúdo a partir dos termos gravados na importação
+# (SpellRuneEffect.terms, Spell.circles_json); cada consulta é só indexação em arrays.
+import re, threading
+import numpy as np
+from grimorio.models import Rune, Spell, SpellRuneEffect
+from grimorio.services.catalog import content_version
+from grimorio.services.effects import MAX_CIRCLE
+
+MAX_APPLICATIONS = 5
+SCALING = {'flat': 0, 'application': 1, 'circle': 2}
+# totais dos termos que não são dano, por tipo (services/effects.py)
+TOTALS = {'condition': 'conditions', 'immunity': 'immunities', 'modifier': 'modifiers',
+          'movement': 'movement', 'terrain': 'terrain'}
+_DICE = re.compile(r"^(\d+)d(\d+)$")
+
+def _dice(raw):
+    m = _DICE.match(raw or '')
+    return (int(m.group(1)), int(m.group(2))) if m else (0, 0)
+
+class EffectMatrix:
+    """Termos de todo o catálogo em arrays paralelos e tabelas densas por (magia, runa, círculo, aplicações).
+
+    Eixo de aplicações: índice = nº de aplicações (0..MAX_APPLICATIONS); eixo de círculo: círculo - 1.
+    """
+
+    def __init__(self, spells, runes, circles, effects):
+        self.spells = list(spells)
+        self.runes = list(runes)
+        self.spell_index = {s: i for i, s in enumerate(self.spells)}
+        self.rune_index = {r: i for i, r in enumerate(self.runes)}
+        self.circles = circles
+
+        rows = sorted(
+            ((self.spell_index[s], self.rune_index[r], t) for s, r, terms in effects
+             if s in self.spell_index and r in self.rune_index for t in terms),
+            key=lambda row: (row[0], row[1]),
+        )
+        self.terms = [t for _, _, t in rows]
+        n = len(rows)
+        self.term_spell = np.fromiter((r[0] for r in rows), dtype=np.int32, count=n)
+        self.term_rune = np.fromiter((r[1] for r in rows), dtype=np.int32, count=n)
+        self.term_damage = np.fromiter((t['kind'] == 'damage' for t in self.terms), dtype=bool, count=n)
+        amount = np.fromiter((t['amount'] or 0 for t in self.terms), dtype=np.float32, count=n)
+        dice = np.array([_dice(t['dice']) for t in self.terms], dtype=np.int16).reshape(n, 2)
+        scaling = np.fromiter((SCALING[t['scaling']] for t in self.terms), dtype=np.int8, count=n)
+        min_apps = np.fromiter((t['min_applications'] for t in self.terms), dtype=np.int8, count=n)
+        self.term_dice_sides = dice[:, 1]
+
+        # multiplicador [termo, círculo, aplicações]: 1, nº de aplicações ou círculo; zero enquanto inativo
+        apps = np.arange(MAX_APPLICATIONS + 1, dtype=np.float32)[None, None, :]
+        circ = np.arange(1, MAX_CIRCLE + 1, dtype=np.float32)[None, :, None]
+        sc = scaling[:, None, None]
+        self.term_active = (apps >= np.maximum(min_apps, 1)[:, None, None]) & np.ones((1, MAX_CIRCLE, 1), dtype=bool)
+        mult = np.where(sc == 1, apps, np.where(sc == 2, circ, np.float32(1))) * self.term_active
+        self.term_value = amount[:, None, None] * mult
+        self.term_dice = dice[:, 0, None, None] * mult
+
+        # tabelas densas: dano fixo e nº de dados somados por (magia, runa, círculo, aplicações)
+        shape = (len(self.spells), len(self.runes), MAX_CIRCLE, MAX_APPLICATIONS + 1)
+        self.damage = np.zeros(shape, dtype=np.float32)
+        self.dice = np.zeros(shape, dtype=np.float32)
+        dmg = self.term_damage
+        np.add.at(self.damage, (self.term_spell[dmg], self.term_rune[dmg]), self.term_value[dmg])
+        np.add.at(self.dice, (self.term_spell[dmg], self.term_rune[dmg]), self.term_dice[dmg])
+
+        # fatia dos termos de cada (magia, runa)
+        keys = self.term_spell.astype(np.int64) * max(len(self.runes), 1) + self.term_rune
+        uniq, starts = np.unique(keys, return_index=True)
+        ends = np.append(starts[1:], n)
+        self.offsets = {int(k): (int(s), int(e)) for k, s, e in zip(uniq, starts, ends)}
+
+    def _slice(self, si, ri):
+        return self.offsets.get(si * max(len(self.runes), 1) + ri, (0, 0))
+
+    def evaluate(self, spell, circle, applications):
+        """`applications`: [(rune_slug, n)]. Devolve os termos ativos por runa e os totais."""
+        si = self.spell_index[spell]
+        c = circle - 1
+        base = self.circles.get(spell, {}).get(str(circle))
+        damage_by_type, dice, out = {}, {}, []
+        others = {key: {} for key in TOTALS.values()}
+        base_damage = 0
+        if base and base.get('dice'):
+            # "6d8 + 15 de dano": dados e bônus do círculo entram no total
+            count, sides = _dice(base['dice'])
+            dice[f'd{sides}'] = count
+            base_damage = base.get('bonus') or 0
+        for rune, n in applications:
+            ri = self.rune_index[rune]
+            start, end = self._slice(si, ri)
+            active = np.nonzero(self.term_active[start:end, c, n])[0] + start
+            terms = []
+            for t in active:
+                term = self.terms[t]
+                value = float(self.term_value[t, c, n])
+                item = {'kind': term['kind'], 'label': term['label'], 'value': value if term['amount'] else None}
+                if term['dice']:
+                    count = int(self.term_dice[t, c, n])
+                    sides = int(self.term_dice_sides[t])
+                    item['dice'] = f'{count}d{sides}'
+                    dice[f'd{sides}'] = dice.get(f'd{sides}', 0) + count
+                if term['save']:
+                    item['save'] = term['save']
+                terms.append(item)
+                if term['kind'] == 'damage':
+                    if term['amount']:
+                        damage_by_type[term['label']] = damage_by_type.get(term['label'], 0) + value
+                elif term['amount']:
+                    bucket = others[TOTALS[term['kind']]]
+                    bucket[term['label']] = (bucket.get(term['label']) or 0) + value
+                else:
+                    others[TOTALS[term['kind']]].setdefault(term['label'], None)
+            out.append({'rune': rune, 'applications': n,
+                        'damage': float(self.damage[si, ri, c, n]), 'terms': terms})
+        return {
+            'spell': spell,
+            'circle': circle,
+            'base': base,
+            'runes': out,
+            'totals': {
+                'damage': base_damage + float(sum(r['damage'] for r in out)),
+                'damage_by_type': damage_by_type,
+                'dice': {k: v for k, v in sorted(dice.items(), key=lambda kv: int(kv[0][1:]))},
+                **others,
+            },
+        }
+
+def _build():
+    spells = list(Spell.objects.order_by('name').values_list('slug', 'circles_json'))
+    runes = list(Rune.objects.order_by('name').values_list('slug', flat=True))
+    effects = SpellRuneEffect.objects.values_list('spell__slug', 'rune__slug', 'terms')
+    return EffectMatrix([s for s, _ in spells], runes, {s: c or {} for s, c in spells},
+                        [(s, r, terms or []) for s, r, terms in effects])
+
+_lock = threading.Lock()
+_matrix = (None, None)
+
+def get_matrix():
+    global _matrix
+    version = content_version()
+    if _matrix[0] != version:
+        with _lock:
+            if _matrix[0] != version:
+                _matrix = (version, _build())
+    return _matrix[1]
@@ -0,0 +1,190 @@
+# Efeitos de runa em termos estruturados, extraídos do texto na importação.
+# Sem ORM (roda nos processos do import_content --jobs); a matriz numérica fica em effect_matrix.py.
+#
+# "Cada alvo recebe 2 de dano de Fogo para cada vez que você aplicar essa Runa."
+#   -> {"kind": "damage", "label": "fogo", "amount": 2, "dice": None, "scaling": "application", ...}
+# "O alvo fica Lento (2) para cada vez que você aplicar essa Runa (Fortitude impõe Desvantagem)."
+#   -> {"kind": "condition", "label": "lento", "amount": 2, "scaling": "application", "save": "fortitude"}
+# "Aumente o deslocamento do alvo em 1 para cada vez que aplicar essa Runa."
+#   -> {"kind": "modifier", "label": "deslocamento", "amount": 1, "scaling": "application", ...}
+import re
+from bs4 import BeautifulSoup
+from grimorio.services.text import fold
+
+MAX_CIRCLE = 5
+
+DAMAGE_TYPES = {
+    "fogo", "frio", "eletricidade", "eletrico", "radiante", "sonico", "psiquico", "trevas",
+    "impacto", "corte", "perfuracao", "essencia", "acido", "veneno", "luz",
+}
+
+def _inflect(stem):
+    return {stem + end for end in ("o", "a", "os", "as")}
+
+# Vocabulário fechado de condições: cada forma flexionada (sem acento, minúscula) -> chave.
+# Palavra com maiúscula fora daqui (Terreno, Raio, Runa...) não é condição.
+CONDITIONS = {form: key for key, forms in {
+    "agarrado": _inflect("agarrad"),
+    "atordoado": _inflect("atordoad"),
+    "caido": _inflect("caid"),
+    "camuflagem": {"camuflagem"},
+    "cego": _inflect("ceg"),
+    "confuso": _inflect("confus"),
+    "desprevenido": _inflect("desprevenid"),
+    "distraido": _inflect("distraid"),
+    "eletrocutado": _inflect("eletrocutad"),
+    "em chamas": {"em chamas"},
+    "empurrado": _inflect("empurrad"),
+    "enfeiticado": _inflect("enfeiticad"),
+    "enjoado": _inflect("enjoad"),
+    "fascinado": _inflect("fascinad"),
+    "frustrado": _inflect("frustrad"),
+    "imovel": {"imovel", "imoveis"},
+    "incorporeo": _inflect("incorpore"),
+    "lento": _inflect("lent"),
+    "medo": {"medo"},
+    "ofuscado": _inflect("ofuscad"),
+    "preso": _inflect("pres"),
+    "sangrando": {"sangrando", "sangramento"},
+    "surdo": _inflect("surd"),
+    "teletransportado": _inflect("teletransportad"),
+}.items() for form in forms}
+# formas verbais que só contam com valor: "Empurre (6)", "Empurrando (3)"
+VALUED_CONDITIONS = {"empurre": "empurrado", "empurrando": "empurrado"}
+
+# alvos de "Aumente o deslocamento em 1", "Receba +1 no Teste de Conjuração" (mais específico antes)
+MODIFIERS = (
+    ("teste de conjuracao", "teste de conjuracao"), ("testes de conjuracao", "teste de conjuracao"),
+    ("deslocamento", "deslocamento"), ("alcance", "alcance"), ("raio", "raio"), ("carga", "carga"),
+    ("resistencia", "resistencia"), ("reacao", "reacao"), ("testes", "testes"), ("teste", "testes"),
+)
+MOVEMENTS = {"natacao", "levitacao", "voo", "escavacao", "teletransporte"}
+
+_WS = re.compile(r"\s+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-ZÀ-Ú])")
+_WORD = r"[A-Za-zÀ-ÿ]+"
+_DAMAGE = re.compile(rf"(?:(\d+d\d+|\d+) de )?dano (?:de |do |da )?({_WORD}(?: ou {_WORD})?)", re.I)
+_CONDITION = re.compile(r"\b(Em Chamas|[A-ZÀ-Ú][a-zà-ÿ]+)(?:\s+\((\d+)(?:\s+Espaços?)?\))?")
+_IMMUNE = re.compile(r"não pode(?:m)? (?:se )?(?:ficar|ser)|ninguém pode ficar|imunes? a", re.I)
+_MOD_VERB = re.compile(r"\b(aument|reduz)\w*\s+(?:(?:o|a|os|as)\s+)?([^.()]{1,40}?)\s+em\s+(\d+)", re.I)
+_MOD_SUBJECT = re.compile(r"\b(?:o|a)\s+([^.()]{1,30}?)\s+(aument|reduz)\w*\s+em\s+(\d+)", re.I)
+_MOD_BONUS = re.compile(r"\breceb\w*\s+(?:um bônus de\s+)?([+\-–−])\s*(\d+)", re.I)
+_MOVEMENT = re.compile(r"deslocamentos? de (\w+)|se teletransportar\s+\((\d+)\)", re.I)
+_TERRAIN = re.compile(
+    r"\bterreno\s+(?:[^.]{0,30}?\s)?(Difícil|Escorregadio|Elevado|Alto|Baixo)\b"
+    r"|\b((?-i:Escuridão (?:Parcial|Total)|Cobertura(?: Parcial)?))\b", re.I)
+_SAVE = re.compile(r"\((Fortitude|Reflexos|Vontade)\s+(evita|evitam|impõe|impõem|diminui)", re.I)
+_PER_APPLICATION = re.compile(r"para cada (?:vez|aplica)|(?:por|cada) aplicação|for aplicada", re.I)
+_PER_CIRCLE = re.compile(r"(?:por|para cada) círculo", re.I)
+_THIRD = re.compile(r"terce?ira (?:vez|aplica)", re.I)
+_CIRCLE_ITEM = re.compile(r"C[íi]rculo\s+(\d+)\s*:", re.I)
+_SIGNED = re.compile(r"([+\-–−])\s*(\d+)")
+_DICE = re.compile(r"\b(\d+)d(\d+)\b")
+
+def condition_key(name: str):
+    """'Lentas' -> 'lento', 'Sangramento' -> 'sangrando'; None se não for condição do vocabulário."""
+    return CONDITIONS.get(_WS.sub(" ", fold(name).strip()))
+
+def damage_key(raw: str) -> str:
+    parts = [fold(p) for p in re.split(r"\s+ou\s+", raw.strip(), flags=re.I)]
+    parts = [p for p in parts if p in DAMAGE_TYPES]
+    return "/".join(parts)
+
+def modifier_key(phrase: str):
+    phrase = fold(phrase)
+    return next((key for word, key in MODIFIERS if re.search(rf"\b{word}\b", phrase)), None)
+
+def _sentence_terms(sentence: str):
+    scaling = ("application" if _PER_APPLICATION.search(sentence)
+               else "circle" if _PER_CIRCLE.search(sentence) else "flat")
+    min_apps = 3 if _THIRD.search(sentence) else 1
+    save = _SAVE.search(sentence)
+    save = fold(save.group(1)) if save else None
+    immune = _IMMUNE.search(sentence)
+    terms, seen = [], set()
+
+    def add(kind, label, amount=None, dice=None, save=None):
+        if (kind, label) in seen:
+            return
+        seen.add((kind, label))
+        terms.append({"kind": kind, "label": label, "amount": amount, "dice": dice,
+                      "scaling": scaling if amount is not None or dice else "flat",
+                      "min_applications": min_apps, "save": save})
+
+    for m in _DAMAGE.finditer(sentence):
+        label = damage_key(m.group(2))
+        if not label:
+            continue
+        amount = m.group(1)
+        dice = amount if amount and "d" in amount.lower() else None
+        add("damage", label, int(amount) if amount and not dice else None, dice)
+
+    for m in _CONDITION.finditer(sentence):
+        value = int(m.group(2)) if m.group(2) else None
+        label = condition_key(m.group(1)) or (value is not None and VALUED_CONDITIONS.get(fold(m.group(1))))
+        if not label:
+            continue
+        # "não pode ficar Agarrado, Lento ou Imóvel", "Imune a Surdo": imunidade, não condição
+        if immune and immune.start() < m.start():
+            add("immunity", label)
+        else:
+            add("condition", label, value, save=save)
+
+    for m in list(_MOD_VERB.finditer(sentence)) + list(_MOD_SUBJECT.finditer(sentence)):
+        verb, phrase = (m.group(1), m.group(2)) if m.re is _MOD_VERB else (m.group(2), m.group(1))
+        label = modifier_key(phrase)
+        if label:
+            add("modifier", label, int(m.group(3)) * (-1 if fold(verb) == "reduz" else 1))
+    for m in _MOD_BONUS.finditer(sentence):
+        add("modifier", modifier_key(sentence) or "testes", int(m.group(2)) * (1 if m.group(1) == "+" else -1))
+
+    for m in _MOVEMENT.finditer(sentence):
+        label = fold(m.group(1)) if m.group(1) else "teletransporte"
+        if label in MOVEMENTS:
+            add("movement", label, int(m.group(2)) if m.group(2) else None)
+
+    for m in _TERRAIN.finditer(sentence):
+        add("terrain", fold(f"terreno {m.group(1)}" if m.group(1) else m.group(2)))
+    return terms
+
+def parse_effect_terms(text: str) -> list:
+    """Termos (dano, condição, imunidade, modificador, deslocamento, terreno) do texto puro de um efeito de runa."""
+    terms = []
+    for sentence in _SENTENCE.split(re.sub(r"\\\w+", " ", text or "")):
+        terms.extend(_sentence_terms(sentence))
+    return terms
+
+def _circle_table(soup):
+    # a tabela de círculos é a lista em que todo item começa com "Círculo N:"
+    for ul in soup.find_all(["ul", "ol"]):
+        items = [li.get_text(" ", strip=True) for li in ul.find_all("li", recursive=False)]
+        if items and all(_CIRCLE_ITEM.match(text) for text in items):
+            return items
+    return []
+
+def parse_circles(manual_html: str) -> dict:
+    """{"3": {"dice": "6d8", "bonus": 15, "label": "dano", "text": "..."}} da tabela 'Círculo N: ...' do manual.
+
+    Só a primeira parte do item ("6d8 + 15 de dano | Raio (2)") vira número; sem dados nem
+    bônus (Raio (2), 1 informação) dice/bonus/label ficam None e só o texto é guardado.
+    """
+    out = {}
+    for text in _circle_table(BeautifulSoup(manual_html or "", "html.parser")):
+        m = _CIRCLE_ITEM.match(text)
+        body = text[m.end():].strip()
+        if not 1 <= int(m.group(1)) <= MAX_CIRCLE or m.group(1) in out or not re.search(r"\w", body):
+            continue
+        first = body.split("|")[0]
+        dice = _DICE.search(first)
+        signed = _SIGNED.search(_DICE.sub("", first))
+        label = None
+        if dice or signed:
+            label = _WS.sub(" ", _SIGNED.sub("", _DICE.sub("", first))).strip(" :+")
+            label = re.sub(r"^de\s+|\s+de$", "", label) or None
+        out[m.group(1)] = {
+            "dice": dice.group(0) if dice else None,
+            "bonus": int(signed.group(2)) * (1 if signed.group(1) == "+" else -1) if signed else None,
+            "label": label,
+            "text": body,
+        }
+    return out
@@ -0,0 +1,188 @@
+# Exportação para impressão (HTML paginado) e PDF, gerada no servidor.
+# Os arquivos ficam em disco por (magias, runas, versão do conteúdo) e são montados
+# num pool em segundo plano: a primeira requisição recebe 202, as seguintes o arquivo pronto.
+# A pasta é limitada a GRIMORIO_EXPORT_MAX_BYTES: passando disso, saem os menos usados.
+import glob, hashlib, logging, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+from grimorio.services.builders import build_spell_panels
+from grimorio.services.selectors import get_spells_by_slugs, get_runes_by_slugs
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'html': 'text/html; charset=utf-8', 'pdf': 'application/pdf'}
+PRINT_TEMPLATE = 'grimorio/print.html'
+# fontes core do PDF só têm latin-1
+LATIN1_FALLBACK = str.maketrans({'…': '...', '—': '-', '–': '-', '“': '"', '”': '"', '‘': "'", '’': "'", '•': '-'})
+
+class ExportFailed(Exception):
+    pass
+
+def export_dir():
+    return str(getattr(settings, 'GRIMORIO_EXPORT_DIR', os.path.join('.cache', 'exports')))
+
+def max_spells():
+    return getattr(settings, 'GRIMORIO_EXPORT_MAX_SPELLS', 60)
+
+def canonical_selection(spell_slugs, rune_slugs):
+    """Só slugs que existem, sem repetição e em ordem: a mesma seleção dá sempre a mesma chave."""
+    return (sorted(s.slug for s in get_spells_by_slugs(spell_slugs)),
+            sorted(r.slug for r in get_runes_by_slugs(rune_slugs)))
+
+def export_key(spell_slugs, rune_slugs, version):
+    raw = ','.join(sorted(set(spell_slugs))) + '|' + ','.join(sorted(set(rune_slugs)))
+    return f"v{version}-{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]}"
+
+def artifact_path(key, fmt):
+    return os.path.join(export_dir(), f"{key}.{fmt}")
+
+def _panels(spell_slugs, rune_slugs, version):
+    spells = get_spells_by_slugs(spell_slugs)
+    runes = get_runes_by_slugs(rune_slugs)
+    return build_spell_panels(spells, runes, version)
+
+def render_print_html(panels):
+    return render_to_string(PRINT_TEMPLATE, {'panels': panels})
+
+def _pdf_font(pdf):
+    folder = getattr(settings, 'GRIMORIO_PDF_FONT_DIR', '')
+    regular = os.path.join(folder, 'DejaVuSans.ttf') if folder else ''
+    if not os.path.exists(regular):
+        return None
+    bold = os.path.join(folder, 'DejaVuSans-Bold.ttf')
+    bold = bold if os.path.exists(bold) else regular
+    for style, path in (('', regular), ('B', bold), ('I', regular), ('BI', bold)):
+        pdf.add_font('dejavu', style, path)
+    return 'dejavu'
+
+def _flatten_cells(html):
+    # o write_html do fpdf2 não aceita tags dentro de <td>/<th> (NotImplementedError): só o texto
+    soup = BeautifulSoup(html, 'html.parser')
+    for cell in soup.find_all(['td', 'th']):
+        if cell.find(True) is not None:
+            cell.string = cell.get_text(' ', strip=True)
+    return str(soup)
+
+def render_pdf(panels):
+    from fpdf import FPDF  # só quem gera PDF precisa do fpdf2
+
+    pdf = FPDF(format='A4')
+    pdf.set_auto_page_break(True, margin=15)
+    family = _pdf_font(pdf)
+    for p in panels:
+        html = _flatten_cells(str(p['html']))
+        if family is None:
+            html = html.translate(LATIN1_FALLBACK).encode('latin-1', 'replace').decode('latin-1')
+        pdf.add_page()
+        pdf.set_font(family or 'helvetica', size=10)
+        pdf.write_html(html, font_family=family or 'helvetica', ul_bullet_char='-',
+                       warn_on_tags_not_matching=False)
+    return bytes(pdf.output())
+
+def build_artifact(spell_slugs, rune_slugs, version, fmt):
+    """Gera o arquivo e grava de forma atômica; apaga exportações de versões antigas."""
+    key = export_key(spell_slugs, rune_slugs, version)
+    path = artifact_path(key, fmt)
+    try:
+        panels = _panels(spell_slugs, rune_slugs, version)
+        data = render_pdf(panels) if fmt == 'pdf' else render_print_html(panels).encode('utf-8')
+        os.makedirs(export_dir(), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        prune(version, keep=path)
+        return path
+    finally:
+        close_old_connections()
+
+def prune(version, keep=None):
+    """Apaga exportações de versões antigas e, acima de GRIMORIO_EXPORT_MAX_BYTES, as de uso mais antigo."""
+    limit = getattr(settings, 'GRIMORIO_EXPORT_MAX_BYTES', 256 * 1024 * 1024)
+    files, total = [], 0
+    for path in glob.glob(os.path.join(export_dir(), 'v*.*')):
+        if path.endswith('.tmp'):
+            continue
+        if not os.path.basename(path).startswith(f"v{version}-"):
+            _remove(path)
+            continue
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        total += st.st_size
+        if path != keep:
+            files.append((st.st_mtime, st.st_size, path))
+    # mtime é o último uso (request_artifact o atualiza a cada acerto)
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        if _remove(path):
+            total -= size
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+_lock = threading.Lock()
+_pool = None
+_pending = {}
+_failed = set()  # jobs que falharam nesta versão: a mesma seleção falharia de novo
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=getattr(settings, 'GRIMORIO_EXPORT_WORKERS', 2),
+                                   thread_name_prefix='grimorio-export')
+    return _pool
+
+def _done(job, future):
+    error = future.exception()
+    if error is not None:
+        logger.error("Falha ao gerar exportação %s", job, exc_info=error)
+    with _lock:
+        _pending.pop(job, None)
+        if error is not None:
+            version = job[0].split('-', 1)[0]
+            _failed.difference_update([j for j in _failed if not j[0].startswith(f"{version}-")])
+            _failed.add(job)
+
+def request_artifact(spell_slugs, rune_slugs, version, fmt):
+    """Caminho do arquivo se já existe; senão agenda a geração e devolve None.
+
+    Espera a seleção de canonical_selection(), com no máximo max_spells() magias.
+    Com GRIMORIO_EXPORT_WORKERS = 0 gera na hora (útil em dev e em testes).
+    ExportFailed se a geração desta seleção já falhou (ou falhar, no modo síncrono).
+    """
+    key = export_key(spell_slugs, rune_slugs, version)
+    path = artifact_path(key, fmt)
+    if os.path.exists(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+    job = (key, fmt)
+    if getattr(settings, 'GRIMORIO_EXPORT_WORKERS', 2) <= 0:
+        try:
+            return build_artifact(spell_slugs, rune_slugs, version, fmt)
+        except Exception as e:
+            logger.error("Falha ao gerar exportação %s", job, exc_info=e)
+            raise ExportFailed(str(e)) from e
+    future = None
+    with _lock:
+        if job in _failed:
+            raise ExportFailed(f"a exportação {key}.{fmt} falhou")
+        if job not in _pending:
+            future = _pending[job] = _get_pool().submit(
+                build_artifact, list(spell_slugs), list(rune_slugs), version, fmt)
+    if future is not None:
+        # fora do lock: se o job já terminou, o callback roda aqui mesmo e pega o lock
+        future.add_done_callback(lambda f: _done(job, f))
+    return None
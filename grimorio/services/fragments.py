@@ -0,0 +1,50 @@
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from grimorio.services.metrics import span
+
+PANEL_TEMPLATE = 'grimorio/_panel.html'
+CHIPS_TEMPLATE = 'grimorio/_chips.html'
+
+def _cache():
+    return caches[getattr(settings, 'GRIMORIO_FRAGMENT_CACHE', 'default')]
+
+def rune_set_hash(rune_slugs):
+    canon = ','.join(sorted(set(rune_slugs)))
+    return hashlib.sha1(canon.encode('utf-8')).hexdigest()[:16]
+
+def panel_cache_key(spell_slug, rune_slugs, version):
+    return f"grimorio:panel:v{version}:{spell_slug}:{rune_set_hash(rune_slugs)}"
+
+def cached_panels(spell_slugs, rune_slugs, version):
+    """{spell_slug: html} dos painéis já renderizados para esse conjunto de runas."""
+    keys = {panel_cache_key(s, rune_slugs, version): s for s in spell_slugs}
+    return {keys[k]: mark_safe(html) for k, html in _cache().get_many(list(keys)).items()}
+
+def render_panel(panel, runes, version):
+    """Renderiza o painel de uma magia e guarda no cache por (magia, runas, versão)."""
+    with span('tpl'):
+        html = render_to_string(PANEL_TEMPLATE, {'p': panel, 'runes': runes})
+    if len(html) <= getattr(settings, 'GRIMORIO_FRAGMENT_MAX_BYTES', 512 * 1024):
+        key = panel_cache_key(panel['spell'].slug, [r.slug for r in runes], version)
+        _cache().set(key, html, getattr(settings, 'GRIMORIO_FRAGMENT_TTL', None))
+    return mark_safe(html)
+
+def selection_chips(version, loader):
+    """Chips de magias e runas da página de seleção, renderizados uma vez por versão do conteúdo.
+
+    `loader()` devolve (spells, runes) e só é chamado quando o cache não tem a versão.
+    """
+    key = f"grimorio:selection:v{version}"
+    chips = _cache().get(key)
+    if chips is None:
+        spells, runes = loader()
+        with span('tpl'):
+            chips = {
+                'spells': render_to_string(CHIPS_TEMPLATE, {'items': spells, 'field': 'spells'}),
+                'runes': render_to_string(CHIPS_TEMPLATE, {'items': runes, 'field': 'runes'}),
+            }
+        _cache().set(key, chips, getattr(settings, 'GRIMORIO_FRAGMENT_TTL', None))
+    return {k: mark_safe(v) for k, v in chips.items()}
@@ -0,0 +1,102 @@
+# Instrumentação por requisição: consultas ao banco, tempo de template, bytes e latência total.
+# Cada worker mantém um histograma móvel em memória (últimas N amostras por view).
+import threading, time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('grimorio_perf', default=None)
+
+class Recorder:
+    __slots__ = ('started', 'db_count', 'db_ms', 'spans')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_ms = 0.0
+        self.spans = defaultdict(float)
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_count += 1
+            self.db_ms += (time.perf_counter() - t0) * 1000
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+def db_wrapper(execute, sql, params, many, context):
+    # wrapper fixo da conexão (ASGI): conta para a requisição do contexto atual, se houver
+    rec = _current.get()
+    if rec is None:
+        return execute(sql, params, many, context)
+    return rec.db_wrapper(execute, sql, params, many, context)
+
+def install_db_wrapper(sender, connection, **kwargs):
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_wrapper)
+
+def start():
+    rec = Recorder()
+    return rec, _current.set(rec)
+
+def stop(token):
+    _current.reset(token)
+
+@contextmanager
+def span(name):
+    rec = _current.get()
+    if rec is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec.spans[name] += (time.perf_counter() - t0) * 1000
+
+METRICS = ('total_ms', 'db_ms', 'db_count', 'tpl_ms', 'bytes')
+
+class Histogram:
+    def __init__(self, size=1000):
+        self.size = size
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def add(self, view, sample):
+        with self._lock:
+            bucket = self._samples.get(view)
+            if bucket is None:
+                bucket = self._samples[view] = deque(maxlen=self.size)
+            bucket.append(sample)
+
+    def snapshot(self):
+        with self._lock:
+            data = {view: list(bucket) for view, bucket in self._samples.items()}
+        return {view: _summary(samples) for view, samples in sorted(data.items())}
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+def _pct(values, q):
+    idx = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[idx]
+
+def _summary(samples):
+    out = {'count': len(samples)}
+    for i, name in enumerate(METRICS):
+        values = sorted(s[i] for s in samples if s[i] is not None)
+        if not values:
+            continue
+        out[name] = {
+            'p50': round(_pct(values, 0.50), 2),
+            'p95': round(_pct(values, 0.95), 2),
+            'p99': round(_pct(values, 0.99), 2),
+            'max': round(values[-1], 2),
+        }
+    return out
+
+histogram = Histogram()
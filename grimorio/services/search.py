@@ -0,0 +1,168 @@
+# Busca por nome, texto do manual e efeitos de runa, sem diferenciar acentos.
+# - Postgres: to_tsvector('simple', search_text) com índice GIN (migração 0005)
+# - demais bancos: índice invertido em memória, reconstruído por versão do conteúdo
+import math, re, threading
+from bisect import bisect_left
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.utils.html import escape
+from grimorio.models import Spell, SpellRuneEffect
+from grimorio.services.catalog import content_version
+from grimorio.services.text import fold
+
+WORD_RE = re.compile(r"\w+")
+MIN_TOKEN = 2
+FIELD_WEIGHTS = {'name': 3.0, 'manual': 1.0, 'rune': 1.5}
+SNIPPET_CHARS = 160
+# mesma expressão do índice GIN (migração 0005)
+SEARCH_VECTOR = SearchVector('search_text', config='simple')
+
+def tokenize(text):
+    return [t for t in WORD_RE.findall(fold(text)) if len(t) >= MIN_TOKEN]
+
+def highlight(text, terms, width=SNIPPET_CHARS):
+    """Trecho de `text` em volta do primeiro termo encontrado, com <mark> nos termos (HTML escapado)."""
+    words = [m for m in WORD_RE.finditer(text) if _matches(fold(m.group()), terms)]
+    if not words:
+        return escape(text[:width])
+    start = max(0, words[0].start() - width // 3)
+    end = min(len(text), start + width)
+    out, pos = [], start
+    for m in words:
+        if m.start() < start or m.end() > end:
+            continue
+        out.append(escape(text[pos:m.start()]))
+        out.append(f"<mark>{escape(m.group())}</mark>")
+        pos = m.end()
+    out.append(escape(text[pos:end]))
+    return ("…" if start else "") + "".join(out) + ("…" if end < len(text) else "")
+
+def _matches(word, terms):
+    return any(word.startswith(t) for t in terms)
+
+class SearchIndex:
+    """Índice invertido: termo -> {doc: frequência}. Um doc é (magia, campo) — nome, manual ou uma runa.
+
+    A magia entra no resultado se cada termo aparece em algum dos campos dela (não
+    necessariamente no mesmo); a pontuação soma os campos.
+    """
+
+    def __init__(self, docs):
+        self.docs = docs  # [(spell_slug, spell_name, field, rune_slug, rune_name, text)]
+        self.postings = defaultdict(dict)
+        self.spell_docs = defaultdict(list)
+        for i, doc in enumerate(docs):
+            self.spell_docs[doc[0]].append(i)
+            for tok in tokenize(doc[5]) + (tokenize(doc[4]) if doc[4] else []):
+                self.postings[tok][i] = self.postings[tok].get(i, 0) + 1
+        self.vocab = sorted(self.postings)
+
+    def _expand(self, token):
+        # termo exato pesa 1.0; termos que começam com ele (busca incremental) pesam 0.5
+        i = bisect_left(self.vocab, token)
+        while i < len(self.vocab) and self.vocab[i].startswith(token):
+            term = self.vocab[i]
+            yield term, 1.0 if term == token else 0.5
+            i += 1
+
+    def _token_scores(self, token):
+        n = len(self.docs) or 1
+        scores = defaultdict(float)
+        for term, boost in self._expand(token):
+            posting = self.postings[term]
+            idf = math.log(1 + n / len(posting))
+            for doc, tf in posting.items():
+                field = self.docs[doc][2]
+                scores[doc] = max(scores[doc], boost * idf * FIELD_WEIGHTS[field] * tf / (tf + 1.2))
+        return scores
+
+    def score(self, terms):
+        """(pontuação por magia com todos os termos, pontuação por doc)."""
+        spell_scores, doc_scores = None, defaultdict(float)
+        for token in terms:
+            by_spell = defaultdict(float)
+            for doc, score in self._token_scores(token).items():
+                doc_scores[doc] += score
+                by_spell[self.docs[doc][0]] += score
+            spell_scores = by_spell if spell_scores is None else {
+                s: total + by_spell[s] for s, total in spell_scores.items() if s in by_spell}
+            if not spell_scores:
+                return {}, doc_scores
+        return spell_scores or {}, doc_scores
+
+    def result(self, slug, score, doc_scores, terms):
+        hits = sorted(((doc_scores[d], d) for d in self.spell_docs[slug] if d in doc_scores), reverse=True)
+        return {
+            'slug': slug,
+            'name': self.docs[self.spell_docs[slug][0]][1],
+            'score': round(score, 4),
+            'highlights': [_highlight_doc(self.docs[doc], terms) for _, doc in hits[:3]],
+        }
+
+    def search(self, terms, limit):
+        spell_scores, doc_scores = self.score(terms)
+        ranked = sorted(spell_scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [self.result(slug, score, doc_scores, terms) for slug, score in ranked]
+
+def _highlight_doc(doc, terms):
+    _, _, field, rune_slug, rune_name, text = doc
+    out = {'field': field, 'snippet': highlight(text, terms)}
+    if field == 'rune':
+        out['rune'] = rune_slug
+        out['rune_name'] = rune_name
+    return out
+
+def _load_docs(spell_ids=None):
+    spells = Spell.objects.order_by('name')
+    effects = SpellRuneEffect.objects.select_related('spell', 'rune').order_by('spell__name', 'rune__name')
+    if spell_ids is not None:
+        spells = spells.filter(id__in=spell_ids)
+        effects = effects.filter(spell_id__in=spell_ids)
+    docs = []
+    for slug, name, manual_text in spells.values_list('slug', 'name', 'manual_text'):
+        docs.append((slug, name, 'name', None, None, name))
+        if manual_text:
+            docs.append((slug, name, 'manual', None, None, manual_text))
+    for e in effects.only('text', 'spell__slug', 'spell__name', 'rune__slug', 'rune__name'):
+        if e.text:
+            docs.append((e.spell.slug, e.spell.name, 'rune', e.rune.slug, e.rune.name, e.text))
+    return docs
+
+_lock = threading.Lock()
+_index = (None, None)
+
+def get_index():
+    global _index
+    version = content_version()
+    if _index[0] != version:
+        with _lock:
+            if _index[0] != version:
+                _index = (version, SearchIndex(_load_docs()))
+    return _index[1]
+
+def use_postgres():
+    backend = getattr(settings, 'GRIMORIO_SEARCH_BACKEND', 'auto')
+    if backend == 'auto':
+        return connection.vendor == 'postgresql'
+    return backend == 'postgres'
+
+def search(query, limit=20):
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return []
+    if not use_postgres():
+        return get_index().search(terms, limit)
+
+    # Postgres: o GIN filtra e ordena; os destaques saem de um índice só com as magias encontradas
+    query = SearchQuery(' & '.join(f'{t}:*' for t in terms), config='simple', search_type='raw')
+    rows = list(
+        Spell.objects.annotate(document=SEARCH_VECTOR, rank=SearchRank(SEARCH_VECTOR, query))
+        .filter(document=query).order_by('-rank', 'name').values_list('id', 'slug', 'rank')[:limit]
+    )
+    if not rows:
+        return []
+    index = SearchIndex(_load_docs([pk for pk, _, _ in rows]))
+    _, doc_scores = index.score(terms)
+    return [index.result(slug, rank, doc_scores, terms) for _, slug, rank in rows]
@@ -0,0 +1,71 @@
+# Seleção de magias/runas codificada na URL (?s=...&r=...), sem sessão.
+# Cada conjunto vira um bitset dos números de ordem (bit N = magia/runa com ordinal N) em
+# base64url sem padding: a mesma seleção gera sempre o mesmo texto, independente da ordem
+# dos cliques. Os números vêm de content/ordinals.yml (import_content), não da pk: são
+# densos, iguais em qualquer banco e nunca reaproveitados, então o link não muda de seleção.
+import base64, binascii
+from typing import Iterable
+from grimorio.models import Spell, Rune
+from grimorio.services.catalog import get_catalog, snapshot_enabled
+
+MAX_BYTES = 3072               # bitset de até 24576 números...
+MAX_TOKEN = MAX_BYTES * 4 // 3  # ...que em base64 sem padding dá até 4096 caracteres
+
+class InvalidSelection(ValueError):
+    pass
+
+def encode_ids(ids: Iterable[int]) -> str:
+    ids = set(ids)
+    if not ids:
+        return ''
+    if max(ids) >= MAX_BYTES * 8 or min(ids) < 0:
+        raise InvalidSelection(f"números de seleção devem estar entre 0 e {MAX_BYTES * 8 - 1}")
+    bits = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        bits[i // 8] |= 1 << (i % 8)
+    return base64.urlsafe_b64encode(bytes(bits)).rstrip(b'=').decode('ascii')
+
+def decode_ids(token: str):
+    """Números do bitset; InvalidSelection se o texto não for um bitset válido."""
+    if not token:
+        return []
+    if len(token) > MAX_TOKEN:
+        raise InvalidSelection("seleção grande demais")
+    try:
+        bits = base64.b64decode(token + '=' * (-len(token) % 4), altchars=b'-_', validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidSelection("texto não é um bitset base64url")
+    return [n * 8 + b for n, byte in enumerate(bits) if byte for b in range(8) if byte >> b & 1]
+
+def _ordinal_map(model, attr):
+    # {slug: ordinal}
+    if snapshot_enabled():
+        return {slug: obj.ordinal for slug, obj in getattr(get_catalog(), attr).items() if obj.ordinal is not None}
+    return dict(model.objects.filter(ordinal__isnull=False).values_list('slug', 'ordinal'))
+
+def _slugs(model, attr, ordinals):
+    if not ordinals:
+        return []
+    if snapshot_enabled():
+        by_ordinal = {obj.ordinal: slug for slug, obj in getattr(get_catalog(), attr).items()}
+        return [by_ordinal[n] for n in ordinals if n in by_ordinal]
+    return list(model.objects.filter(ordinal__in=ordinals).values_list('slug', flat=True))
+
+def encode_selection(spell_slugs, rune_slugs):
+    """{'s': ..., 'r': ...} só com as chaves não vazias; slugs desconhecidos são descartados."""
+    out = {}
+    for key, model, attr, slugs in (('s', Spell, 'spells', spell_slugs), ('r', Rune, 'runes', rune_slugs)):
+        if slugs:
+            ordinals = _ordinal_map(model, attr)
+            token = encode_ids(ordinals[s] for s in slugs if s in ordinals)
+            if token:
+                out[key] = token
+    return out
+
+def decode_selection(params):
+    """(spell_slugs, rune_slugs) de ?s=&r=; InvalidSelection se algum dos dois for inválido.
+
+    Números sem magia/runa (removida do conteúdo) são ignorados.
+    """
+    return (_slugs(Spell, 'spells', decode_ids(params.get('s', ''))),
+            _slugs(Rune, 'runes', decode_ids(params.get('r', ''))))
@@ -1,16 +1,167 @@
-from typing import Iterable
-from grimorio.models import Spell, Rune
+from typing import Iterable, Optional
+from django.db.models import Prefetch
+from grimorio.models import Spell, Rune, SpellRuneEffect
+from grimorio.services.catalog import aget_catalog, get_catalog, snapshot_enabled
+
+# campo da API -> coluna do modelo
+API_FIELDS = {
+    'slug': 'slug',
+    'name': 'name',
+    'attributes': 'attributes_json',
+    'manual_html': 'manual_html',
+    'rune_effects': None,  # tabela SpellRuneEffect
+}
 
 def list_all_spells():
-    return Spell.objects.all().order_by('name')
+    # só o que a página de seleção usa (nada de manual/efeitos)
+    if snapshot_enabled():
+        return list(get_catalog().spells.values())
+    return Spell.objects.only('slug', 'name').order_by('name')
 
 def list_all_runes():
-    return Rune.objects.all().order_by('name')
+    if snapshot_enabled():
+        return list(get_catalog().runes.values())
+    return Rune.objects.only('slug', 'name').order_by('name')
 
 def get_spells_by_slugs(slugs: Iterable[str]):
+    if snapshot_enabled():
+        return get_catalog().spells_by_slugs(slugs)
     return Spell.objects.filter(slug__in=list(slugs)).order_by('name')
 
 def get_runes_by_slugs(slugs: Iterable[str]):
     if not slugs:
-        return Rune.objects.none()
+        return []
+    if snapshot_enabled():
+        return get_catalog().runes_by_slugs(slugs)
     return Rune.objects.filter(slug__in=list(slugs)).order_by('name')
+
+async def aget_spell(slug: str):
+    """Uma magia pelo slug, ou None."""
+    if snapshot_enabled():
+        return (await aget_catalog()).spells.get(slug)
+    try:
+        return await Spell.objects.aget(slug=slug)
+    except Spell.DoesNotExist:
+        return None
+
+async def aget_spells_by_slugs(slugs: Iterable[str]):
+    if snapshot_enabled():
+        return (await aget_catalog()).spells_by_slugs(slugs)
+    return [sp async for sp in Spell.objects.filter(slug__in=list(slugs)).order_by('name')]
+
+async def aget_runes_by_slugs(slugs: Iterable[str]):
+    if not slugs:
+        return []
+    if snapshot_enabled():
+        return (await aget_catalog()).runes_by_slugs(slugs)
+    return [r async for r in Rune.objects.filter(slug__in=list(slugs)).order_by('name')]
+
+def iter_spells_for_export(since=None, chunk_size: int = 200):
+    """Percorre o catálogo em lotes (memória constante); cada magia vem com seus efeitos pré-carregados."""
+    effects = SpellRuneEffect.objects.select_related('rune').only('spell_id', 'html', 'rune__slug').order_by('rune__name')
+    qs = Spell.objects.order_by('updated_at', 'id').prefetch_related(Prefetch('rune_effects', queryset=effects))
+    if since is not None:
+        qs = qs.filter(updated_at__gt=since)
+    return qs.iterator(chunk_size=chunk_size)
+
+def _effects_query(spell_slugs, rune_slugs):
+    if not spell_slugs or rune_slugs == []:
+        return None
+    qs = SpellRuneEffect.objects.filter(spell__slug__in=spell_slugs)
+    if rune_slugs is not None:
+        qs = qs.filter(rune__slug__in=rune_slugs)
+    return qs.order_by('rune__name').values_list('spell__slug', 'rune__slug', 'html')
+
+def get_rune_effects(spell_slugs: Iterable[str], rune_slugs: Optional[Iterable[str]] = None):
+    """{spell_slug: {rune_slug: html}} apenas para os pares pedidos (todas as runas se `rune_slugs` for None)."""
+    spell_slugs = list(spell_slugs)
+    rune_slugs = None if rune_slugs is None else list(rune_slugs)
+    if snapshot_enabled():
+        return get_catalog().effects_for(spell_slugs, rune_slugs)
+    out = {s: {} for s in spell_slugs}
+    qs = _effects_query(spell_slugs, rune_slugs)
+    for spell_slug, rune_slug, html in qs if qs is not None else ():
+        out[spell_slug][rune_slug] = html
+    return out
+
+async def aget_rune_effects(spell_slugs: Iterable[str], rune_slugs: Optional[Iterable[str]] = None):
+    spell_slugs = list(spell_slugs)
+    rune_slugs = None if rune_slugs is None else list(rune_slugs)
+    if snapshot_enabled():
+        return (await aget_catalog()).effects_for(spell_slugs, rune_slugs)
+    out = {s: {} for s in spell_slugs}
+    qs = _effects_query(spell_slugs, rune_slugs)
+    if qs is not None:
+        async for spell_slug, rune_slug, html in qs:
+            out[spell_slug][rune_slug] = html
+    return out
+
+def get_spell_rows(slugs: Iterable[str], fields: Iterable[str], runes: Optional[list] = None,
+                   filters: Optional[dict] = None):
+    """Dicts com apenas os `fields` pedidos; `runes` restringe rune_effects a essas runas.
+
+    `filters` ({'alcance': ['curto'], ...}) usa as colunas normalizadas; sem `slugs`, filtra o catálogo todo.
+    """
+    fields = [f for f in API_FIELDS if f in set(fields)]
+    slugs = list(slugs)
+    filters = filters or {}
+    if snapshot_enabled():
+        return _snapshot_rows(get_catalog(), slugs, fields, runes, filters)
+    rows = list(_rows_query(slugs, fields, filters))
+    effects = {}
+    if 'rune_effects' in fields:
+        effects = get_rune_effects([row['slug'] for row in rows], runes)
+    return [_row_item(row, fields, effects) for row in rows]
+
+async def aget_spell_rows(slugs: Iterable[str], fields: Iterable[str], runes: Optional[list] = None,
+                          filters: Optional[dict] = None):
+    fields = [f for f in API_FIELDS if f in set(fields)]
+    slugs = list(slugs)
+    filters = filters or {}
+    if snapshot_enabled():
+        return _snapshot_rows(await aget_catalog(), slugs, fields, runes, filters)
+    rows = [row async for row in _rows_query(slugs, fields, filters)]
+    effects = {}
+    if 'rune_effects' in fields:
+        effects = await aget_rune_effects([row['slug'] for row in rows], runes)
+    return [_row_item(row, fields, effects) for row in rows]
+
+def _snapshot_rows(snap, slugs, fields, runes, filters):
+    if slugs or not filters:
+        spells = snap.spells_by_slugs(slugs)
+    else:
+        spells = sorted(snap.spells.values(), key=lambda s: s.name)
+    spells = [sp for sp in spells if all(getattr(sp, k) in v for k, v in filters.items())]
+    effects = snap.effects_for([sp.slug for sp in spells], runes) if 'rune_effects' in fields else {}
+    return [_project(sp, fields, effects) for sp in spells]
+
+def _rows_query(slugs, fields, filters):
+    # sem snapshot: projeção vai para o SELECT e os efeitos vêm só dos pares (magia, runa) pedidos
+    cols = [API_FIELDS[f] for f in fields if f != 'rune_effects']
+    if 'slug' not in fields:
+        cols.append('slug')
+    qs = Spell.objects.all()
+    if slugs or not filters:
+        qs = qs.filter(slug__in=slugs)
+    for key, values in filters.items():
+        qs = qs.filter(**{f'{key}__in': values})  # colunas com índice
+    return qs.order_by('name').values(*cols)
+
+def _row_item(row, fields, effects):
+    item = {f: row[API_FIELDS[f]] for f in fields if f != 'rune_effects'}
+    if 'attributes' in item:
+        item['attributes'] = item['attributes'] or {}
+    if 'rune_effects' in fields:
+        item['rune_effects'] = effects.get(row['slug'], {})
+    return item
+
+def _project(sp, fields, effects):
+    out = {}
+    for f in fields:
+        if f == 'rune_effects':
+            out[f] = effects[sp.slug]
+        elif f == 'attributes':
+            out[f] = sp.attributes_json or {}
+        else:
+            out[f] = getattr(sp, API_FIELDS[f])
+    return out
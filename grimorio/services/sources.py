@@ -0,0 +1,165 @@
+# Fontes do sync_from_gmbinder: manuais por URL ou arquivo local, cada um com suas seções
+# de magias. Download com Session compartilhada (pool de conexões, retries, timeout) e
+# GET condicional contra a cópia em cache; a junção das magias detecta slugs repetidos.
+import hashlib, json, os, sys
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_SECTIONS = (("MAGIAS ARCANAS", "MAGIAS DIVINAS"),)
+CONFLICT_POLICIES = ("error", "first", "last")
+
+class SourceError(Exception):
+    pass
+
+class Source:
+    """Um manual: `location` (URL ou caminho; '-' = entrada padrão) e as seções (início, fim) a extrair."""
+    __slots__ = ("location", "is_url", "sections")
+
+    def __init__(self, location, is_url, sections=DEFAULT_SECTIONS):
+        self.location = location
+        self.is_url = is_url
+        self.sections = tuple(sections)
+
+    def __repr__(self):
+        return f"Source({self.location!r})"
+
+def parse_sections(spec):
+    """'MAGIAS ARCANAS..MAGIAS DIVINAS;MAGIAS DIVINAS..' -> (('MAGIAS ARCANAS', 'MAGIAS DIVINAS'), ('MAGIAS DIVINAS', None)).
+
+    Fim vazio = até o fim do documento. Títulos comparados em maiúsculas, por trecho contido.
+    """
+    out = []
+    for part in spec.split(";"):
+        if not part.strip():
+            continue
+        start, sep, end = part.partition("..")
+        if not sep or not start.strip():
+            raise SourceError(f"Seção inválida: '{part}' (use INICIO..FIM ou INICIO..)")
+        out.append((start.strip().upper(), end.strip().upper() or None))
+    if not out:
+        raise SourceError(f"Nenhuma seção em '{spec}'")
+    return tuple(out)
+
+def parse_source(location, is_url, spec=None, default_sections=DEFAULT_SECTIONS):
+    """Source com as seções de `spec` ('INICIO..FIM;INICIO2..'); sem `spec`, usa `default_sections`.
+
+    As seções vêm em campo próprio (--source-sections), nunca dentro da URL: '#' e ';' são
+    válidos em URLs e a localização é usada como veio.
+    """
+    if not location:
+        raise SourceError("Fonte vazia")
+    return Source(location, is_url, parse_sections(spec) if spec is not None else default_sections)
+
+def make_session(retries=3, pool_size=4, backoff=0.5):
+    """Session com pool de `pool_size` conexões por host e retry (com backoff) em falhas de rede e 429/5xx."""
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset({"GET"}), respect_retry_after_header=True)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def read_file(path):
+    if path == "-":
+        return sys.stdin.read()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError as e:
+        raise SourceError(f"Não consegui ler {path}: {e}")
+
+def _cache_key(location):
+    return hashlib.sha1(location.encode("utf-8")).hexdigest()[:16]
+
+def fetch(session, url, cache_dir, force=False, timeout=60):
+    """html com GET condicional; em 304 (ou mesmo conteúdo) vem da cópia em cache."""
+    key = _cache_key(url)
+    body_path = os.path.join(cache_dir, f"{key}.html")
+    meta_path = os.path.join(cache_dir, f"{key}.json")
+    meta = {}
+    if not force and os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+    headers = {}
+    if meta.get("etag"): headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"): headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        r = session.get(url, headers=headers, timeout=timeout)
+        if r.status_code != 304:
+            r.raise_for_status()
+    except requests.RequestException as e:
+        raise SourceError(f"Falha ao baixar {url}: {e}")
+    if r.status_code == 304:
+        return read_file(body_path)
+    if "charset" not in r.headers.get("Content-Type", "").lower():
+        r.encoding = "utf-8"  # sem charset o requests assumiria latin-1
+
+    digest = hashlib.sha256(r.content).hexdigest()
+    if meta.get("sha256") != digest:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(body_path, "wb") as f:
+            f.write(r.content)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"url": url, "etag": r.headers.get("ETag"),
+                   "last_modified": r.headers.get("Last-Modified"), "sha256": digest}, f)
+    return r.text
+
+# O cache acima só evita downloads. "Mudou" é contra o que foi importado por último
+# (mark_imported, depois do import_content): se extração, junção ou importação falharem,
+# a próxima execução tenta de novo em vez de parar em "sem alterações".
+def source_digest(source, html):
+    # as seções entram no digest: pedir outras seções do mesmo manual também é mudança
+    h = hashlib.sha256(json.dumps(source.sections).encode("utf-8"))
+    h.update(html.encode("utf-8"))
+    return h.hexdigest()
+
+def _imported_path(source, cache_dir):
+    return os.path.join(cache_dir, f"{_cache_key(source.location)}.imported")
+
+def load(source, session, cache_dir, force=False, timeout=60):
+    """(html, mudou) de uma fonte; arquivo local conta sempre como mudado."""
+    if not source.is_url:
+        return read_file(source.location), True
+    html = fetch(session, source.location, cache_dir, force, timeout)
+    if force:
+        return html, True
+    try:
+        with open(_imported_path(source, cache_dir), "r", encoding="utf-8") as f:
+            return html, f.read().strip() != source_digest(source, html)
+    except OSError:
+        return html, True
+
+def mark_imported(source, html, cache_dir):
+    if source.is_url:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(_imported_path(source, cache_dir), "w", encoding="utf-8") as f:
+            f.write(source_digest(source, html))
+
+def _same(a, b):
+    return all(a[k] == b[k] for k in ("name", "manual_html", "attributes", "rune_effects"))
+
+def merge_spells(batches, on_conflict="error"):
+    """Junta [(fonte, magias)] na ordem das fontes -> (magias, conflitos).
+
+    Mesmo slug com conteúdo idêntico (ex.: suplemento que repete uma magia) não é conflito.
+    Conflito = (slug, fonte que ficou, fonte descartada); 'last' deixa a última fonte vencer.
+    """
+    merged, origin, conflicts = {}, {}, []
+    for label, spells in batches:
+        for sp in spells:
+            slug = sp["slug"]
+            prev = merged.get(slug)
+            if prev is None:
+                merged[slug], origin[slug] = sp, label
+                continue
+            if _same(prev, sp):
+                continue
+            if on_conflict == "last":
+                conflicts.append((slug, label, origin[slug]))
+                merged[slug], origin[slug] = sp, label
+            else:
+                conflicts.append((slug, origin[slug], label))
+    return list(merged.values()), conflicts
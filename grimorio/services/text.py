@@ -0,0 +1,6 @@
+# Forma canônica de texto compartilhada por content, effects e search (sem outras dependências do app).
+from unidecode import unidecode
+
+def fold(text: str) -> str:
+    """Forma usada na busca: sem acentos e minúscula ("Execução" -> "execucao")."""
+    return unidecode(text or "").lower()
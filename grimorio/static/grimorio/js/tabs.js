@@ -1,19 +1,54 @@
 document.addEventListener("DOMContentLoaded", () => {
-  const tabs = Array.from(document.querySelectorAll(".tab"));
-  const panels = Array.from(document.querySelectorAll(".tabpanel"));
+  const tabs = () => Array.from(document.querySelectorAll(".tab"));
+  const panels = () => Array.from(document.querySelectorAll(".tabpanel"));
+
+  // Seleções grandes (modo preguiçoso): painéis vêm vazios com data-src e são buscados
+  // ao ativar a aba; as abas vizinhas são pré-carregadas. Fragmentos ficam em memória por URL.
+  const fragments = new Map();
+
+  function fetchFragment(url){
+    if (!fragments.has(url)){
+      const req = fetch(url, {credentials: "same-origin"}).then(r => {
+        if (!r.ok) throw new Error(r.status);
+        return r.text();
+      });
+      req.catch(() => fragments.delete(url));
+      fragments.set(url, req);
+    }
+    return fragments.get(url);
+  }
+
+  function loadPanel(panel){
+    const url = panel && panel.getAttribute("data-src");
+    if (!url) return Promise.resolve();
+    return fetchFragment(url).then(html => {
+      if (panel.getAttribute("data-src") !== url) return;
+      panel.innerHTML = html;
+      panel.removeAttribute("data-src");
+    }).catch(() => {
+      panel.innerHTML = '<p class="loading"><em>Falha ao carregar. Clique na aba para tentar de novo.</em></p>';
+    });
+  }
 
   function activateById(panelId){
-    panels.forEach(p => p.classList.toggle("hidden", p.id !== panelId));
-    tabs.forEach(t => {
+    panels().forEach(p => p.classList.toggle("hidden", p.id !== panelId));
+    tabs().forEach(t => {
       const active = t.getAttribute("data-target") === panelId;
       t.classList.toggle("active", active);
       t.setAttribute("aria-selected", active ? "true" : "false");
     });
+    const all = panels();
+    const i = all.findIndex(p => p.id === panelId);
+    if (i < 0) return;
+    loadPanel(all[i]).then(() => {
+      [all[i + 1], all[i - 1]].forEach(p => { if (p) loadPanel(p); });
+    });
   }
 
   function activateFromHash(){
     const hash = window.location.hash.replace("#", "");
-    const target = hash ? `panel-${hash}` : (panels[0] && panels[0].id);
+    const first = panels()[0];
+    const target = hash ? `panel-${hash}` : (first && first.id);
     if (target) activateById(target);
   }
 
@@ -27,6 +62,53 @@ document.addEventListener("DOMContentLoaded", () => {
     activateById(target);
   });
 
+  // Bundle estático (build_grimorio_bundle): monta a seleção de ?spells=...&runes=...
+  // a partir do manifest e dos fragmentos pré-renderizados, sem passar pelo Django.
+  async function assembleBundle(section){
+    const base = new URL(section.getAttribute("data-bundle-manifest"), window.location.href);
+    const manifest = await fetch(base).then(r => r.json());
+    const params = new URLSearchParams(window.location.search);
+    const wanted = (key) => new Set((params.get(key) || "").split(",").filter(Boolean));
+    const selSpells = wanted("spells");
+    const selRunes = wanted("runes");
+    const spells = manifest.spells.filter(s => selSpells.has(s.slug));
+    const runes = manifest.runes.filter(r => selRunes.has(r.slug));
+    if (!spells.length){
+      section.innerHTML = '<div class="empty"><p>Nenhuma magia selecionada.</p></div>';
+      return;
+    }
+
+    const nav = document.querySelector("nav.tabs");
+    const data = await Promise.all(spells.map(s => fetch(new URL(s.file, base)).then(r => r.json())));
+    data.forEach((sp, i) => {
+      const btn = document.createElement("button");
+      btn.className = "tab";
+      btn.id = `tab-${sp.slug}`;
+      btn.setAttribute("role", "tab");
+      btn.setAttribute("aria-controls", `panel-${sp.slug}`);
+      btn.setAttribute("data-target", `panel-${sp.slug}`);
+      btn.textContent = sp.name;
+      nav.appendChild(btn);
+
+      const article = document.createElement("article");
+      article.id = `panel-${sp.slug}`;
+      article.className = i === 0 ? "tabpanel" : "tabpanel hidden";
+      article.setAttribute("role", "tabpanel");
+      article.setAttribute("aria-labelledby", `tab-${sp.slug}`);
+      article.innerHTML = sp.panel;
+      if (runes.length){
+        const tpl = document.createElement("template");
+        tpl.innerHTML = manifest.runes_block.trim();
+        const block = tpl.content.firstElementChild;
+        block.querySelector(".rune-cards").innerHTML = runes.map(r => sp.cards[r.slug] || r.card).join("");
+        article.querySelector(".spell-body").appendChild(block);
+      }
+      section.appendChild(article);
+    });
+  }
+
   window.addEventListener("hashchange", activateFromHash);
-  activateFromHash();
+  const bundle = document.querySelector("[data-bundle-manifest]");
+  if (bundle) assembleBundle(bundle).then(activateFromHash);
+  else activateFromHash();
 });
@@ -0,0 +1,97 @@
+import json
+from datetime import timedelta
+from django.test import override_settings
+from grimorio.models import Spell
+from grimorio.services.content import ATTRIBUTE_ENUMS
+from grimorio.tests.utils import ContentTestCase
+
+class ApiSpellsTests(ContentTestCase):
+    def get(self, **params):
+        return self.client.get("/api/spells", params)
+
+    def test_full_rows_by_default(self):
+        spell = self.get(ids="arma-magica").json()["spells"][0]
+        self.assertEqual(set(spell), {"slug", "name", "attributes", "manual_html", "rune_effects"})
+
+    def test_fields_projection(self):
+        spells = self.get(ids="compreender,arma-magica", fields="slug,name").json()["spells"]
+        self.assertEqual(spells, [{"slug": "arma-magica", "name": "ARMA MÁGICA"},
+                                  {"slug": "compreender", "name": "COMPREENDER"}])
+
+    def test_unknown_field(self):
+        response = self.get(ids="arma-magica", fields="slug,senha")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("senha", response.json()["error"])
+
+    def test_compact_drops_manual_and_unrequested_effects(self):
+        spell = self.get(ids="arma-magica", compact="1").json()["spells"][0]
+        self.assertNotIn("manual_html", spell)
+        self.assertEqual(spell["rune_effects"], {})
+        spell = self.get(ids="arma-magica", compact="1", runes="fogo").json()["spells"][0]
+        self.assertEqual(list(spell["rune_effects"]), ["fogo"])
+
+    def test_same_rows_without_snapshot(self):
+        params = {"ids": "arma-magica,compreender", "fields": "slug,attributes,rune_effects", "runes": "fogo,gelo"}
+        snap = self.get(**params).json()
+        with override_settings(GRIMORIO_CATALOG_SNAPSHOT=False):
+            self.assertEqual(self.get(**params).json(), snap)
+
+class ApiFilterTests(ContentTestCase):
+    def slugs(self, **params):
+        response = self.client.get("/api/spells", {"fields": "slug", **params})
+        self.assertEqual(response.status_code, 200)
+        return {s["slug"] for s in response.json()["spells"]}
+
+    def test_filter_the_whole_catalog(self):
+        expected = set(Spell.objects.filter(alcance__in=["curto", "toque"]).values_list("slug", flat=True))
+        self.assertTrue(expected)
+        self.assertEqual(self.slugs(alcance="curto,toque"), expected)
+        self.assertIn("arma-magica", expected)
+
+    def test_filters_combine_with_ids(self):
+        self.assertEqual(self.slugs(ids="arma-magica,disparo-arcano", alcance="curto"), {"arma-magica"})
+        self.assertEqual(self.slugs(ids="arma-magica", alcance="curto", duracao="instantaneo"), set())
+
+    def test_same_result_without_snapshot(self):
+        params = {"alcance": "medio", "execucao": "acao"}
+        snap = self.slugs(**params)
+        with override_settings(GRIMORIO_CATALOG_SNAPSHOT=False):
+            self.assertEqual(self.slugs(**params), snap)
+
+    def test_unknown_value(self):
+        response = self.client.get("/api/spells", {"alcance": "perto"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("perto", response.json()["error"])
+        self.assertEqual(response.json()["alcance"], list(ATTRIBUTE_ENUMS["alcance"]))
+
+class ApiExportTests(ContentTestCase):
+    def export(self, **params):
+        response = self.client.get("/api/spells/export", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson; charset=utf-8")
+        return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    def test_one_line_per_spell(self):
+        rows = self.export()
+        self.assertEqual(len(rows), Spell.objects.count())
+        spell = next(r for r in rows if r["slug"] == "arma-magica")
+        self.assertIn("fogo", spell["rune_effects"])
+        self.assertTrue(spell["manual_html"])
+
+    @override_settings(GRIMORIO_EXPORT_CHUNK_SIZE=2)
+    def test_chunks_do_not_change_the_output(self):
+        with override_settings(GRIMORIO_EXPORT_CHUNK_SIZE=200):
+            full = self.export()
+        self.assertEqual(self.export(), full)
+
+    def test_since(self):
+        rows = self.export()
+        last = Spell.objects.latest("updated_at").updated_at
+        Spell.objects.filter(slug="arma-magica").update(updated_at=last + timedelta(seconds=1))
+        self.assertEqual([r["slug"] for r in self.export(since=last.isoformat())], ["arma-magica"])
+        self.assertEqual(len(self.export(since=rows[0]["updated_at"][:10])), len(rows))
+        self.assertEqual(self.export(since=(last + timedelta(seconds=1)).isoformat()), [])
+
+    def test_invalid_since(self):
+        self.assertEqual(self.client.get("/api/spells/export", {"since": "ontem"}).status_code, 400)
@@ -0,0 +1,64 @@
+import io, json, os, tempfile
+from contextlib import redirect_stderr, redirect_stdout
+from django.test import SimpleTestCase, TestCase
+from benchmarks import compare, synthetic
+from grimorio.models import Rune, Spell, SpellRuneEffect
+from grimorio.tests.utils import import_content, reset_caches
+
+def _files(root):
+    out = {}
+    for folder in ("spells", "runes"):
+        for name in sorted(os.listdir(os.path.join(root, folder))):
+            with open(os.path.join(root, folder, name), "rb") as f:
+                out[f"{folder}/{name}"] = f.read()
+    return out
+
+class SyntheticContentTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.addCleanup(reset_caches)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+    def test_same_seed_same_bytes(self):
+        a, b, c = (os.path.join(self.root, n) for n in "abc")
+        synthetic.generate(a, 5, 4, seed=1)
+        synthetic.generate(b, 5, 4, seed=1)
+        synthetic.generate(c, 5, 4, seed=2)
+        self.assertEqual(_files(a), _files(b))
+        self.assertNotEqual(_files(a), _files(c))
+
+    def test_imports_like_real_content(self):
+        spells, runes = synthetic.generate(self.root, 12, 17)
+        self.assertEqual(runes[-2:], ["agua-15", "ar-16"])
+        import_content(content_root=self.root)
+        self.assertEqual(Spell.objects.count(), 12)
+        self.assertEqual(Rune.objects.count(), 17)
+        self.assertTrue(SpellRuneEffect.objects.exists())
+        spell = Spell.objects.get(slug=spells[0])
+        self.assertTrue(spell.execucao and spell.alcance)
+        self.assertNotIn("<td></td>", spell.manual_html)
+
+class CompareTests(SimpleTestCase):
+    def report(self, commit, p50, queries):
+        return {"meta": {"commit": commit},
+                "results": [{"scenario": "grimorio", "params": {"spells": 5}, "p50_ms": p50, "queries": queries}]}
+
+    def test_regressions(self):
+        base = self.report("a", 10.0, 3)
+        self.assertFalse(compare.compare(base, self.report("b", 11.0, 3), 0.2, "p50_ms")[0]["regression"])
+        self.assertTrue(compare.compare(base, self.report("b", 13.0, 3), 0.2, "p50_ms")[0]["regression"])
+        self.assertTrue(compare.compare(base, self.report("b", 9.0, 4), 0.2, "p50_ms")[0]["regression"])
+
+    def test_exit_code(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        paths = []
+        for name, p50 in (("base.json", 10.0), ("atual.json", 20.0)):
+            paths.append(os.path.join(tmp.name, name))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                json.dump(self.report(name, p50, 3), f)
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            self.assertEqual(compare.main(paths), 1)
+            self.assertEqual(compare.main([paths[0], paths[0]]), 0)
@@ -0,0 +1,53 @@
+import io, json, os, tempfile
+from django.conf import settings
+from django.core.management import call_command
+from grimorio.models import ContentVersion, Spell, SpellRuneEffect
+from grimorio.tests.utils import ContentTestCase
+
+class BundleTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = tmp.name
+
+    def build(self, *args):
+        call_command("build_grimorio_bundle", *args, out=self.out, stdout=io.StringIO())
+        with open(os.path.join(self.out, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def read(self, name):
+        with open(os.path.join(self.out, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_manifest_and_fragments(self):
+        manifest = self.build()
+        self.assertEqual(manifest["version"], ContentVersion.current())
+        self.assertEqual(len(manifest["spells"]), Spell.objects.count())
+        self.assertTrue(os.path.exists(os.path.join(self.out, "index.html")))
+        entry = next(s for s in manifest["spells"] if s["slug"] == "arma-magica")
+        self.assertRegex(entry["file"], r"^spells/arma-magica\.[0-9a-f]{12}\.json$")
+        self.assertRegex(entry["file"], settings.WHITENOISE_IMMUTABLE_FILE_TEST)
+        fragment = self.read(entry["file"])
+        runes = set(SpellRuneEffect.objects.filter(spell__slug="arma-magica").values_list("rune__slug", flat=True))
+        self.assertEqual(set(fragment["cards"]), runes)
+        self.assertIn("ARMA MÁGICA", fragment["panel"])
+
+    def test_rebuild_keeps_unchanged_names_and_drops_stale(self):
+        first = {s["slug"]: s["file"] for s in self.build()["spells"]}
+        stale = os.path.join(self.out, "spells", "removida.0123456789ab.json")
+        with open(stale, "w") as f:
+            f.write("{}")
+        Spell.objects.filter(slug="arma-magica").update(name="ARMA MÁGICA II")
+        second = {s["slug"]: s["file"] for s in self.build()["spells"]}
+        self.assertNotEqual(second["arma-magica"], first["arma-magica"])
+        self.assertEqual({k: v for k, v in second.items() if k != "arma-magica"},
+                         {k: v for k, v in first.items() if k != "arma-magica"})
+        self.assertEqual(sorted(f"spells/{n}" for n in os.listdir(os.path.join(self.out, "spells"))),
+                         sorted(second.values()))
+
+    def test_keep_old(self):
+        self.build()
+        Spell.objects.filter(slug="arma-magica").update(name="ARMA MÁGICA II")
+        self.build("--keep-old")
+        self.assertEqual(len([n for n in os.listdir(os.path.join(self.out, "spells")) if n.startswith("arma-magica.")]), 2)
@@ -0,0 +1,42 @@
+from django.test import override_settings
+from grimorio.models import ContentVersion
+from grimorio.tests.utils import ContentTestCase
+
+@override_settings(GRIMORIO_CATALOG_TTL=0)
+class ConditionalGetTests(ContentTestCase):
+    def test_grimorio_revalidates(self):
+        url = "/grimorio/?spells=arma-magica&runes=fogo"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("public", first["Cache-Control"])
+        self.assertIn("Last-Modified", first)
+        again = self.client.get(url, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertIn("public", again["Cache-Control"])
+
+    def test_selection_order_does_not_change_the_etag(self):
+        a = self.client.get("/grimorio/?spells=arma-magica,compreender&runes=fogo,gelo")
+        b = self.client.get("/grimorio/?spells=compreender,arma-magica&runes=gelo,fogo")
+        self.assertEqual(a["ETag"], b["ETag"])
+
+    def test_new_content_version_changes_the_etag(self):
+        first = self.client.get("/api/spells", {"ids": "arma-magica"})
+        ContentVersion.bump()
+        again = self.client.get("/api/spells", {"ids": "arma-magica"}, headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(again.status_code, 200)
+        self.assertNotEqual(again["ETag"], first["ETag"])
+
+    def test_api_spells_etag_follows_the_query(self):
+        base = self.client.get("/api/spells", {"ids": "arma-magica"})
+        self.assertEqual(self.client.get("/api/spells", {"ids": "arma-magica"},
+                                         headers={"If-None-Match": base["ETag"]}).status_code, 304)
+        for params in ({"ids": "compreender"}, {"ids": "arma-magica", "runes": "fogo"},
+                       {"ids": "arma-magica", "compact": "1"}):
+            self.assertNotEqual(self.client.get("/api/spells", params)["ETag"], base["ETag"], params)
+
+    @override_settings(GRIMORIO_SESSION_SELECTION=True)
+    def test_session_selection_is_private(self):
+        response = self.client.get("/grimorio/")
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
@@ -0,0 +1,41 @@
+from django.test import override_settings
+from grimorio.models import ContentVersion, Spell
+from grimorio.services import catalog, selectors
+from grimorio.tests.utils import ContentTestCase
+
+class CatalogSnapshotTests(ContentTestCase):
+    def test_reads_come_from_memory(self):
+        snap = catalog.get_catalog()
+        with self.assertNumQueries(0):
+            self.assertIs(catalog.get_catalog(), snap)
+            spells = selectors.get_spells_by_slugs(["compreender", "arma-magica", "nao-existe"])
+            runes = selectors.get_runes_by_slugs(["gelo", "fogo"])
+            effects = selectors.get_rune_effects(["arma-magica"], ["fogo"])
+        self.assertEqual([s.slug for s in spells], ["arma-magica", "compreender"])
+        self.assertEqual([r.slug for r in runes], ["fogo", "gelo"])
+        self.assertEqual(list(effects["arma-magica"]), ["fogo"])
+
+    def test_snapshot_is_read_only(self):
+        with self.assertRaises(TypeError):
+            catalog.get_catalog().spells["nova"] = None
+
+    @override_settings(GRIMORIO_CATALOG_TTL=0)
+    def test_version_bump_rebuilds(self):
+        snap = catalog.get_catalog()
+        Spell.objects.filter(slug="arma-magica").update(name="Arma Mágica Renomeada")
+        self.assertIs(catalog.get_catalog(), snap)  # mesma versão: nada muda
+        ContentVersion.bump()
+        fresh = catalog.get_catalog()
+        self.assertEqual(fresh.version, snap.version + 1)
+        self.assertEqual(fresh.spells["arma-magica"].name, "Arma Mágica Renomeada")
+
+    def test_same_answers_without_snapshot(self):
+        slugs, runes = ["compreender", "arma-magica"], ["fogo", "gelo"]
+        snap = ([s.slug for s in selectors.get_spells_by_slugs(slugs)],
+                [r.slug for r in selectors.get_runes_by_slugs(runes)],
+                selectors.get_rune_effects(slugs, runes))
+        with override_settings(GRIMORIO_CATALOG_SNAPSHOT=False):
+            orm = ([s.slug for s in selectors.get_spells_by_slugs(slugs)],
+                   [r.slug for r in selectors.get_runes_by_slugs(runes)],
+                   selectors.get_rune_effects(slugs, runes))
+        self.assertEqual(snap, orm)
@@ -0,0 +1,61 @@
+import gzip, json
+from unittest import skipIf
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from grimorio.middleware import CompressionMiddleware
+from grimorio.services import compression
+from grimorio.tests.utils import ContentTestCase
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+@override_settings(GRIMORIO_COMPRESS_MIN_BYTES=0)
+class CompressionTests(ContentTestCase):
+    def test_negotiate(self):
+        self.assertEqual(compression.negotiate("br;q=0, gzip"), "gzip")
+        self.assertEqual(compression.negotiate("identity"), None)
+        self.assertEqual(compression.negotiate("*"), compression.available()[0])
+
+    def test_queries_sharing_tokens_get_their_own_body(self):
+        for q in ("fogo", "FOGO!!", "fogo"):
+            response = self.client.get("/api/search", {"q": q}, headers=GZIP)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(json.loads(gzip.decompress(response.content))["query"], q)
+
+    def test_cache_is_keyed_on_the_body_not_the_etag(self):
+        # dois corpos com o mesmo ETag (derivado da requisição) não podem trocar de lugar
+        bodies = iter([b'{"q": "a"}' * 50, b'{"q": "b"}' * 50])
+
+        def view(request):
+            response = HttpResponse(next(bodies), content_type="application/json")
+            response["ETag"] = '"mesmo"'
+            response["Cache-Control"] = "public, max-age=300"
+            return response
+
+        middleware = CompressionMiddleware(view)
+        request = RequestFactory().get("/", headers=GZIP)
+        first, second = middleware(request), middleware(request)
+        self.assertEqual(gzip.decompress(first.content), b'{"q": "a"}' * 50)
+        self.assertEqual(gzip.decompress(second.content), b'{"q": "b"}' * 50)
+        self.assertEqual(first["ETag"], 'W/"mesmo"')
+
+    def test_public_body_is_compressed_once(self):
+        data = b"grimorio " * 200
+        body = compression.cached_compress(data, "gzip")
+        self.assertEqual(compression._cache().get(compression.compressed_key(data, "gzip")), body)
+        self.assertIsNone(compression._cache().get(compression.compressed_key(data + b" ", "gzip")))
+        self.assertEqual(gzip.decompress(body), data)
+
+    def test_not_modified_keeps_vary(self):
+        first = self.client.get("/api/search", {"q": "fogo"}, headers=GZIP)
+        again = self.client.get("/api/search", {"q": "fogo"}, headers={**GZIP, "If-None-Match": first["ETag"]})
+        self.assertEqual(again.status_code, 304)
+        self.assertIn("Accept-Encoding", again["Vary"])
+
+    def test_moderate_level_on_the_request_path(self):
+        data = b"grimorio " * 2000
+        self.assertEqual(compression.cached_compress(data, "gzip"), gzip.compress(data, compresslevel=6, mtime=0))
+
+    @skipIf(compression.brotli is None, "brotli não instalado")
+    def test_moderate_brotli_quality(self):
+        data = json.dumps({"spells": [str(i) * 20 for i in range(500)]}).encode()
+        self.assertEqual(compression.cached_compress(data, "br"), compression.brotli.compress(data, quality=5))
@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase
+from grimorio.services.content import clean_html, normalize_attributes, normalize_html, parse_spell_file
+from grimorio.tests.utils import CONTENT_ROOT
+
+class NormalizeHtmlTests(SimpleTestCase):
+    def test_gm_binder_clutter_is_removed(self):
+        html = ('<p>\n  Dano   de <strong>Fogo</strong>.\n</p>\n<table><tbody><tr><td> </td></tr></tbody></table>'
+                '<p style=""></p><!-- nota --><ul>\n<li>Um</li>\n</ul>')
+        self.assertEqual(normalize_html(html), "<p> Dano de <strong>Fogo</strong>. </p><ul><li>Um</li></ul>")
+
+    def test_inline_spacing_and_pre_are_kept(self):
+        self.assertEqual(normalize_html("<p><em>a</em> <strong>b</strong></p>"), "<p><em>a</em> <strong>b</strong></p>")
+        self.assertEqual(normalize_html("<pre>a\n   b</pre>"), "<pre>a\n   b</pre>")
+        self.assertEqual(normalize_html("<p>a<br/></p>"), "<p>a<br/></p>")
+
+    def test_inline_spacing_inside_div(self):
+        self.assertEqual(normalize_html("<div><strong>Fogo</strong> <em>Gelo</em></div>"),
+                         "<div><strong>Fogo</strong> <em>Gelo</em></div>")
+        self.assertEqual(normalize_html("<div>\n<p>a</p>\n<p>b</p>\n</div>"), "<div><p>a</p><p>b</p></div>")
+
+    def test_clean_html_sanitizes_then_normalizes(self):
+        self.assertEqual(clean_html('<p onclick="x()">Oi<script>alert(1)</script></p>'), "<p>Oialert(1)</p>")
+
+    def test_spell_file_reports_bytes_saved(self):
+        data = parse_spell_file(str(CONTENT_ROOT / "spells" / "arma-magica.yml"))
+        self.assertGreater(data["bytes_saved"], 0)
+        self.assertEqual(normalize_html(data["manual_html"]), data["manual_html"])  # idempotente
+        self.assertNotIn("\n", data["manual_html"])
+
+class NormalizeAttributesTests(SimpleTestCase):
+    def test_keys_markup_and_manual_fallback(self):
+        attrs, facets = normalize_attributes(
+            {"Execução": "** Ação", "área": "* ___", "Alcance": "—"},
+            "<ul><li><strong>Duração.</strong> 10 minutos (Concentração)</li></ul>")
+        self.assertEqual(attrs, {"execucao": "Ação", "duracao": "10 minutos (Concentração)"})
+        self.assertEqual(facets, {"execucao": "acao", "alcance": "", "duracao": "concentracao"})
+
+    def test_values_outside_the_enums(self):
+        _, facets = normalize_attributes({"alcance": "De acordo com o Círculo da Magia"})
+        self.assertEqual(facets["alcance"], "")
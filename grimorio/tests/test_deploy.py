@@ -0,0 +1,39 @@
+import json, os, runpy
+from unittest import mock
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from grimorio.tests.utils import ContentTestCase
+
+GUNICORN_CONF = str(settings.BASE_DIR / "gunicorn.conf.py")
+
+class AsyncStreamingTests(ContentTestCase):
+    @override_settings(GRIMORIO_PERF_ENABLED=False)
+    async def test_streaming_is_async_without_perf_middleware(self):
+        response = await self.async_client.get("/api/spells/export")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertIn("arma-magica", [json.loads(line)["slug"] for line in body.splitlines()])
+
+    def test_wsgi_streaming_stays_sync(self):
+        response = self.client.get("/api/spells/export")
+        self.assertFalse(response.is_async)
+        response.close()
+
+class GunicornConfTests(SimpleTestCase):
+    def worker_class(self, *argv, **env):
+        env = {k: v for k, v in os.environ.items() if not k.startswith("GUNICORN_")} | env
+        with mock.patch("sys.argv", ["gunicorn", *argv]), mock.patch.dict(os.environ, env, clear=True):
+            return runpy.run_path(GUNICORN_CONF)["worker_class"]
+
+    def test_asgi_app_uses_uvicorn_workers(self):
+        self.assertEqual(self.worker_class("-w", "2", "nexus_site.asgi:application"), "uvicorn_worker.UvicornWorker")
+
+    def test_wsgi_app_keeps_sync_workers(self):
+        self.assertEqual(self.worker_class("nexus_site.wsgi"), "sync")
+        self.assertEqual(self.worker_class("-b", "0.0.0.0:8000", "nexus_site.wsgi:application"), "sync")
+
+    def test_cmd_args_and_explicit_worker_class(self):
+        self.assertEqual(self.worker_class(GUNICORN_CMD_ARGS="nexus_site.asgi:application"),
+                         "uvicorn_worker.UvicornWorker")
+        self.assertEqual(self.worker_class("nexus_site.asgi:application", GUNICORN_WORKER_CLASS="sync"), "sync")
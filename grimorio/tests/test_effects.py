@@ -0,0 +1,117 @@
+import glob
+from django.test import SimpleTestCase
+from grimorio.models import Spell, SpellRuneEffect
+from grimorio.services.content import parse_spell_file
+from grimorio.services.effect_matrix import get_matrix
+from grimorio.services.effects import CONDITIONS, parse_circles, parse_effect_terms
+from grimorio.tests.utils import CONTENT_ROOT, ContentTestCase
+
+def _spells():
+    return [parse_spell_file(path) for path in sorted(glob.glob(str(CONTENT_ROOT / "spells" / "*.yml")))]
+
+class EffectParsingTests(SimpleTestCase):
+    """Extração dos termos sobre o conteúdo real de content/."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.spells = _spells()
+        cls.terms = [t for s in cls.spells for terms in s["effect_terms"].values() for t in terms]
+
+    def labels(self, kind):
+        return {t["label"] for t in self.terms if t["kind"] == kind}
+
+    def test_conditions_come_from_the_vocabulary(self):
+        labels = self.labels("condition") | self.labels("immunity")
+        self.assertLessEqual(labels, set(CONDITIONS.values()))
+        self.assertFalse(labels & {"terreno", "empurrando", "empurre", "teletransportar", "imune", "sangramento"})
+
+    def test_inflections_share_one_key(self):
+        self.assertEqual(parse_effect_terms("O alvo sofre Sangramento (1).")[0]["label"], "sangrando")
+        self.assertEqual(parse_effect_terms("Criaturas ficam Lentas (2).")[0]["label"], "lento")
+        self.assertEqual(parse_effect_terms("Empurre (6) cada alvo (Vontade diminui).")[0],
+                         {"kind": "condition", "label": "empurrado", "amount": 6, "dice": None,
+                          "scaling": "flat", "min_applications": 1, "save": "vontade"})
+
+    def test_negated_conditions_are_immunities(self):
+        terms = parse_effect_terms("O alvo não pode ficar Agarrado, Lento ou Imóvel.")
+        self.assertEqual([(t["kind"], t["label"]) for t in terms],
+                         [("immunity", "agarrado"), ("immunity", "lento"), ("immunity", "imovel")])
+
+    def test_modifiers_movement_and_terrain(self):
+        terms = parse_effect_terms("Aumente o deslocamento do alvo em 1 para cada vez que aplicar essa Runa. "
+                                   "Se aplicar uma terceira vez, concede deslocamento de Voo.")
+        self.assertEqual([(t["kind"], t["label"], t["amount"], t["scaling"], t["min_applications"]) for t in terms],
+                         [("modifier", "deslocamento", 1, "application", 1), ("movement", "voo", None, "flat", 3)])
+        self.assertEqual(parse_effect_terms("reduz a Resistência do alvo em 2")[0]["amount"], -2)
+        self.assertEqual([t["label"] for t in parse_effect_terms("Congela superfícies, gerando Terreno Escorregadio.")],
+                         ["terreno escorregadio"])
+        self.assertEqual(parse_effect_terms("Uma arma à distância ignora cobertura."), [])
+
+    def test_coverage(self):
+        # sem termos sobram só textos descritivos (compreender/lembrar/localizar/prever, ilusões...)
+        effects = [terms for s in self.spells for terms in s["effect_terms"].values()]
+        self.assertLess(sum(not terms for terms in effects), 110)
+        descriptive = {"compreender", "lembrar", "localizar", "prever"}
+        numbered = [terms for s in self.spells if s["slug"] not in descriptive for terms in s["effect_terms"].values()]
+        self.assertGreater(sum(bool(terms) for terms in numbered) / len(numbered), 0.75)
+
+    def test_circles_only_from_the_circle_table(self):
+        circles = {s["slug"]: s["circles"] for s in self.spells}
+        self.assertEqual(circles["disparo-arcano"]["3"], {"dice": "6d8", "bonus": 15, "label": "dano",
+                                                          "text": "6d8 + 15 de dano"})
+        self.assertEqual(circles["enfraquecer-criatura"]["1"]["bonus"], -2)
+        self.assertEqual(circles["armadura-arcana"], {})  # "Círculo 1: ..." ainda sem texto
+        for slug in ("criar-elemento", "compreender", "dissipar-magia"):
+            self.assertEqual({(c["dice"], c["bonus"], c["label"]) for c in circles[slug].values()},
+                             {(None, None, None)}, slug)
+        self.assertEqual(circles["criar-elemento"]["1"]["text"], "Raio (2)")
+
+    def test_lists_outside_the_circle_table_are_ignored(self):
+        html = ("<ul><li>Alvo. Área conforme o Círculo</li></ul>"
+                "<ul><li>Círculo 1: 2d6 de dano</li><li>Círculo 2: 4d6 de dano</li></ul>"
+                "<ul><li>Círculo 1: Bônus de +9</li></ul>")
+        self.assertEqual({k: c["dice"] for k, c in parse_circles(html).items()}, {"1": "2d6", "2": "4d6"})
+
+class EffectMatrixTests(ContentTestCase):
+    def test_terms_are_imported(self):
+        effect = SpellRuneEffect.objects.get(spell__slug="disparo-arcano", rune__slug="fogo")
+        self.assertEqual([(t["kind"], t["label"]) for t in effect.terms], [("damage", "fogo"), ("condition", "em chamas")])
+        self.assertIsNone(Spell.objects.get(slug="criar-elemento").circles_json["1"]["label"])
+
+    def test_circle_base_and_rune_terms(self):
+        totals = get_matrix().evaluate("disparo-arcano", 3, [("fogo", 2)])["totals"]
+        self.assertEqual(totals["dice"], {"d8": 6})
+        self.assertEqual(totals["damage"], 15)
+        self.assertEqual(totals["conditions"], {"em chamas": 2.0})
+
+    def test_totals_by_kind(self):
+        totals = get_matrix().evaluate("aprimorar-movimento", 1, [("essencia", 2)])["totals"]
+        self.assertEqual(totals["modifiers"], {"deslocamento": 2.0})
+        self.assertEqual(totals["conditions"], {})
+
+
+class EffectsViewTests(ContentTestCase):
+    def get(self, headers=None, **params):
+        return self.client.get("/api/effects", {"spell": "arma-magica", "circle": 1, **params}, headers=headers)
+
+    def test_runes_keep_query_order(self):
+        a = self.get(runes="fogo:2,gelo")
+        b = self.get(runes="gelo,fogo:2")
+        self.assertEqual([r["rune"] for r in a.json()["runes"]], ["fogo", "gelo"])
+        self.assertEqual([r["rune"] for r in b.json()["runes"]], ["gelo", "fogo"])
+        self.assertNotEqual(a["ETag"], b["ETag"])
+
+    def test_repeated_rune_adds_applications(self):
+        self.assertEqual(self.get(runes="fogo,fogo:2").json()["runes"][0]["applications"], 3)
+
+    def test_not_modified(self):
+        first = self.get(runes="fogo:2")
+        self.assertEqual(self.get(runes="fogo:2", headers={"If-None-Match": first["ETag"]}).status_code, 304)
+
+    def test_validation(self):
+        self.assertEqual(self.get(runes="fogo:x").status_code, 400)
+        self.assertEqual(self.get(circle=9).status_code, 400)
+        self.assertEqual(self.get(runes="fogo:99").status_code, 400)
+        self.assertEqual(self.get(runes="runa-fantasma").status_code, 400)
+        self.assertEqual(self.client.get("/api/effects", {"spell": "nao-existe"}).status_code, 404)
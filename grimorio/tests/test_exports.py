@@ -0,0 +1,108 @@
+import logging, os, tempfile, time
+from unittest import mock
+from django.test import override_settings
+from grimorio.models import Spell
+from grimorio.services import exports
+from grimorio.services.catalog import content_version
+from grimorio.tests.utils import ContentTestCase
+
+class PrintExportTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        settings = override_settings(GRIMORIO_EXPORT_DIR=self.dir, GRIMORIO_EXPORT_WORKERS=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def files(self):
+        return sorted(os.listdir(self.dir))
+
+    def test_html_export(self):
+        response = self.client.get("/grimorio/export.html", {"spells": "arma-magica", "runes": "fogo"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ARMA MÁGICA", b"".join(response.streaming_content).decode())
+
+    def test_equivalent_selections_share_one_file(self):
+        for spells, runes in (("arma-magica,compreender", "fogo"),
+                              ("compreender,arma-magica,arma-magica", "fogo,fogo"),
+                              ("arma-magica,nao-existe,compreender", "fogo,runa-fantasma")):
+            response = self.client.get("/grimorio/export.html", {"spells": spells, "runes": runes})
+            self.assertEqual(response.status_code, 200)
+            response.close()
+        self.assertEqual(len(self.files()), 1)
+
+    def test_unknown_spells_only(self):
+        response = self.client.get("/grimorio/export.html", {"spells": "nao-existe"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.files(), [])
+
+    @override_settings(GRIMORIO_EXPORT_MAX_SPELLS=1)
+    def test_selection_size_is_capped(self):
+        response = self.client.get("/grimorio/export.html", {"spells": "arma-magica,compreender"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.files(), [])
+
+    def test_least_recently_used_is_evicted(self):
+        def export(spell):
+            self.client.get("/grimorio/export.html", {"spells": spell}).close()
+
+        export("arma-magica")
+        export("compreender")
+        old, recent = (os.path.join(self.dir, f) for f in self.files())
+        size = os.path.getsize(old) + os.path.getsize(recent)
+        # o acerto renova o arquivo: quem sai é o outro
+        past = time.time() - 60
+        for path in (old, recent):
+            os.utime(path, (past, past))
+        first = exports.artifact_path(exports.export_key(["arma-magica"], [], content_version()), "html")
+        self.assertTrue(os.path.exists(first))
+        export("arma-magica")
+        with override_settings(GRIMORIO_EXPORT_MAX_BYTES=size):
+            export("criar-elemento")
+        self.assertTrue(os.path.exists(first))
+        self.assertEqual(len(self.files()), 2)
+
+    def test_old_versions_are_removed(self):
+        stale = os.path.join(self.dir, "v0-abc.html")
+        with open(stale, "w") as f:
+            f.write("velho")
+        self.client.get("/grimorio/export.html", {"spells": "arma-magica"}).close()
+        self.assertFalse(os.path.exists(stale))
+
+    def test_pdf_export(self):
+        response = self.client.get("/grimorio/export.pdf", {"spells": "arma-magica", "runes": "fogo"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+
+    def test_font_subsetting_logs_are_quiet(self):
+        self.assertGreaterEqual(logging.getLogger("fontTools.subset").getEffectiveLevel(), logging.WARNING)
+
+    def test_pdf_export_of_every_spell(self):
+        # tabelas do conteúdo real têm <strong> dentro de <td>
+        for slug in Spell.objects.values_list("slug", flat=True):
+            response = self.client.get("/grimorio/export.pdf", {"spells": slug, "runes": "fogo,gelo"})
+            self.assertEqual(response.status_code, 200, slug)
+            response.close()
+
+    def test_failed_export_is_an_error_page(self):
+        with mock.patch.object(exports, "render_pdf", side_effect=RuntimeError("quebrou")), \
+                self.assertLogs("grimorio.services.exports", "ERROR"), self.assertLogs("django.request", "ERROR"):
+            response = self.client.get("/grimorio/export.pdf", {"spells": "arma-magica"})
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.files(), [])
+
+    @override_settings(GRIMORIO_EXPORT_WORKERS=1)
+    def test_failed_background_export_stops_the_refresh(self):
+        self.addCleanup(exports._failed.clear)
+        with mock.patch.object(exports, "render_pdf", side_effect=RuntimeError("quebrou")), \
+                self.assertLogs("grimorio.services.exports", "ERROR"):
+            response = self.client.get("/grimorio/export.pdf", {"spells": "arma-magica"})
+            self.assertEqual(response.status_code, 202)
+            while exports._pending:
+                time.sleep(0.01)
+        with self.assertLogs("django.request", "ERROR"):
+            response = self.client.get("/grimorio/export.pdf", {"spells": "arma-magica"})
+        self.assertEqual(response.status_code, 500)
+        self.assertNotIn("refresh", response.content.decode())
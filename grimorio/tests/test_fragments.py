@@ -0,0 +1,62 @@
+from unittest import mock
+from django.test import override_settings
+from grimorio.services import fragments, selectors
+from grimorio.services.builders import build_spell_panels
+from grimorio.services.catalog import content_version
+from grimorio.tests.utils import ContentTestCase
+
+class PanelCacheTests(ContentTestCase):
+    def build(self, runes, version=None):
+        spells = selectors.get_spells_by_slugs(["arma-magica", "compreender"])
+        with mock.patch.object(fragments, "render_to_string", wraps=fragments.render_to_string) as render:
+            panels = build_spell_panels(spells, selectors.get_runes_by_slugs(runes), version or content_version())
+        return panels, render.call_count
+
+    def test_rendered_once_per_rune_set(self):
+        first, rendered = self.build(["fogo", "gelo"])
+        self.assertEqual(rendered, 2)
+        again, rendered = self.build(["gelo", "fogo", "gelo"])
+        self.assertEqual(rendered, 0)
+        self.assertEqual([p["html"] for p in again], [p["html"] for p in first])
+        self.assertIn("Fogo", first[0]["html"])
+
+    def test_other_runes_or_version_miss(self):
+        self.build(["fogo"])
+        self.assertEqual(self.build(["gelo"])[1], 2)
+        self.assertEqual(self.build(["fogo"], version=content_version() + 1)[1], 2)
+
+    def test_key_ignores_rune_order(self):
+        self.assertEqual(fragments.panel_cache_key("x", ["b", "a", "a"], 3), fragments.panel_cache_key("x", ["a", "b"], 3))
+        self.assertNotEqual(fragments.panel_cache_key("x", ["a"], 3), fragments.panel_cache_key("x", ["a"], 4))
+
+class LazyPanelTests(ContentTestCase):
+    url = "/grimorio/?spells=arma-magica,compreender&runes=gelo,fogo"
+
+
+    def test_eager_renders_only_the_first_panels(self):
+        spells = selectors.get_spells_by_slugs(["arma-magica", "compreender"])
+        panels = build_spell_panels(spells, [], content_version(), eager=1)
+        self.assertIsNotNone(panels[0]["html"])
+        self.assertIsNone(panels[1]["html"])
+
+    def test_lazy_page_points_to_the_fragment(self):
+        html = self.client.get(self.url + "&lazy=1").content.decode()
+        self.assertIn('data-src="/grimorio/panel/compreender/?runes=fogo,gelo"', html)
+        self.assertEqual(html.count("data-src="), 1)
+        self.assertNotIn("data-src=", self.client.get(self.url + "&lazy=0").content.decode())
+
+    @override_settings(GRIMORIO_LAZY_THRESHOLD=1)
+    def test_large_selections_are_lazy(self):
+        self.assertIn("data-src=", self.client.get(self.url).content.decode())
+
+    def test_fragment_matches_the_eager_panel(self):
+        spells = selectors.get_spells_by_slugs(["compreender"])
+        panel, = build_spell_panels(spells, selectors.get_runes_by_slugs(["fogo", "gelo"]), content_version())
+        response = self.client.get("/grimorio/panel/compreender/", {"runes": "fogo,gelo"})
+        self.assertEqual(response.content.decode(), str(panel["html"]))
+        again = self.client.get("/grimorio/panel/compreender/", {"runes": "gelo,fogo"},
+                                headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(again.status_code, 304)
+
+    def test_unknown_spell(self):
+        self.assertEqual(self.client.get("/grimorio/panel/nao-existe/").status_code, 404)
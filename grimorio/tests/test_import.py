@@ -0,0 +1,72 @@
+import io, os, shutil, tempfile
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from grimorio.models import ContentVersion, Rune, Spell, SpellRuneEffect
+from grimorio.tests.utils import CONTENT_ROOT, reset_caches
+
+class ImportContentTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.addCleanup(reset_caches)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = os.path.join(tmp.name, "content")
+        shutil.copytree(CONTENT_ROOT, self.root)
+
+    def run_import(self, *args, **opts):
+        out = io.StringIO()
+        call_command("import_content", *args, content_root=self.root, stdout=out, **opts)
+        return out.getvalue()
+
+    def spell_path(self, slug):
+        return os.path.join(self.root, "spells", f"{slug}.yml")
+
+    def test_second_run_changes_nothing(self):
+        self.run_import()
+        version = ContentVersion.current()
+        out = self.run_import()
+        self.assertIn("Magias: 0 novas, 0 alteradas", out)
+        self.assertEqual(ContentVersion.current(), version)
+
+    def test_only_changed_files_are_reimported(self):
+        self.run_import()
+        version = ContentVersion.current()
+        with open(self.spell_path("arma-magica"), "a", encoding="utf-8") as f:
+            f.write("school: Evocação\n")
+        out = self.run_import()
+        self.assertIn("Magias: 0 novas, 1 alteradas", out)
+        self.assertEqual(ContentVersion.current(), version + 1)
+        self.assertEqual(Spell.objects.get(slug="arma-magica").school, "Evocação")
+
+    def test_removed_files_need_prune(self):
+        self.run_import()
+        os.remove(self.spell_path("compreender"))
+        self.assertIn("1 removidas (use --prune para apagar)", self.run_import())
+        self.assertTrue(Spell.objects.filter(slug="compreender").exists())
+        self.run_import(prune=True)
+        self.assertFalse(Spell.objects.filter(slug="compreender").exists())
+        self.assertFalse(SpellRuneEffect.objects.filter(spell__slug="compreender").exists())
+
+    def test_strict_failure_writes_nothing(self):
+        os.remove(os.path.join(self.root, "runes", "fogo.yml"))
+        with self.assertRaises(CommandError):
+            self.run_import(strict=True)
+        self.assertFalse(Spell.objects.exists())
+        self.assertFalse(Rune.objects.exists())
+        self.assertEqual(ContentVersion.current(), 0)
+
+    def test_force_reimports_everything(self):
+        self.run_import()
+        count = Spell.objects.count()
+        self.assertIn(f"Magias: 0 novas, {count} alteradas", self.run_import(force=True))
+
+    def test_process_pool_gives_the_same_rows(self):
+        def rows():
+            return (list(Spell.objects.order_by("slug").values_list("slug", "manual_html", "search_text", "content_hash")),
+                    list(SpellRuneEffect.objects.order_by("spell__slug", "rune__slug")
+                         .values_list("spell__slug", "rune__slug", "html", "terms")))
+
+        self.run_import(jobs=1)
+        serial = rows()
+        self.run_import(jobs=2, force=True)
+        self.assertEqual(rows(), serial)
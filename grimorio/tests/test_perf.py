@@ -0,0 +1,64 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, override_settings
+from grimorio.services import metrics
+from grimorio.tests.utils import ContentTestCase
+
+class PerformanceMiddlewareTests(ContentTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.histogram.reset()
+        self.addCleanup(metrics.histogram.reset)
+
+    def timing(self, response):
+        return {part.split(";")[0]: part for part in response["Server-Timing"].split(", ")}
+
+    @override_settings(GRIMORIO_CATALOG_SNAPSHOT=False, GRIMORIO_SERVER_TIMING=True)
+    def test_server_timing_counts_queries(self):
+        response = self.client.get("/api/spells", {"ids": "arma-magica"})
+        timing = self.timing(response)
+        self.assertLessEqual({"db", "tpl", "total"}, set(timing))
+        self.assertRegex(timing["db"], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"$')
+
+    def test_histogram_per_view(self):
+        for _ in range(3):
+            self.client.get("/api/spells", {"ids": "arma-magica"})
+        summary = metrics.histogram.snapshot()["grimorio:api_spells"]
+        self.assertEqual(summary["count"], 3)
+        self.assertLessEqual(summary["total_ms"]["p50"], summary["total_ms"]["max"])
+        self.assertGreater(summary["bytes"]["p50"], 0)
+
+    @override_settings(GRIMORIO_SERVER_TIMING=False)
+    def test_server_timing_only_for_staff_on_private_responses(self):
+        self.assertFalse(self.client.get("/api/spells", {"ids": "arma-magica"}).has_header("Server-Timing"))
+        self.client.force_login(User.objects.create_user("mestre", password="x", is_staff=True))
+        public = self.client.get("/grimorio/", {"spells": "arma-magica"})
+        self.assertIn("public", public["Cache-Control"])
+        self.assertFalse(public.has_header("Server-Timing"))
+        self.assertTrue(self.client.get("/api/_perf").has_header("Server-Timing"))
+        self.assertIn("grimorio:grimorio", metrics.histogram.snapshot())
+
+    @override_settings(GRIMORIO_PERF_ENABLED=False)
+    def test_disabled(self):
+        response = self.client.get("/api/spells", {"ids": "arma-magica"})
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertEqual(metrics.histogram.snapshot(), {})
+
+    def test_perf_endpoint_is_staff_only(self):
+        self.client.get("/api/spells", {"ids": "arma-magica"})
+        self.assertEqual(self.client.get("/api/_perf").status_code, 302)
+        staff = User.objects.create_user("mestre", password="x", is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get("/api/_perf").json()
+        self.assertIn("grimorio:api_spells", data["views"])
+        self.client.post("/api/_perf", {"reset": "1"})
+        self.assertNotIn("grimorio:api_spells", self.client.get("/api/_perf").json()["views"])
+
+class HistogramTests(SimpleTestCase):
+    def test_keeps_the_last_samples(self):
+        histogram = metrics.Histogram(size=10)
+        for i in range(100):
+            histogram.add("v", (float(i), 0.0, 0, 0.0, None))
+        summary = histogram.snapshot()["v"]
+        self.assertEqual(summary["count"], 10)
+        self.assertEqual(summary["total_ms"], {"p50": 94.0, "p95": 99.0, "p99": 99.0, "max": 99.0})
+        self.assertNotIn("bytes", summary)
@@ -0,0 +1,75 @@
+from unittest import skipUnless
+from django.db import connection
+from django.test import override_settings
+from grimorio.services import catalog
+from grimorio.services.search import SearchIndex, get_index, search, tokenize
+from grimorio.tests.utils import ContentTestCase
+
+def _docs():
+    return [
+        ("bola-de-fogo", "Bola de Fogo", "name", None, None, "Bola de Fogo"),
+        ("bola-de-fogo", "Bola de Fogo", "manual", None, None, "Uma esfera explode no alvo."),
+        ("bola-de-fogo", "Bola de Fogo", "rune", "gelo", "Gelo", "O alvo sofre 2 de dano de frio."),
+        ("escudo", "Escudo", "name", None, None, "Escudo"),
+        ("escudo", "Escudo", "manual", None, None, "Protege contra dano."),
+    ]
+
+class SearchIndexTests(ContentTestCase):
+    def test_terms_may_match_different_fields(self):
+        # "bola" só no nome, "frio" só no efeito da runa
+        results = SearchIndex(_docs()).search(tokenize("bola frio"), 10)
+        self.assertEqual([r["slug"] for r in results], ["bola-de-fogo"])
+        fields = {h["field"] for h in results[0]["highlights"]}
+        self.assertEqual(fields, {"name", "rune"})
+
+    def test_every_term_must_match_the_spell(self):
+        self.assertEqual(SearchIndex(_docs()).search(tokenize("escudo frio"), 10), [])
+
+    def test_score_adds_up_fields(self):
+        results = SearchIndex(_docs()).search(tokenize("dano"), 10)
+        self.assertEqual({r["slug"] for r in results}, {"bola-de-fogo", "escudo"})
+
+    def test_prefix_and_accents(self):
+        results = search("MÁGIC")
+        self.assertIn("arma-magica", [r["slug"] for r in results])
+
+    def test_spell_name_and_effect_terms_together(self):
+        results = search("ARMA MÁGICA dano")
+        self.assertEqual(results[0]["slug"], "arma-magica")
+        self.assertTrue(any("<mark>" in h["snippet"] for h in results[0]["highlights"]))
+
+    def test_limit(self):
+        self.assertEqual(len(search("alvo", limit=2)), 2)
+
+    def test_index_rebuilt_per_content_version(self):
+        self.assertIs(get_index(), get_index())
+
+    @skipUnless(connection.vendor == "postgresql", "full-text só no Postgres")
+    def test_postgres_matches_memory_backend(self):
+        for q in ("ARMA MÁGICA dano", "fogo", "alvo criatura"):
+            with override_settings(GRIMORIO_SEARCH_BACKEND="memory"):
+                memory = {r["slug"] for r in search(q, limit=100)}
+            with override_settings(GRIMORIO_SEARCH_BACKEND="postgres"):
+                pg = {r["slug"] for r in search(q, limit=100)}
+            self.assertEqual(pg, memory, q)
+
+class SearchViewTests(ContentTestCase):
+    def test_requires_query(self):
+        self.assertEqual(self.client.get("/api/search").status_code, 400)
+
+    def test_etag_follows_the_echoed_query(self):
+        a = self.client.get("/api/search", {"q": "fogo"})
+        b = self.client.get("/api/search", {"q": "FOGO!!"})
+        self.assertEqual(a.json()["query"], "fogo")
+        self.assertEqual(b.json()["query"], "FOGO!!")
+        self.assertNotEqual(a["ETag"], b["ETag"])
+
+    def test_not_modified(self):
+        first = self.client.get("/api/search", {"q": "fogo"})
+        again = self.client.get("/api/search", {"q": "fogo"}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+class CatalogSnapshotTests(ContentTestCase):
+    def test_snapshot_skips_search_columns(self):
+        spell = catalog.get_catalog().spells["arma-magica"]
+        self.assertEqual(spell.get_deferred_fields(), {"manual_text", "search_text"})
@@ -0,0 +1,134 @@
+import os, shutil, tempfile
+from unittest import mock
+from django.conf import settings
+from django.test import override_settings
+from grimorio.models import Spell
+from grimorio.services import fragments
+from grimorio.services.content import load_ordinals, seed_ordinals
+from grimorio.services.selection import (MAX_BYTES, MAX_TOKEN, InvalidSelection, decode_ids, decode_selection,
+                                         encode_ids, encode_selection)
+from grimorio.tests.utils import CONTENT_ROOT, ContentTestCase, import_content, reset_caches
+
+class BitsetTests(ContentTestCase):
+    def test_round_trip(self):
+        ids = [0, 3, 9, 200]
+        self.assertEqual(decode_ids(encode_ids(ids)), ids)
+        self.assertEqual(encode_ids([9, 3, 3]), encode_ids([3, 9]))
+
+    def test_encode_and_decode_share_the_limit(self):
+        top = MAX_BYTES * 8 - 1
+        token = encode_ids([top])
+        self.assertLessEqual(len(token), MAX_TOKEN)
+        self.assertEqual(decode_ids(token), [top])
+        with self.assertRaises(InvalidSelection):
+            encode_ids([top + 1])
+        with self.assertRaises(InvalidSelection):
+            decode_ids("A" * (MAX_TOKEN + 1))
+
+    def test_garbage(self):
+        with self.assertRaises(InvalidSelection):
+            decode_ids("!!!")
+
+class SelectionOrdinalTests(ContentTestCase):
+    def test_ordinals_come_from_the_registry(self):
+        table = load_ordinals(str(CONTENT_ROOT))["spells"]
+        self.assertEqual(dict(Spell.objects.values_list("slug", "ordinal")), table)
+        self.assertEqual(sorted(table.values()), list(range(len(table))))
+
+    def test_links_survive_new_primary_keys(self):
+        params = encode_selection(["arma-magica", "compreender"], ["fogo"])
+        Spell.objects.filter(slug="arma-magica").delete()
+        import_content(force=True)
+        reset_caches()
+        self.assertEqual(decode_selection(params), (["arma-magica", "compreender"], ["fogo"]))
+
+    def test_new_spell_gets_next_number(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        shutil.copytree(CONTENT_ROOT, root, dirs_exist_ok=True)
+        before = load_ordinals(root)["spells"]
+        with open(os.path.join(root, "spells", "aaa-nova.yml"), "w", encoding="utf-8") as f:
+            f.write("slug: aaa-nova\nname: Nova\nmanual_html: '<p>Nova.</p>'\n")
+        import_content(content_root=root)
+        after = load_ordinals(root)["spells"]
+        self.assertEqual(after["aaa-nova"], max(before.values()) + 1)
+        self.assertEqual({k: v for k, v in after.items() if k != "aaa-nova"}, before)
+        self.assertEqual(Spell.objects.get(slug="aaa-nova").ordinal, after["aaa-nova"])
+
+    def test_database_numbers_win_over_a_stale_file(self):
+        # import no deploy: o ordinals.yml reescrito não voltou para o repositório
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        shutil.copytree(CONTENT_ROOT, root, dirs_exist_ok=True)
+        path = os.path.join(root, "ordinals.yml")
+        with open(path, encoding="utf-8") as f:
+            committed = f.read()
+        self.new_spell(root, "aaa-nova")
+        import_content(content_root=root)
+        number = Spell.objects.get(slug="aaa-nova").ordinal
+        params = encode_selection(["aaa-nova"], [])
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(committed)
+        self.new_spell(root, "bbb-outra")  # no arquivo antigo ganharia o número de aaa-nova
+        import_content(content_root=root)
+        reset_caches()
+        self.assertEqual(Spell.objects.get(slug="aaa-nova").ordinal, number)
+        self.assertGreater(Spell.objects.get(slug="bbb-outra").ordinal, number)
+        self.assertEqual(decode_selection(params), (["aaa-nova"], []))
+        self.assertEqual(load_ordinals(root)["spells"], dict(Spell.objects.values_list("slug", "ordinal")))
+
+    def new_spell(self, root, slug):
+        with open(os.path.join(root, "spells", f"{slug}.yml"), "w", encoding="utf-8") as f:
+            f.write(f"slug: {slug}\nname: Nova\nmanual_html: '<p>Nova.</p>'\n")
+
+    def test_seed_ordinals(self):
+        table = {"a": 0, "b": 1, "c": 2}
+        self.assertTrue(seed_ordinals(table, {"a": 0, "x": 1}))
+        self.assertEqual(table, {"a": 0, "c": 2, "x": 1})
+        self.assertFalse(seed_ordinals(table, {"a": 0}))
+
+class SelectionViewTests(ContentTestCase):
+    def test_post_redirects_to_bitset_url(self):
+        response = self.client.post("/", {"spells[]": ["compreender", "arma-magica"], "runes[]": ["fogo"]})
+        self.assertEqual(response.status_code, 302)
+        page = self.client.get(response["Location"])
+        self.assertEqual(page.status_code, 200)
+        self.assertContains(page, "ARMA MÁGICA")
+
+    def test_invalid_token_is_rejected(self):
+        self.assertEqual(self.client.get("/grimorio/", {"s": "!!!"}).status_code, 400)
+        self.assertEqual(self.client.get("/grimorio/", {"s": "A" * (MAX_TOKEN + 1)}).status_code, 400)
+        self.assertEqual(self.client.get("/grimorio/export.html", {"s": "!!!"}).status_code, 400)
+
+class SelectionPageTests(ContentTestCase):
+    def test_chips_rendered_once_per_version(self):
+        with mock.patch.object(fragments, "render_to_string", wraps=fragments.render_to_string) as render:
+            first = self.client.get("/")
+            self.client.get("/")
+        self.assertEqual(render.call_count, 2)
+        self.assertContains(first, 'value="arma-magica"')
+        self.assertContains(first, 'value="fogo"')
+
+    def test_no_queries_with_snapshot(self):
+        self.client.get("/")
+        with self.assertNumQueries(0):
+            self.client.get("/")
+
+    @override_settings(GRIMORIO_CATALOG_SNAPSHOT=False)
+    def test_only_slug_and_name_without_snapshot(self):
+        fragments._cache().clear()
+        with self.assertNumQueries(3) as ctx:
+            self.client.get("/")
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("manual_html", sql)
+
+    def test_etag_needs_the_csrf_cookie(self):
+        self.assertFalse(self.client.get("/").has_header("ETag"))
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "a" * 32
+        first = self.client.get("/")
+        self.assertIn("private", first["Cache-Control"])
+        self.assertFalse(first.has_header("Last-Modified"))
+        self.assertEqual(self.client.get("/", headers={"If-None-Match": first["ETag"]}).status_code, 304)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "b" * 32
+        self.assertEqual(self.client.get("/", headers={"If-None-Match": first["ETag"]}).status_code, 200)
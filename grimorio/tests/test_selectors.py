@@ -0,0 +1,31 @@
+import yaml
+from django.test import override_settings
+from grimorio.models import Spell, SpellRuneEffect
+from grimorio.services.selectors import get_rune_effects
+from grimorio.tests.utils import CONTENT_ROOT, ContentTestCase
+
+class RuneEffectTests(ContentTestCase):
+    def test_one_row_per_spell_and_rune(self):
+        data = yaml.safe_load((CONTENT_ROOT / "spells" / "arma-magica.yml").read_text(encoding="utf-8"))
+        rows = SpellRuneEffect.objects.filter(spell__slug="arma-magica").values_list("rune__slug", flat=True)
+        self.assertEqual(set(rows), set(data["rune_effects"]))
+
+    def test_only_requested_pairs(self):
+        effects = get_rune_effects(["arma-magica", "compreender"], ["fogo"])
+        self.assertEqual(set(effects), {"arma-magica", "compreender"})
+        for runes in effects.values():
+            self.assertLessEqual(set(runes), {"fogo"})
+        self.assertEqual(get_rune_effects(["arma-magica"], []), {"arma-magica": {}})
+
+    def test_orm_in_one_query(self):
+        with override_settings(GRIMORIO_CATALOG_SNAPSHOT=False), self.assertNumQueries(1):
+            get_rune_effects(["arma-magica", "compreender"], ["fogo", "gelo"])
+
+    def test_snapshot_matches_orm(self):
+        slugs = list(Spell.objects.values_list("slug", flat=True))
+        for runes in (None, ["fogo", "gelo"]):
+            snap = get_rune_effects(slugs, runes)
+            with override_settings(GRIMORIO_CATALOG_SNAPSHOT=False):
+                orm = get_rune_effects(slugs, runes)
+            self.assertEqual(snap, orm)
+            self.assertEqual([list(r) for r in snap.values()], [list(r) for r in orm.values()])
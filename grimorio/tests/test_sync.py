@@ -0,0 +1,198 @@
+import io, os, sys, tempfile, threading
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from benchmarks.bench_extract import available_parsers, synthetic_manual
+from grimorio.management.commands.sync_from_gmbinder import extract_spells
+from grimorio.models import Spell
+from grimorio.services import sources
+from grimorio.tests.utils import reset_caches
+
+def manual(*sections):
+    """HTML no formato do GM Binder: [(título da seção, [nomes das magias])]."""
+    out = ['<div class="page"><h1>INTRODUÇÃO</h1><p>Abertura.</p>']
+    for title, names in sections:
+        out.append(f"<h1>{title}</h1>")
+        for name in names:
+            out.append(f"<h3>{name}</h3><p><strong>Execução:</strong> Ação • <strong>Alcance:</strong> Curto</p>"
+                       f"<p>Descrição de {name}.</p><h4>Runa de Fogo</h4><p>2 de dano de Fogo.</p>")
+    out.append("</div>")
+    return "".join(out)
+
+BASE = manual(("MAGIAS ARCANAS", ["Raio Arcano", "Escudo"]), ("MAGIAS DIVINAS", ["Bênção"]))
+SUPPLEMENT = manual(("APÊNDICE", ["Nada"]), ("MAGIAS EXTRAS", ["Chuva de Gelo"]))
+
+class SourcesTests(SimpleTestCase):
+    def test_parse_sections(self):
+        self.assertEqual(sources.parse_sections("magias arcanas..magias divinas; magias divinas.."),
+                         (("MAGIAS ARCANAS", "MAGIAS DIVINAS"), ("MAGIAS DIVINAS", None)))
+        for bad in ("", "MAGIAS", "..FIM"):
+            with self.assertRaises(sources.SourceError):
+                sources.parse_sections(bad)
+
+    def test_location_is_kept_verbatim(self):
+        src = sources.parse_source("https://gmbinder.com/share/abc#p2;x", True, "MAGIAS EXTRAS..")
+        self.assertEqual(src.location, "https://gmbinder.com/share/abc#p2;x")
+        self.assertEqual(src.sections, (("MAGIAS EXTRAS", None),))
+        self.assertEqual(sources.parse_source("manual.html", False).sections, sources.DEFAULT_SECTIONS)
+
+    def test_extract_several_sections_in_one_pass(self):
+        spells = extract_spells(BASE, "html.parser", (("MAGIAS ARCANAS", "MAGIAS DIVINAS"), ("MAGIAS DIVINAS", None)))
+        self.assertEqual([s["slug"] for s in spells], ["raio-arcano", "escudo", "bencao"])
+        self.assertEqual(list(spells[0]["rune_effects"]), ["fogo"])
+
+    def test_merge_spells(self):
+        a = {"slug": "escudo", "name": "Escudo", "manual_html": "<p>a</p>", "attributes": {}, "rune_effects": {}}
+        b = {**a, "manual_html": "<p>b</p>"}
+        self.assertEqual(sources.merge_spells([("x", [a]), ("y", [dict(a)])]), ([a], []))
+        self.assertEqual(sources.merge_spells([("x", [a]), ("y", [b])]), ([a], [("escudo", "x", "y")]))
+        self.assertEqual(sources.merge_spells([("x", [a]), ("y", [b])], "last"), ([b], [("escudo", "y", "x")]))
+
+class ExtractSpellsTests(SimpleTestCase):
+    def test_spell_across_a_page_break(self):
+        html = ('<div class="page"><h1>MAGIAS ARCANAS</h1><h3>Raio Arcano</h3><p>Início.</p></div>'
+                '<div class="page"><p><strong>Alcance:</strong> Longo</p><h4>Runa de Gelo</h4><p>Frio.</p>'
+                '<h1>MAGIAS DIVINAS</h1><h3>Bênção</h3></div>')
+        spell, = extract_spells(html, "html.parser")
+        self.assertIn("Início.", spell["manual_html"])
+        self.assertEqual(spell["attributes"], {"alcance": "Longo"})
+        self.assertEqual(spell["rune_effects"], {"gelo": "<p>Frio.</p>"})
+
+    def test_every_spell_and_rune(self):
+        spells = extract_spells(synthetic_manual(30, n_runes=3, per_page=4), "html.parser")
+        self.assertEqual(len(spells), 30)
+        self.assertEqual(spells[-1]["slug"], "magia-sintetica-29")
+        self.assertEqual(list(spells[-1]["rune_effects"]), ["agua", "ar", "eletricidade"])
+
+    def test_parsers_agree(self):
+        html = synthetic_manual(20, n_runes=4)
+        results = [extract_spells(html, parser) for parser in available_parsers()]
+        for other in results[1:]:
+            self.assertEqual(other, results[0])
+
+    def test_missing_section(self):
+        with self.assertRaises(CommandError):
+            extract_spells("<h1>OUTRA COISA</h1><h3>Escudo</h3>", "html.parser")
+
+def serve(pages, content_type="text/html; charset=utf-8"):
+    """Stub HTTP local com ETag; devolve (servidor, URL base, caminhos servidos com 200)."""
+    served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages[self.path.split("#")[0]].encode()
+            etag = f'"{hash(body)}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            served.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", served
+
+class SyncCommandTests(TestCase):
+    def setUp(self):
+        reset_caches()
+        self.addCleanup(reset_caches)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        self.pages = {"/base": BASE, "/extra": SUPPLEMENT}
+        server, self.base, self.served = serve(self.pages)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    def sync(self, *args):
+        out = io.StringIO()
+        call_command("sync_from_gmbinder", *args, "--jobs", "1", out_root=os.path.join(self.root, "content"),
+                     cache_dir=os.path.join(self.root, ".cache"), stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_two_manuals_with_their_own_sections(self):
+        self.sync("--url", f"{self.base}/base#capitulo-3",
+                  "--url", f"{self.base}/extra", "--source-sections", "MAGIAS EXTRAS..")
+        self.assertEqual(set(Spell.objects.values_list("slug", flat=True)), {"raio-arcano", "escudo", "chuva-de-gelo"})
+        self.assertTrue(os.path.exists(os.path.join(self.root, "content", "runes", "fogo.yml")))
+
+        out = self.sync("--url", f"{self.base}/base#capitulo-3",
+                        "--url", f"{self.base}/extra", "--source-sections", "MAGIAS EXTRAS..")
+        self.assertIn("sem alterações", out)
+        self.assertEqual(len(self.served), 2)
+
+    def test_default_sections_and_local_file(self):
+        path = os.path.join(self.root, "suplemento.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SUPPLEMENT)
+        self.sync("--section", "MAGIAS DIVINAS..", "--url", f"{self.base}/base",
+                  "--from-file", path, "--source-sections", "MAGIAS EXTRAS..")
+        self.assertEqual(set(Spell.objects.values_list("slug", flat=True)), {"bencao", "chuva-de-gelo"})
+
+    def test_slug_conflict(self):
+        changed = BASE.replace("Descrição de Escudo", "Outro texto")
+        path = os.path.join(self.root, "outro.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(changed)
+        with self.assertRaises(CommandError):
+            self.sync("--url", f"{self.base}/base", "--from-file", path)
+        self.sync("--url", f"{self.base}/base", "--from-file", path, "--on-conflict", "last")
+        self.assertIn("Outro texto", Spell.objects.get(slug="escudo").manual_html)
+
+    def test_source_sections_needs_a_source(self):
+        with self.assertRaises(CommandError):
+            self.sync("--source-sections", "MAGIAS EXTRAS..", "--url", f"{self.base}/base")
+
+    def test_only_changed_spells_are_rewritten(self):
+        self.sync("--url", f"{self.base}/base")
+        spells_dir = os.path.join(self.root, "content", "spells")
+        past = 1_000_000_000
+        for name in os.listdir(spells_dir):
+            os.utime(os.path.join(spells_dir, name), (past, past))
+        self.pages["/base"] = BASE.replace("Descrição de Escudo", "Novo texto")
+        out = self.sync("--url", f"{self.base}/base")
+        self.assertIn("1 de 2 magias alteradas", out)
+        self.assertIn("Magias: 0 novas, 1 alteradas", out)
+        self.assertIn("Novo texto", Spell.objects.get(slug="escudo").manual_html)
+        touched = {n for n in os.listdir(spells_dir) if os.path.getmtime(os.path.join(spells_dir, n)) != past}
+        self.assertEqual(touched, {"escudo.yml"})
+
+    def test_failed_import_is_retried(self):
+        with mock.patch("grimorio.management.commands.sync_from_gmbinder.call_command",
+                        side_effect=CommandError("falhou")):
+            with self.assertRaises(CommandError):
+                self.sync("--url", f"{self.base}/base")
+        # o manual e o YAML já estão em cache/disco, mas nada foi importado
+        out = self.sync("--url", f"{self.base}/base")
+        self.assertNotIn("sem alterações desde", out)
+        self.assertEqual(set(Spell.objects.values_list("slug", flat=True)), {"raio-arcano", "escudo"})
+        self.assertIn("sem alterações desde", self.sync("--url", f"{self.base}/base"))
+
+    def test_new_sections_of_the_same_manual(self):
+        self.sync("--url", f"{self.base}/base")
+        out = self.sync("--section", "MAGIAS DIVINAS..", "--url", f"{self.base}/base")
+        self.assertNotIn("sem alterações desde", out)
+        self.assertTrue(Spell.objects.filter(slug="bencao").exists())
+        self.assertEqual(len(self.served), 1)
+
+    def test_manual_from_stdin(self):
+        with mock.patch.object(sys, "stdin", io.StringIO(SUPPLEMENT)):
+            self.sync("--from-file", "-", "--source-sections", "MAGIAS EXTRAS..")
+        self.assertEqual(list(Spell.objects.values_list("slug", flat=True)), ["chuva-de-gelo"])
+
+    def test_response_without_charset_is_utf8(self):
+        server, base, _ = serve({"/base": BASE}, content_type="text/html")
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.sync("--section", "MAGIAS DIVINAS..", "--url", f"{base}/base")
+        self.assertEqual(Spell.objects.get(slug="bencao").name, "Bênção")
@@ -0,0 +1,31 @@
+import io
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from grimorio.services import catalog, effect_matrix, search
+
+CONTENT_ROOT = settings.BASE_DIR / "content"
+
+def reset_caches():
+    """Snapshot, índices e caches em memória são por versão do conteúdo; entre testes a versão se repete."""
+    catalog.invalidate()
+    search._index = (None, None)
+    effect_matrix._matrix = (None, None)
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+def import_content(**opts):
+    opts.setdefault("content_root", str(CONTENT_ROOT))
+    call_command("import_content", stdout=io.StringIO(), **opts)
+
+class ContentTestCase(TestCase):
+    """Banco com o conteúdo real de content/ (importado uma vez por classe)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        import_content()
+
+    def setUp(self):
+        reset_caches()
+        self.addCleanup(reset_caches)
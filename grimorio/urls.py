@@ -1,11 +1,22 @@
 from django.urls import path
 from .views.selection import selection_view
-from .views.grimorio import grimorio_view, api_spells
+from .views.grimorio import grimorio_view, panel_fragment, api_spells
+from .views.export import api_spells_export
+from .views.printing import grimorio_print
+from .views.perf import api_perf
+from .views.search import api_search
+from .views.effects import api_effects
 
 app_name = 'grimorio'
 
 urlpatterns = [
     path('', selection_view, name='selection'),
     path('grimorio/', grimorio_view, name='grimorio'),
+    path('grimorio/panel/<slug:slug>/', panel_fragment, name='panel'),
+    path('grimorio/export.<str:fmt>', grimorio_print, name='print'),
     path('api/spells', api_spells, name='api_spells'),
+    path('api/spells/export', api_spells_export, name='api_spells_export'),
+    path('api/search', api_search, name='api_search'),
+    path('api/effects', api_effects, name='api_effects'),
+    path('api/_perf', api_perf, name='api_perf'),
 ]
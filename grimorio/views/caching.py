@@ -0,0 +1,61 @@
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from grimorio.services.catalog import content_stamp
+
+def make_etag(*parts):
+    raw = '|'.join(','.join(p) if isinstance(p, (list, tuple)) else str(p) for p in parts)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+def _last_modified(request, *args, **kwargs):
+    return content_stamp()[1]
+
+def _cache_headers(request, response, public):
+    if response.status_code not in (200, 304):
+        return response
+    if public(request):
+        patch_cache_control(response, public=True,
+                            max_age=getattr(settings, 'GRIMORIO_HTTP_MAX_AGE', 300))
+    else:
+        # depende da sessão: o navegador guarda a cópia mas revalida a cada visita
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def conditional(etag_func, public=lambda request: True, last_modified_func=_last_modified):
+    """GET condicional (ETag + Last-Modified) e Cache-Control, inclusive nas respostas 304.
+
+    Aceita views síncronas e assíncronas; nas assíncronas, `etag_func`/`last_modified_func`
+    (que podem consultar o banco) rodam numa thread antes da view.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            return _async_conditional(view, etag_func, public, last_modified_func)
+        conditioned = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            return _cache_headers(request, conditioned(request, *args, **kwargs), public)
+        return wrapper
+    return decorator
+
+def _async_conditional(view, etag_func, public, last_modified_func):
+    # o condition() do Django chama os validadores dentro do event loop; aqui eles são
+    # calculados antes, via sync_to_async, e o condition() só lê o resultado do request
+    conditioned = condition(
+        etag_func=lambda request, *args, **kwargs: request.grimorio_validators[0],
+        last_modified_func=(lambda request, *args, **kwargs: request.grimorio_validators[1])
+                           if last_modified_func else None,
+    )(view)
+
+    def validators(request, *args, **kwargs):
+        return (etag_func(request, *args, **kwargs),
+                last_modified_func(request, *args, **kwargs) if last_modified_func else None)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.grimorio_validators = await sync_to_async(validators)(request, *args, **kwargs)
+        return _cache_headers(request, await conditioned(request, *args, **kwargs), public)
+    return wrapper
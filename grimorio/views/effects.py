@@ -0,0 +1,51 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from grimorio.services.catalog import content_version
+from grimorio.services.effect_matrix import MAX_APPLICATIONS, get_matrix
+from grimorio.services.effects import MAX_CIRCLE
+from grimorio.services.metrics import span
+from grimorio.views.caching import conditional, make_etag
+
+def _applications(raw):
+    """'fogo:2,gelo' -> [('fogo', 2), ('gelo', 1)]; runa repetida soma as aplicações."""
+    counts = {}
+    for item in (raw or '').split(','):
+        if not item:
+            continue
+        rune, _, n = item.partition(':')
+        counts[rune] = counts.get(rune, 0) + int(n or 1)
+    return list(counts.items())
+
+def _effects_etag(request):
+    try:
+        # na ordem da query, como no corpo: 'fogo,gelo' e 'gelo,fogo' são respostas diferentes
+        apps = _applications(request.GET.get('runes'))
+    except ValueError:
+        apps = request.GET.get('runes', '')
+    return make_etag('effects', content_version(), request.GET.get('spell', ''),
+                     request.GET.get('circle', ''), str(apps))
+
+@require_http_methods(['GET'])
+@conditional(_effects_etag)
+async def api_effects(request):
+    """/api/effects?spell=arma-magica&circle=3&runes=fogo:2,gelo:1"""
+    spell = request.GET.get('spell', '')
+    try:
+        circle = int(request.GET.get('circle', 1))
+        apps = _applications(request.GET.get('runes'))
+    except ValueError:
+        return JsonResponse({'error': "Use circle=N e runes=runa:N,runa:N"}, status=400)
+    if not 1 <= circle <= MAX_CIRCLE:
+        return JsonResponse({'error': f"Círculo deve estar entre 1 e {MAX_CIRCLE}"}, status=400)
+    if any(not 0 <= n <= MAX_APPLICATIONS for _, n in apps):
+        return JsonResponse({'error': f"Aplicações por runa: de 0 a {MAX_APPLICATIONS}"}, status=400)
+
+    with span('effects'):
+        matrix = await sync_to_async(get_matrix)()
+        if spell not in matrix.spell_index:
+            return JsonResponse({'error': f"Magia desconhecida: {spell or '(vazio)'}"}, status=404)
+        unknown = sorted(r for r, _ in apps if r not in matrix.rune_index)
+        if unknown:
+            return JsonResponse({'error': f"Runas desconhecidas: {', '.join(unknown)}"}, status=400)
+        return JsonResponse(matrix.evaluate(spell, circle, apps))
@@ -0,0 +1,45 @@
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.decorators.http import require_http_methods
+from grimorio.services.selectors import iter_spells_for_export
+
+def _parse_since(raw):
+    dt = parse_datetime(raw)
+    if dt is None:
+        d = parse_date(raw)
+        if d is None:
+            return None
+        dt = timezone.datetime(d.year, d.month, d.day)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+def _ndjson(spells):
+    for sp in spells:
+        yield json.dumps({
+            'slug': sp.slug,
+            'name': sp.name,
+            'school': sp.school,
+            'version': sp.version,
+            'updated_at': sp.updated_at.isoformat(),  # precisão total: serve de cursor para 'since'
+            'attributes': sp.attributes_json or {},
+            'manual_html': sp.manual_html,
+            'rune_effects': {e.rune.slug: e.html for e in sp.rune_effects.all()},
+        }, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+@require_http_methods(['GET'])
+def api_spells_export(request):
+    since = None
+    if request.GET.get('since'):
+        since = _parse_since(request.GET['since'])
+        if since is None:
+            return JsonResponse({'error': "Parâmetro 'since' inválido (use ISO 8601)"}, status=400)
+    chunk_size = getattr(settings, 'GRIMORIO_EXPORT_CHUNK_SIZE', 200)
+    response = StreamingHttpResponse(_ndjson(iter_spells_for_export(since, chunk_size)),
+                                     content_type='application/x-ndjson; charset=utf-8')
+    response['Cache-Control'] = 'no-cache'
+    return response
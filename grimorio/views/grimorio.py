@@ -1,51 +1,163 @@
-from django.http import JsonResponse
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
-from grimorio.services.selectors import get_spells_by_slugs, get_runes_by_slugs
+from grimorio.services.selectors import (API_FIELDS, aget_runes_by_slugs, aget_spell, aget_spell_rows,
+                                         aget_spells_by_slugs)
 from grimorio.services.builders import build_spell_panels
+from grimorio.services.catalog import acontent_version, content_version
+from grimorio.services.content import ATTRIBUTE_ENUMS
+from grimorio.services.metrics import span
+from grimorio.services.selection import InvalidSelection, decode_selection, encode_selection
+from grimorio.views.caching import conditional, make_etag
+
+def _csv(raw):
+    return [s for s in raw.split(',') if s] if raw else []
 
 def _parse_csv_param(request, key, sess_key):
     raw = request.GET.get(key)
     if raw:
-        return [s for s in raw.split(',') if s]
-    return request.session.get(sess_key, [])
+        return _csv(raw)
+    if getattr(settings, 'GRIMORIO_SESSION_SELECTION', False):
+        return request.session.get(sess_key, [])
+    return []
 
-@require_http_methods(['GET'])
-def grimorio_view(request):
-    sel_spells = _parse_csv_param(request, 'spells', 'sel_spells')
-    sel_runes  = _parse_csv_param(request, 'runes',  'sel_runes')
-    spells_qs = get_spells_by_slugs(sel_spells)
-    runes_qs  = get_runes_by_slugs(sel_runes)
-    if not spells_qs.exists():
-        return render(request, 'grimorio/empty.html', {})
-    panels = build_spell_panels(spells_qs)
-    ctx = {
-        'spells': spells_qs,
-        'runes': runes_qs,
+def _selection(request):
+    """(spell_slugs, rune_slugs): ?s=&r= (bitset), senão ?spells=&runes=, senão a sessão (se ligada).
+
+    Bitset inválido levanta InvalidSelection (a view responde 400).
+    """
+    if 's' in request.GET or 'r' in request.GET:
+        return decode_selection(request.GET)
+    return (_parse_csv_param(request, 'spells', 'sel_spells'),
+            _parse_csv_param(request, 'runes', 'sel_runes'))
+
+async def _aparse_csv_param(request, key, sess_key):
+    raw = request.GET.get(key)
+    if raw:
+        return _csv(raw)
+    if getattr(settings, 'GRIMORIO_SESSION_SELECTION', False):
+        return await request.session.aget(sess_key, [])
+    return []
+
+async def _aselection(request):
+    """_selection() para as views assíncronas (sessão via aget, bitset decodificado numa thread)."""
+    if 's' in request.GET or 'r' in request.GET:
+        return await sync_to_async(decode_selection)(request.GET)
+    return (await _aparse_csv_param(request, 'spells', 'sel_spells'),
+            await _aparse_csv_param(request, 'runes', 'sel_runes'))
+
+def _from_query(request):
+    return any(request.GET.get(k) for k in ('s', 'r', 'spells', 'runes'))
+
+def _is_lazy(request, sel_spells):
+    # ?lazy=1/0 força; senão, seleções grandes só trazem a primeira aba renderizada
+    flag = request.GET.get('lazy')
+    if flag in ('0', '1'):
+        return flag == '1'
+    return len(set(sel_spells)) > getattr(settings, 'GRIMORIO_LAZY_THRESHOLD', 6)
+
+def export_url(fmt, spells, runes):
+    qs = urlencode(encode_selection([s.slug for s in spells], [r.slug for r in runes]))
+    return f"{reverse('grimorio:print', args=[fmt])}?{qs}"
+
+def bad_selection(error):
+    return HttpResponseBadRequest(f"Link de seleção inválido: {error}.")
+
+def _grimorio_etag(request):
+    try:
+        sel_spells, sel_runes = _selection(request)
+    except InvalidSelection:
+        return None  # a view responde 400
+    return make_etag('grimorio', content_version(), sorted(set(sel_spells)), sorted(set(sel_runes)),
+                     _is_lazy(request, sel_spells))
+
+def _panel_etag(request, slug):
+    return make_etag('panel', content_version(), slug, sorted(set(_csv(request.GET.get('runes')))))
+
+def _api_fields(request):
+    compact = request.GET.get('compact') in ('1', 'true')
+    fields = _csv(request.GET.get('fields')) or list(API_FIELDS)
+    if compact:
+        fields = [f for f in fields if f != 'manual_html']
+    return fields, compact
+
+def _api_filters(request):
+    # ?alcance=curto,medio&duracao=cena
+    return {k: sorted(set(_csv(request.GET[k]))) for k in ATTRIBUTE_ENUMS if request.GET.get(k)}
+
+def _api_spells_etag(request):
+    runes_filter = request.GET.get('runes', '')
+    fields, compact = _api_fields(request)
+    return make_etag('api_spells', content_version(),
+                     sorted(set(_csv(request.GET.get('ids')))),
+                     sorted(set(_csv(runes_filter))) if runes_filter else '*',
+                     sorted(set(fields)), compact,
+                     sorted(f"{k}={','.join(v)}" for k, v in _api_filters(request).items()))
+
+def _grimorio_context(spells, runes, lazy):
+    # parte síncrona da página (cache de fragmentos, efeitos, ids do bitset): uma ida à thread só
+    panels = build_spell_panels(spells, runes, content_version(), eager=1 if lazy else None)
+    if lazy:
+        runes_qs = ','.join(sorted(r.slug for r in runes))
+        for p in panels:
+            if p['html'] is None:
+                p['src'] = reverse('grimorio:panel', args=[p['spell'].slug]) + (f'?runes={runes_qs}' if runes_qs else '')
+    return {
+        'spells': spells,
+        'runes': runes,
         'panels': panels,
-        'sel_spells': sel_spells,
-        'sel_runes': sel_runes,
+        'print_url': export_url('html', spells, runes),
+        'pdf_url': export_url('pdf', spells, runes),
     }
-    return render(request, 'grimorio/grimorio.html', ctx)
 
 @require_http_methods(['GET'])
-def api_spells(request):
-    slugs = request.GET.get('ids', '')
-    ids = [s for s in slugs.split(',') if s] if slugs else []
+@conditional(_grimorio_etag, public=_from_query)
+async def grimorio_view(request):
+    try:
+        sel_spells, sel_runes = await _aselection(request)
+    except InvalidSelection as e:
+        return bad_selection(e)
+    spells = await aget_spells_by_slugs(sel_spells)
+    runes  = await aget_runes_by_slugs(sel_runes)
+    if not spells:
+        return render(request, 'grimorio/empty.html', {})
+    ctx = await sync_to_async(_grimorio_context)(spells, runes, _is_lazy(request, sel_spells))
+    ctx.update(sel_spells=sel_spells, sel_runes=sel_runes)
+    with span('tpl'):
+        return render(request, 'grimorio/grimorio.html', ctx)
+
+@require_http_methods(['GET'])
+@conditional(_panel_etag)
+async def panel_fragment(request, slug):
+    spell = await aget_spell(slug)
+    if spell is None:
+        raise Http404("Magia não encontrada")
+    runes = await aget_runes_by_slugs(_csv(request.GET.get('runes')))
+    panels = await sync_to_async(build_spell_panels)([spell], runes, await acontent_version())
+    return HttpResponse(panels[0]['html'])
+
+@require_http_methods(['GET'])
+@conditional(_api_spells_etag)
+async def api_spells(request):
+    ids = _csv(request.GET.get('ids'))
     runes_filter = request.GET.get('runes', '')
-    runes = [s for s in runes_filter.split(',') if s] if runes_filter else None
-
-    spells = get_spells_by_slugs(ids)
-    data = []
-    for sp in spells:
-        effects = sp.rune_effects_json or {}
-        if runes is not None:
-            effects = {k: v for k, v in effects.items() if k in runes}
-        data.append({
-            'slug': sp.slug,
-            'name': sp.name,
-            'attributes': sp.attributes_json or {},
-            'manual_html': sp.manual_html,
-            'rune_effects': effects,
-        })
-    return JsonResponse({'spells': data})
+    runes = _csv(runes_filter) if runes_filter else None
+    fields, compact = _api_fields(request)
+    unknown = sorted(set(fields) - set(API_FIELDS))
+    if unknown:
+        return JsonResponse({'error': f"Campos desconhecidos: {', '.join(unknown)}",
+                             'fields': list(API_FIELDS)}, status=400)
+    filters = _api_filters(request)
+    for key, values in filters.items():
+        invalid = sorted(set(values) - set(ATTRIBUTE_ENUMS[key]))
+        if invalid:
+            return JsonResponse({'error': f"Valores inválidos para '{key}': {', '.join(invalid)}",
+                                 key: list(ATTRIBUTE_ENUMS[key])}, status=400)
+    if compact and runes is None:
+        # modo compacto: efeitos apenas das runas pedidas
+        runes = []
+    return JsonResponse({'spells': await aget_spell_rows(ids, fields, runes, filters)})
@@ -0,0 +1,15 @@
+import os
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_http_methods
+from grimorio.services import metrics
+
+@never_cache
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def api_perf(request):
+    # histograma é por processo: com vários workers, cada chamada mostra um deles (veja 'pid')
+    if request.method == 'POST' and request.POST.get('reset'):
+        metrics.histogram.reset()
+    return JsonResponse({'pid': os.getpid(), 'views': metrics.histogram.snapshot()})
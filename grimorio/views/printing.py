@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseBadRequest
+from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
+from grimorio.services.catalog import content_version
+from grimorio.services.exports import FORMATS, ExportFailed, canonical_selection, max_spells, request_artifact
+from grimorio.services.selection import InvalidSelection
+from grimorio.views.grimorio import _from_query, _selection, bad_selection
+
+@require_http_methods(['GET'])
+def grimorio_print(request, fmt):
+    if fmt not in FORMATS:
+        raise Http404("Formato desconhecido")
+    try:
+        sel_spells, sel_runes = canonical_selection(*_selection(request))
+    except InvalidSelection as e:
+        return bad_selection(e)
+    if not sel_spells:
+        return render(request, 'grimorio/empty.html', {})
+    if len(sel_spells) > max_spells():
+        return HttpResponseBadRequest(f"Exportação limitada a {max_spells()} magias.")
+
+    try:
+        path = request_artifact(sel_spells, sel_runes, content_version(), fmt)
+    except ExportFailed:
+        # sem isso a página de espera recarregaria para sempre
+        response = render(request, 'grimorio/print_failed.html', {'fmt': fmt.upper()}, status=500)
+        patch_cache_control(response, no_store=True)
+        return response
+    if path is None:
+        # ainda gerando: a página se recarrega até o arquivo ficar pronto
+        response = render(request, 'grimorio/print_pending.html', {'fmt': fmt.upper()}, status=202)
+        response['Retry-After'] = '2'
+        patch_cache_control(response, no_store=True)
+        return response
+
+    response = FileResponse(open(path, 'rb'), content_type=FORMATS[fmt])
+    if fmt == 'pdf':
+        response['Content-Disposition'] = 'inline; filename="grimorio.pdf"'
+    if _from_query(request):
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'GRIMORIO_HTTP_MAX_AGE', 300))
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,29 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+from grimorio.services.catalog import content_version
+from grimorio.services.metrics import span
+from grimorio.services.search import search
+from grimorio.views.caching import conditional, make_etag
+
+MAX_LIMIT = 100
+
+def _limit(request):
+    try:
+        return max(1, min(MAX_LIMIT, int(request.GET.get('limit', 20))))
+    except ValueError:
+        return 20
+
+def _search_etag(request):
+    # o corpo repete 'q' como veio: o ETag usa o texto e não só os termos normalizados
+    return make_etag('search', content_version(), request.GET.get('q', '').strip(), _limit(request))
+
+@require_http_methods(['GET'])
+@conditional(_search_etag)
+async def api_search(request):
+    q = request.GET.get('q', '').strip()
+    if not q:
+        return JsonResponse({'error': "Informe o termo de busca em 'q'"}, status=400)
+    with span('search'):
+        results = await sync_to_async(search)(q, _limit(request))
+    return JsonResponse({'query': q, 'results': results})
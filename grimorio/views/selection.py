@@ -1,20 +1,37 @@
+from urllib.parse import urlencode
+from django.conf import settings
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.views.decorators.http import require_http_methods
+from grimorio.services.catalog import content_version
+from grimorio.services.fragments import selection_chips
+from grimorio.services.selection import encode_selection
 from grimorio.services.selectors import list_all_spells, list_all_runes
+from grimorio.services.metrics import span
+from grimorio.views.caching import conditional, make_etag
+
+def _selection_etag(request):
+    # o token CSRF da página depende do cookie: a cópia do navegador só vale para ele
+    csrf = request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+    if not csrf:
+        return None
+    return make_etag('selection', content_version(), csrf)
 
 @require_http_methods(['GET','POST'])
+# sem Last-Modified: If-Modified-Since sozinho não sabe de qual cookie era a cópia
+@conditional(_selection_etag, public=lambda request: False, last_modified_func=None)
 def selection_view(request):
     if request.method == 'POST':
         spells = request.POST.getlist('spells[]')
         runes = request.POST.getlist('runes[]')
-        request.session['sel_spells'] = spells
-        request.session['sel_runes'] = runes
-        qs = []
-        if spells: qs.append('spells=' + ','.join(spells))
-        if runes:  qs.append('runes='  + ','.join(runes))
-        return redirect('/grimorio/' + ('?' + '&'.join(qs) if qs else ''))
+        if getattr(settings, 'GRIMORIO_SESSION_SELECTION', False):
+            request.session['sel_spells'] = spells
+            request.session['sel_runes'] = runes
+        # URL canônica e compartilhável: a mesma seleção sempre cai na mesma chave de cache
+        qs = urlencode(encode_selection(spells, runes))
+        return redirect(reverse('grimorio:grimorio') + ('?' + qs if qs else ''))
     ctx = {
-        'spells': list_all_spells(),
-        'runes': list_all_runes(),
+        'chips': selection_chips(content_version(), lambda: (list_all_spells(), list_all_runes())),
     }
-    return render(request, 'grimorio/selection.html', ctx)
+    with span('tpl'):
+        return render(request, 'grimorio/selection.html', ctx)
@@ -0,0 +1,30 @@
+"""Configuração do gunicorn (lida automaticamente de ./gunicorn.conf.py).
+
+Com o app ASGI, o padrão são workers do uvicorn. Cada worker atende muitas conexões ao mesmo
+tempo num event loop; um celular lento no Wi-Fi da mesa não prende um processo inteiro
+enquanto manda a requisição ou baixa a resposta.
+
+    gunicorn nexus_site.asgi:application
+
+Deploy síncrono antigo (um processo por requisição em andamento), para comparar ou voltar
+atrás: com o app WSGI o worker padrão continua o sync do gunicorn.
+
+    gunicorn nexus_site.wsgi
+
+Variáveis: WEB_CONCURRENCY (nº de workers, lida pelo próprio gunicorn), PORT (idem),
+GUNICORN_WORKER_CLASS, GUNICORN_TIMEOUT, GUNICORN_KEEPALIVE.
+"""
+import os, shlex, sys
+
+def _asgi_target(argv):
+    """O app pedido na linha de comando (ou em GUNICORN_CMD_ARGS) é o nexus_site.asgi?"""
+    args = argv + shlex.split(os.getenv("GUNICORN_CMD_ARGS", ""))
+    return any(arg.split(":", 1)[0].endswith(".asgi") for arg in args if not arg.startswith("-"))
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or (
+    "uvicorn_worker.UvicornWorker" if _asgi_target(sys.argv[1:]) else "sync")
+# segundos sem resposta do worker antes de reiniciá-lo
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = 20
+# keep-alive: o navegador reaproveita a conexão para os painéis sob demanda e estáticos
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
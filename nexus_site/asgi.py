@@ -0,0 +1,6 @@
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nexus_site.settings')
+# no ASGI cada requisição roda o ORM numa thread nova: conexões persistentes não seriam reaproveitadas
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+application = get_asgi_application()
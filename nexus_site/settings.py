@@ -62,8 +62,14 @@ INSTALLED_APPS = [
 # =========================
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    # WhiteNoise logo após SecurityMiddleware
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # no ASGI, respostas em streaming (estáticos, export NDJSON) saem bloco a bloco
+    "grimorio.middleware.AsyncStreamingMiddleware",
+    # WhiteNoise logo após SecurityMiddleware (subclasse que também roda no ASGI)
+    "grimorio.middleware.StaticFilesMiddleware",
+    # histograma por view + Server-Timing (GRIMORIO_PERF_ENABLED=False desliga)
+    "grimorio.middleware.PerformanceMiddleware",
+    # gzip/Brotli nas respostas dinâmicas (dentro do Performance: Server-Timing mostra o custo)
+    "grimorio.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -119,7 +125,8 @@ if db_url:
     DATABASES = {
         "default": dj_database_url.parse(
             db_url,
-            conn_max_age=600,
+            # ASGI: cada requisição usa uma thread nova, conexão persistente vazaria (asgi.py usa 0)
+            conn_max_age=int(os.getenv("DB_CONN_MAX_AGE", "600")),
             ssl_require=is_pg and bool(os.getenv("RENDER")),
         )
     }
@@ -132,6 +139,26 @@ else:
         }
     }
 
+# =========================
+# Cache
+# - "grimorio": fragmentos renderizados dos painéis (LRU limitado por MAX_ENTRIES)
+# - GRIMORIO_CACHE_BACKEND / GRIMORIO_CACHE_LOCATION permitem trocar por FileBasedCache etc.
+# =========================
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "grimorio": {
+        "BACKEND": os.getenv("GRIMORIO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("GRIMORIO_CACHE_LOCATION", "grimorio"),
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("GRIMORIO_CACHE_MAX_ENTRIES", "2000")),
+            "CULL_FREQUENCY": 4,
+        },
+    },
+}
+
 # =========================
 # Senhas / Autenticação
 # =========================
@@ -159,8 +186,14 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # Se você tiver assets “globais” fora dos apps, adicione aqui:
 # STATICFILES_DIRS = [ BASE_DIR / "static" ]
 
+# Bundle estático do grimório (manage.py build_grimorio_bundle), servido em static/grimorio/bundle/
+GRIMORIO_BUNDLE_DIR = BASE_DIR / "bundle"
+STATICFILES_DIRS = [("grimorio/bundle", GRIMORIO_BUNDLE_DIR)] if GRIMORIO_BUNDLE_DIR.is_dir() else []
+
 # WhiteNoise: arquivos comprimidos + cache busting
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Cache "para sempre" em qualquer nome com hash de 12 hex (do manifest do Django ou do bundle)
+WHITENOISE_IMMUTABLE_FILE_TEST = r"^.+\.[0-9a-f]{12}\.[^/.]+$"
 
 # =========================
 # Arquivos de mídia (se vier a usar)
@@ -173,6 +206,48 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 # =========================
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# =========================
+# Grimório
+# =========================
+# Snapshot do catálogo em memória por worker (desligue em catálogos grandes demais para a RAM)
+GRIMORIO_CATALOG_SNAPSHOT = os.getenv("GRIMORIO_CATALOG_SNAPSHOT", "True").lower() == "true"
+# Intervalo (s) entre verificações do carimbo de versão do conteúdo
+GRIMORIO_CATALOG_TTL = float(os.getenv("GRIMORIO_CATALOG_TTL", "2"))
+# Cache de painéis renderizados: alias em CACHES e tamanho máximo de um fragmento cacheável
+GRIMORIO_FRAGMENT_CACHE = "grimorio"
+GRIMORIO_FRAGMENT_MAX_BYTES = int(os.getenv("GRIMORIO_FRAGMENT_MAX_BYTES", str(512 * 1024)))
+# max-age (s) das respostas públicas de /grimorio/?spells=... e /api/spells (revalidadas por ETag)
+GRIMORIO_HTTP_MAX_AGE = int(os.getenv("GRIMORIO_HTTP_MAX_AGE", "300"))
+# Guardar a seleção também na sessão (e usá-la quando a URL vem sem seleção).
+# Desligado: a seleção vive só na URL (?s=&r=) e o grimório não lê nem grava sessão.
+GRIMORIO_SESSION_SELECTION = os.getenv("GRIMORIO_SESSION_SELECTION", "False").lower() == "true"
+# Acima de N magias, /grimorio/ renderiza só a primeira aba; as outras vêm de /grimorio/panel/<slug>/
+GRIMORIO_LAZY_THRESHOLD = int(os.getenv("GRIMORIO_LAZY_THRESHOLD", "6"))
+# Tamanho do lote do export NDJSON (/api/spells/export)
+GRIMORIO_EXPORT_CHUNK_SIZE = int(os.getenv("GRIMORIO_EXPORT_CHUNK_SIZE", "200"))
+# Exportação de impressão/PDF (/grimorio/export.html|pdf): pasta dos arquivos gerados,
+# threads que os geram (0 = gera na própria requisição) e fontes TTF (DejaVu) para o PDF
+GRIMORIO_EXPORT_DIR = Path(os.getenv("GRIMORIO_EXPORT_DIR", BASE_DIR / ".cache" / "exports"))
+GRIMORIO_EXPORT_WORKERS = int(os.getenv("GRIMORIO_EXPORT_WORKERS", "2"))
+GRIMORIO_PDF_FONT_DIR = os.getenv("GRIMORIO_PDF_FONT_DIR", "/usr/share/fonts/truetype/dejavu")
+# Limites da exportação: magias por arquivo e espaço total da pasta (apaga os menos usados)
+GRIMORIO_EXPORT_MAX_SPELLS = int(os.getenv("GRIMORIO_EXPORT_MAX_SPELLS", "60"))
+GRIMORIO_EXPORT_MAX_BYTES = int(os.getenv("GRIMORIO_EXPORT_MAX_BYTES", str(256 * 1024 * 1024)))
+# Compressão das respostas dinâmicas: tamanho mínimo (bytes) para comprimir.
+# Brotli é usado quando o pacote `brotli` está instalado; senão só gzip.
+GRIMORIO_COMPRESS_MIN_BYTES = int(os.getenv("GRIMORIO_COMPRESS_MIN_BYTES", "1024"))
+# Níveis usados no caminho da requisição (moderados: a maioria dos corpos não se repete)
+GRIMORIO_BROTLI_QUALITY = int(os.getenv("GRIMORIO_BROTLI_QUALITY", "5"))
+GRIMORIO_GZIP_LEVEL = int(os.getenv("GRIMORIO_GZIP_LEVEL", "6"))
+# Busca (/api/search): "auto" usa full-text do Postgres quando disponível, senão índice em memória
+GRIMORIO_SEARCH_BACKEND = os.getenv("GRIMORIO_SEARCH_BACKEND", "auto")
+# Instrumentação: histograma das últimas N requisições por view (staff: /api/_perf)
+GRIMORIO_PERF_ENABLED = os.getenv("GRIMORIO_PERF_ENABLED", "True").lower() == "true"
+GRIMORIO_PERF_SAMPLES = int(os.getenv("GRIMORIO_PERF_SAMPLES", "1000"))
+# Server-Timing para todos só em dev: em produção um CDN guardaria os números de uma requisição
+# (staff ainda recebe o cabeçalho nas respostas privadas)
+GRIMORIO_SERVER_TIMING = os.getenv("GRIMORIO_SERVER_TIMING", str(DEBUG)).lower() == "true"
+
 # =========================
 # Logging básico (opcional, útil no Render)
 # =========================
@@ -186,4 +261,8 @@ LOGGING = {
         "handlers": ["console"],
         "level": "INFO" if not DEBUG else "DEBUG",
     },
+    "loggers": {
+        # o fpdf2 subseta as fontes TTF com o fontTools, que loga centenas de linhas INFO por PDF
+        "fontTools": {"level": "WARNING"},
+    },
 }